@@ -1,6 +1,7 @@
 # config.py
 
 import os
+import json
 from pathlib import Path
 
 # User and Agent configuration
@@ -10,17 +11,50 @@ AGENT_NAME = os.getenv("AI_AGENT_NAME", "Otto")
 # Model configuration
 DEFAULT_MODEL = "llama3.1:latest"
 EMBEDDING_MODEL = os.getenv("AI_EMBEDDING_MODEL", "nomic-embed-text")
+EMBEDDING_BATCH_SIZE = int(os.getenv("AI_EMBEDDING_BATCH_SIZE", "16"))
+EMBEDDING_MAX_WORKERS = int(os.getenv("AI_EMBEDDING_MAX_WORKERS", "4"))
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("AI_EMBEDDING_CACHE_MEMORY_ITEMS", "4096"))
+OLLAMA_BASE_URL = os.getenv("AI_OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("AI_OLLAMA_MAX_CONCURRENCY", "4"))
+RESPONSE_CACHE_ENABLED = os.getenv("AI_RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("AI_RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+RESPONSE_CACHE_DEFAULT_TTL = float(os.getenv("AI_RESPONSE_CACHE_DEFAULT_TTL", str(7 * 24 * 3600)))
+# Per-call-site TTLs in seconds as JSON, e.g. '{"InputAnalyzer": 86400, "ResponseGenerator": 0}'; 0 disables a call site
+RESPONSE_CACHE_TTLS = json.loads(os.getenv("AI_RESPONSE_CACHE_TTLS", "{}"))
+SEMANTIC_CACHE_MODE = os.getenv("AI_SEMANTIC_CACHE_MODE", "off").lower()  # "off", "shadow" (log would-be hits only) or "on"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("AI_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+# Per-call-site cosine similarity thresholds as JSON, e.g. '{"QueryGenerator": 0.9, "Chat": null}'; null disables a call site
+SEMANTIC_CACHE_THRESHOLDS = json.loads(os.getenv("AI_SEMANTIC_CACHE_THRESHOLDS", "{}"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("AI_SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+PERSIST_QUEUE_SIZE = int(os.getenv("AI_PERSIST_QUEUE_SIZE", "1000"))  # interactions waiting to be saved; 0 saves synchronously
+PERSIST_BATCH_SIZE = int(os.getenv("AI_PERSIST_BATCH_SIZE", "32"))
+PERSIST_DEFAULT_POLICY = os.getenv("AI_PERSIST_DEFAULT_POLICY", "full")  # "full", "memory" (no chat history) or "none"
+# Per-call-site persistence policies as JSON, e.g. '{"QueryGenerator": "none", "InputAnalyzer": "memory"}'
+PERSIST_POLICIES = json.loads(os.getenv("AI_PERSIST_POLICIES", "{}"))
+STREAM_HEADLESS = os.getenv("AI_STREAM_HEADLESS", "false").lower() == "true"  # collect streamed responses without rendering them
+STREAM_REFRESH_PER_SECOND = float(os.getenv("AI_STREAM_REFRESH_PER_SECOND", "4"))
+AGENT_STEP_MAX_WORKERS = int(os.getenv("AI_AGENT_STEP_MAX_WORKERS", "8"))
+COGNITIVE_LATENCY_BUDGET = float(os.getenv("AI_COGNITIVE_LATENCY_BUDGET", "0")) or None  # seconds; 0 runs every step
+COGNITIVE_STEP_TIMEOUT = float(os.getenv("AI_COGNITIVE_STEP_TIMEOUT", "120"))
+COGNITIVE_CACHE_SIZE = int(os.getenv("AI_COGNITIVE_CACHE_SIZE", "256"))
 
 # Memory configuration
 MEMORY_LENGTH = int(os.getenv("AI_MEMORY_LENGTH", "15"))
 CHUNK_SIZE = int(os.getenv("AI_CHUNK_SIZE", "5000"))
 CHUNK_OVERLAP = int(os.getenv("AI_CHUNK_OVERLAP", "200"))
 CHUNK_LENGTH = int(os.getenv("AI_CHUNK_LENGTH", "10"))
+MEMORY_STORE_BACKEND = os.getenv("AI_MEMORY_STORE_BACKEND", "sqlite")  # "sqlite" or "json"
 
 # Path configuration
 PROJECT_ROOT = Path(__file__).resolve().parent
 DATA_DIR = PROJECT_ROOT / "data" / "json_history"
 EMBEDDINGS_DIR = DATA_DIR / "embeddings"
+VECTOR_INDEX_DIR = PROJECT_ROOT / "data" / "vector_index"
+EMBEDDING_CACHE_PATH = PROJECT_ROOT / "data" / "embedding_cache.db"
+ACCESS_COUNTS_PATH = PROJECT_ROOT / "data" / "access_counts.db"
+MEMORY_DB_PATH = PROJECT_ROOT / "data" / "memories.db"
+RESPONSE_CACHE_PATH = PROJECT_ROOT / "data" / "response_cache.db"
+SEMANTIC_CACHE_PATH = PROJECT_ROOT / "data" / "semantic_cache.db"
 
 # Edge Database configuration
 DB_DIR = PROJECT_ROOT / "data" / "edgebase"
@@ -30,14 +64,21 @@ DB_PATH = DB_DIR / DB_FILE
 # Ensure directories exist
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 EMBEDDINGS_DIR.mkdir(parents=True, exist_ok=True)
+VECTOR_INDEX_DIR.mkdir(parents=True, exist_ok=True)
 DB_DIR.mkdir(parents=True, exist_ok=True)
 
 # File paths
-CHAT_HISTORY_FILE = Path.home() / ".ollama_agents_chat_history.json"
+CHAT_HISTORY_FILE = Path.home() / ".ollama_agents_chat_history.json"  # legacy format, imported into the journal
+CHAT_HISTORY_JOURNAL = Path.home() / ".ollama_agents_chat_history.jsonl"
+CHUNK_HISTORY_FILE = Path.home() / ".ollama_agents_chunk_history.json"  # legacy format, imported into the journal
+CHUNK_HISTORY_JOURNAL = Path.home() / ".ollama_agents_chunk_history.jsonl"
+HISTORY_JOURNAL_FSYNC = os.getenv("AI_HISTORY_JOURNAL_FSYNC", "false").lower() == "true"  # fsync every history append
 
 # Search configuration
 DEFAULT_TOP_K = int(os.getenv("AI_DEFAULT_TOP_K", "5"))
 DEFAULT_SIMILARITY_THRESHOLD = float(os.getenv("AI_DEFAULT_SIMILARITY_THRESHOLD", "0.0"))
+EMBEDDING_BACKFILL_ON_START = os.getenv("AI_EMBEDDING_BACKFILL_ON_START", "true").lower() == "true"
+ACCESS_COUNT_FLUSH_INTERVAL = float(os.getenv("AI_ACCESS_COUNT_FLUSH_INTERVAL", "30"))
 
 # Logging configuration
 LOG_LEVEL = os.getenv("AI_LOG_LEVEL", "WARNING")
@@ -54,3 +95,7 @@ DEFAULT_BROWSER = "default"
 EDGE_DB_VERSION = "1.0"
 EDGE_TABLE_NAME = "edges"
 EDGE_INDEX_PREFIX = "idx_"
+EDGE_WRITE_BATCH_SIZE = int(os.getenv("AI_EDGE_WRITE_BATCH_SIZE", "1000"))
+EDGE_WRITE_FLUSH_INTERVAL = float(os.getenv("AI_EDGE_WRITE_FLUSH_INTERVAL", "1.0"))
+GRAPH_SNAPSHOT_ENABLED = os.getenv("AI_GRAPH_SNAPSHOT_ENABLED", "false").lower() == "true"
+GRAPH_SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("AI_GRAPH_SNAPSHOT_REFRESH_INTERVAL", "5.0"))
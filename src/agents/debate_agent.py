@@ -7,6 +7,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.modules.ollama_client import process_prompt
+from src.modules.memory_search import search_memories_batch
 from src.modules.logging_setup import logger
 from rich.console import Console
 from rich.panel import Panel
@@ -18,9 +19,22 @@ class DebateAgent:
     def __init__(self, model=DEFAULT_MODEL):
         self.model = model
         self.debate_log = []
+        self.memory_context = {}
+
+    def gather_memories(self, topic):
+        perspectives = ["pro", "con"]
+        queries = [f"Arguments for {topic}", f"Arguments against {topic}"]
+        # One embedding pass over the memory index serves both sides of the debate
+        results = search_memories_batch(queries, top_k=3, similarity_threshold=0.5)
+        self.memory_context = {
+            perspective: "\n".join(f"- {m['content']}" for m in memories)
+            for perspective, memories in zip(perspectives, results)
+        }
 
     def generate_response(self, prompt, perspective):
         full_prompt = f"You are debating the topic: '{prompt}'. Argue from the {perspective} perspective. Keep your response concise."
+        if self.memory_context.get(perspective):
+            full_prompt += f"\n\nRelevant information from memory:\n{self.memory_context[perspective]}"
         response = process_prompt(full_prompt, self.model, f"Debater ({perspective})")
         self.debate_log.append((perspective, response))
         return response
@@ -46,6 +60,7 @@ class DebateAgent:
     def debate(self, topic, turns):
         logger.info(f"Starting debate on topic: {topic} for {turns} turns")
         console.print(Panel(f"Debate Topic: {topic}", style="bold magenta"))
+        self.gather_memories(topic)
 
         for i in range(turns):
             perspective = "pro" if i % 2 == 0 else "con"
@@ -3,6 +3,7 @@
 import sys
 import os
 import json
+from concurrent.futures import Future
 from typing import List, Dict, Any, Optional
 from rich.console import Console
 from rich.panel import Panel
@@ -18,6 +19,8 @@ from src.modules.input import get_user_input
 from src.modules.cognitive_engine import process_query_and_generate_response
 from src.modules.meta_processes import debug_panel, print_step, print_result, print_error
 from src.modules.errors import ModelInferenceError, DataProcessingError, InputError
+from src.modules.step_scheduler import Step, default_scheduler
+from src.modules.stream_renderer import run_headless
 from src.modules.agent_tools import (
     analyze_user_input,
     generate_response,
@@ -72,6 +75,9 @@ class SmartAgent:
         self.ddg_search = DDGSearch()
         self.knowledge_tree = {}
         self.user_profile = {"expertise_level": "medium", "interests": [], "language_preference": "English"}
+        self.scheduler = default_scheduler
+        # Post-answer steps of the previous input, folded into the state before it is next read
+        self.bookkeeping: Optional[Future] = None
 
     @debug_panel
     def run(self):
@@ -95,6 +101,7 @@ class SmartAgent:
                 response = self.process_input(user_input)
             self.output_response(response)
 
+        self.finish_bookkeeping()
         print_result("Session End", f"👋 Thank you for using {AGENT_NAME}. Your session has ended. Goodbye!")
 
     @debug_panel
@@ -111,6 +118,7 @@ class SmartAgent:
         elif command == '/context':
             return f"📚 Current context:\n{self.context}"
         elif command == '/clear_context':
+            self.finish_bookkeeping()
             self.context = ""
             self.bullet_points = []
             return "🧹 Context and bullet points cleared."
@@ -131,43 +139,43 @@ class SmartAgent:
     def process_input(self, user_input: str) -> str:
         try:
             print_step("Starting cognitive processing")
-
-            input_analysis = analyze_user_input(user_input, self.model_name)
-            query_info = process_query(user_input, self.model_name)
-
-            self.context = gather_context(user_input, query_info['topic'], self.conversation_history, self.bullet_points, AGENT_NAME)
-            self.context = adapt_context_to_user(self.context, self.user_profile, self.model_name)
-
-            research_depth = query_info['depth']
-            if research_depth > 1:
-                search_queries = generate_search_queries(user_input, self.model_name)
-                search_results = [self.ddg_search.run_search(query) for query in search_queries]
-                summarized_results = summarize_search_results(sum(search_results, []), self.model_name)
-                self.context = update_context(self.context, summarized_results, self.model_name)
-
-            response = generate_response(user_input, self.context, input_analysis, AGENT_NAME, self.model_name)
-
-            credibility = assess_source_credibility(response, self.model_name)
-            update_knowledge_base(response, query_info['topic'], self.model_name)
-
-            new_bullets = update_bullet_points(response, self.model_name)
-            self.bullet_points.extend(new_bullets)
-
-            key_concepts = extract_key_concepts(response, self.model_name)
-            self.update_knowledge_tree(query_info['topic'], key_concepts)
-
-            topic_summary = summarize_topic(query_info['topic'], self.context, self.model_name)
+            self.finish_bookkeeping()
+
+            # Steps that do not depend on each other run concurrently; the answer
+            # waits only for analysis -> context -> (research) -> response
+            results = self.scheduler.run([
+                Step("input_analysis", lambda: analyze_user_input(user_input, self.model_name)),
+                Step("query_info", lambda: process_query(user_input, self.model_name)),
+                Step("user_context", lambda query_info: self._user_context(user_input, query_info['topic']), ("query_info",)),
+                Step("research", lambda query_info: self._research(user_input, query_info['depth']), ("query_info",)),
+                Step("context", lambda context, research: update_context(context, research, self.model_name) if research else context,
+                     ("user_context", "research")),
+                Step("response", lambda context, input_analysis: generate_response(
+                    user_input, context, input_analysis, AGENT_NAME, self.model_name), ("context", "input_analysis")),
+                Step("followup_questions", lambda context: generate_follow_up_questions(context, self.model_name), ("context",)),
+            ])
+            input_analysis, query_info = results["input_analysis"], results["query_info"]
+            context, response = results["context"], results["response"]
+            self.context = context
 
             self.conversation_history.append({"prompt": user_input, "response": response})
             chat_history.add_entry(user_input, response)
 
+            # Bookkeeping on the answer runs in the background while the answer is shown and the
+            # follow-up is read; headless, so its generations never take over the terminal
+            topic = query_info['topic']
+            self.bookkeeping = self.scheduler.run_in_background([
+                Step("credibility", run_headless(lambda: assess_source_credibility(response, self.model_name))),
+                Step("knowledge_base", run_headless(lambda: update_knowledge_base(response, topic, self.model_name))),
+                Step("bullets", run_headless(lambda: update_bullet_points(response, self.model_name))),
+                Step("key_concepts", run_headless(lambda: extract_key_concepts(response, self.model_name))),
+                Step("topic_summary", run_headless(lambda: summarize_topic(topic, context, self.model_name))),
+            ], {"topic": topic})
+
             print_result("Input Analysis", input_analysis)
-            print_result("Query Info", f"Topic: {query_info['topic']} (confidence: {query_info['confidence']:.2f})\nResearch depth: {research_depth}/5")
-            print_result("Credibility", f"{credibility:.2f}/1.00")
-            print_result("Key Concepts", ", ".join(key_concepts))
-            print_result("Topic Summary", topic_summary)
+            print_result("Query Info", f"Topic: {query_info['topic']} (confidence: {query_info['confidence']:.2f})\nResearch depth: {query_info['depth']}/5")
 
-            followup = self.handle_followup(self.context)
+            followup = self.handle_followup(results["followup_questions"])
             if followup:
                 response += f"\n\n{followup}"
 
@@ -178,6 +186,36 @@ class SmartAgent:
             print_error(f"Unexpected error: {str(e)}")
             return "😰 I apologize, but an unexpected error occurred. Please try rephrasing your question or try a different query."
 
+    def _user_context(self, user_input: str, topic: str) -> str:
+        context = gather_context(user_input, topic, self.conversation_history, self.bullet_points, AGENT_NAME)
+        return adapt_context_to_user(context, self.user_profile, self.model_name)
+
+    def _research(self, user_input: str, research_depth: int) -> Optional[str]:
+        if research_depth <= 1:
+            return None
+        search_queries = generate_search_queries(user_input, self.model_name)
+        search_results = [self.ddg_search.run_search(query) for query in search_queries]
+        return summarize_search_results(sum(search_results, []), self.model_name)
+
+    def finish_bookkeeping(self):
+        """
+        Wait for the background steps of the previous answer and fold their results into the agent state.
+        """
+        if self.bookkeeping is None:
+            return
+        future, self.bookkeeping = self.bookkeeping, None
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.exception(f"Error in background bookkeeping: {str(e)}")
+            print_error(f"Background update failed: {str(e)}")
+            return
+        self.bullet_points.extend(results["bullets"])
+        self.update_knowledge_tree(results["topic"], results["key_concepts"])
+        print_result("Credibility", f"{results['credibility']:.2f}/1.00")
+        print_result("Key Concepts", ", ".join(results["key_concepts"]))
+        print_result("Topic Summary", results["topic_summary"])
+
     @debug_panel
     def interactive_search(self, query: str) -> str:
         print_step(f"Performing interactive search for: {query}")
@@ -198,12 +236,14 @@ class SmartAgent:
 
     @debug_panel
     def display_bullet_points(self) -> str:
+        self.finish_bookkeeping()
         if not self.bullet_points:
             return "No bullet points available."
         return "📌 Current key points:\n" + "\n".join(f"• {point}" for point in self.bullet_points)
 
     @debug_panel
     def display_knowledge_tree(self) -> str:
+        self.finish_bookkeeping()
         if not self.knowledge_tree:
             return "Knowledge tree is empty."
         return "🌳 Knowledge Tree:\n" + json.dumps(self.knowledge_tree, indent=2)
@@ -262,8 +302,7 @@ class SmartAgent:
             self.knowledge_tree[topic] = set()
         self.knowledge_tree[topic].update(concepts)
 
-    def handle_followup(self, context: str) -> Optional[str]:
-        followup_questions = generate_follow_up_questions(context, self.model_name)
+    def handle_followup(self, followup_questions: List[str]) -> Optional[str]:
         if followup_questions:
             print_result("Follow-up Questions", "\n".join(f"{i+1}. {q}" for i, q in enumerate(followup_questions)))
             choice = console.input("Select a follow-up question (number) or press Enter to skip: ")
@@ -12,7 +12,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from src.modules.banner import setup_console, print_welcome_banner, print_separator
 from src.modules.logging_setup import logger
 from src.modules.errors import OllamaAgentsError, ConfigurationError, InputError
-from config import AGENT_NAME
+from config import AGENT_NAME, EMBEDDING_BACKFILL_ON_START
 
 console = Console()
 
@@ -38,6 +38,10 @@ def main():
         print_welcome_banner(console, "AI Agents")
         print_separator(console)
 
+        if EMBEDDING_BACKFILL_ON_START:
+            from src.modules.memory_search import start_backfill_worker
+            start_backfill_worker()
+
         agents = list_agents()
         logger.info(f"Available agents: {agents}")
 
@@ -95,6 +99,9 @@ def main():
         logger.critical(f"Critical error occurred: {str(e)}", exc_info=True)
         console.print("A critical error occurred. The application will now exit.", style="bold red")
     finally:
+        # Written while the embedding executor still runs, unlike the atexit fallback
+        from src.modules.persistence_queue import persistence_queue
+        persistence_queue.close()
         console.print("[bold red]Goodbye![/bold red]")
         logger.info("Ollama_Agents application shutting down")
 
@@ -0,0 +1,110 @@
+# src/modules/access_counter.py
+
+import atexit
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable
+from config import ACCESS_COUNTS_PATH, ACCESS_COUNT_FLUSH_INTERVAL
+from .logging_setup import logger
+from .db_connection import get_connection_manager, select_in
+
+ACCESS_COUNTS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS access_counts (
+        memory_id TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0,
+        last_access TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+class AccessCounterStore:
+    """
+    Write-behind store for memory access counters.
+
+    Increments are accumulated in memory and flushed to SQLite in one
+    transaction, either every ``flush_interval`` seconds by a background
+    thread or when the process exits, so reading a memory never writes to it.
+    """
+
+    def __init__(self, db_path: Path, flush_interval: float = 30.0):
+        self.db_path = Path(db_path)
+        self.flush_interval = flush_interval
+        self.pending: Counter = Counter()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.connections = get_connection_manager(self.db_path, ACCESS_COUNTS_SCHEMA)
+        self.connections.get_connection()
+
+    def increment(self, memory_id: str, amount: int = 1):
+        with self.lock:
+            self.pending[memory_id] += amount
+        self._ensure_flusher()
+
+    def get(self, memory_id: str) -> int:
+        return self.get_many([memory_id]).get(memory_id, 0)
+
+    def get_many(self, memory_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Return persisted plus not-yet-flushed access counts for the given ids.
+        """
+        memory_ids = list(dict.fromkeys(memory_ids))
+        counts = {memory_id: 0 for memory_id in memory_ids}
+        with self.lock:
+            try:
+                counts.update(dict(select_in(self.connections.get_connection(),
+                                             "SELECT memory_id, count FROM access_counts WHERE memory_id IN ({placeholders})",
+                                             memory_ids)))
+            except sqlite3.Error as e:
+                logger.error(f"Error reading access counts: {str(e)}")
+            for memory_id in memory_ids:
+                counts[memory_id] += self.pending.get(memory_id, 0)
+        return counts
+
+    def flush(self) -> int:
+        """
+        Persist accumulated increments in a single transaction.
+
+        Returns:
+            int: Number of counters written.
+        """
+        with self.lock:
+            if not self.pending:
+                return 0
+            pending, self.pending = self.pending, Counter()
+            try:
+                conn = self.connections.get_connection()
+                with conn:
+                    conn.executemany("""
+                        INSERT INTO access_counts (memory_id, count, last_access)
+                        VALUES (?, ?, CURRENT_TIMESTAMP)
+                        ON CONFLICT(memory_id) DO UPDATE SET
+                            count = count + excluded.count,
+                            last_access = excluded.last_access
+                    """, list(pending.items()))
+            except sqlite3.Error as e:
+                logger.error(f"Error flushing access counts: {str(e)}")
+                self.pending.update(pending)
+                return 0
+        logger.debug(f"Flushed {len(pending)} access counters")
+        return len(pending)
+
+    def _ensure_flusher(self):
+        if self._thread is None and self.flush_interval > 0:
+            with self.lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="access-counter-flush", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        self.connections.close()
+
+access_counter = AccessCounterStore(ACCESS_COUNTS_PATH, ACCESS_COUNT_FLUSH_INTERVAL)
+atexit.register(access_counter.flush)
@@ -1,7 +1,8 @@
 # src/modules/cognitive_engine.py
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
+from config import COGNITIVE_LATENCY_BUDGET, COGNITIVE_STEP_TIMEOUT
 from src.modules.logging_setup import logger
 from src.modules.agent_tools import analyze_user_input, generate_response, update_bullet_points, rank_bullet_points
 from src.modules.knowledge_management import process_query, assess_source_credibility, update_knowledge_base, extract_key_concepts, summarize_topic
@@ -11,13 +12,59 @@ from src.modules.memory_search import search_memories
 from src.modules.kb_graph import get_related_nodes
 from src.modules.assemble import assemble_prompt_with_history
 from src.modules.errors import ModelInferenceError, DataProcessingError
-
-def process_query_and_generate_response(user_input: str, model_name: str, context: str, conversation_history: List[Dict[str, str]], bullet_points: List[str], agent_name: str) -> Dict[str, Any]:
+from src.modules.pipeline import Pipeline, PipelineStep
+
+def _update_knowledge_base(response: str, query_info: Dict[str, Any], model_name: str) -> bool:
+    update_knowledge_base(response, query_info['topic'], model_name)
+    return True
+
+# Only the steps on the way to the response are required; the rest are
+# optional and give way to the latency budget. Steps whose output depends
+# only on their inputs are cached by input hash; research is not, since web
+# results go stale.
+COGNITIVE_PIPELINE = Pipeline("cognitive", [
+    PipelineStep("input_analysis", analyze_user_input, ("user_input", "model_name"),
+                 optional=True, default={}, cache=True, timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("query_info", process_query, ("user_input", "model_name"), cache=True),
+    PipelineStep("gathered_context", lambda user_input, query_info, history, bullets, agent_name: gather_context(
+        user_input, query_info['topic'], history, bullets, agent_name),
+        ("user_input", "query_info", "conversation_history", "bullet_points", "agent_name")),
+    PipelineStep("memory_results", lambda user_input: search_memories(user_input, top_k=3), ("user_input",),
+                 optional=True, default=[], timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("kg_relations", lambda query_info: get_related_nodes(query_info['topic']), ("query_info",),
+                 optional=True, default=[], timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("research_results", lambda user_input, query_info, model_name: perform_research(
+        user_input, query_info['topic'], model_name), ("user_input", "query_info", "model_name"),
+        optional=True, default="", timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("context", lambda context, research_results, model_name: update_context(
+        context, research_results, model_name) if research_results else context,
+        ("gathered_context", "research_results", "model_name")),
+    PipelineStep("full_prompt", assemble_prompt_with_history, ("user_input",)),
+    PipelineStep("response", generate_response, ("full_prompt", "context", "input_analysis", "agent_name", "model_name")),
+    PipelineStep("credibility", assess_source_credibility, ("response", "model_name"),
+                 optional=True, default=0.5, timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("knowledge_base_updated", _update_knowledge_base, ("response", "query_info", "model_name"),
+                 optional=True, default=False, timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("key_concepts", extract_key_concepts, ("response", "model_name"),
+                 optional=True, default=[], timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("new_bullets", update_bullet_points, ("response", "model_name"),
+                 optional=True, default=[], timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("ranked_bullets", lambda bullets, new_bullets, model_name: rank_bullet_points(
+        bullets + new_bullets, model_name), ("bullet_points", "new_bullets", "model_name"),
+        optional=True, timeout=COGNITIVE_STEP_TIMEOUT),
+    PipelineStep("topic_summary", lambda query_info, context, model_name: summarize_topic(
+        query_info['topic'], context, model_name), ("query_info", "context", "model_name"),
+        optional=True, default="", timeout=COGNITIVE_STEP_TIMEOUT),
+])
+
+def process_query_and_generate_response(user_input: str, model_name: str, context: str, conversation_history: List[Dict[str, str]], bullet_points: List[str], agent_name: str,
+                                        latency_budget: Optional[float] = COGNITIVE_LATENCY_BUDGET) -> Dict[str, Any]:
     """
     Process a user query, conduct research, and generate a comprehensive response with associated metadata.
 
     This function serves as the cognitive engine of the AI assistant, coordinating various analytical and generative tasks
-    to provide an informed and context-aware response to the user's input.
+    to provide an informed and context-aware response to the user's input. The tasks run as COGNITIVE_PIPELINE:
+    independent ones concurrently, and optional ones only while they fit in the latency budget.
 
     Args:
     user_input (str): The user's input query.
@@ -26,76 +73,42 @@ def process_query_and_generate_response(user_input: str, model_name: str, contex
     conversation_history (List[Dict[str, str]]): The conversation history.
     bullet_points (List[str]): The current list of key points.
     agent_name (str): The name of the agent.
+    latency_budget (Optional[float]): Seconds to aim for; None runs every step.
 
     Returns:
     Dict[str, Any]: A dictionary containing the response and associated metadata, including analysis results,
-                    research findings, and updated context information.
+                    research findings, updated context information, per-step timings and skipped steps.
     """
     try:
         logger.info("Starting cognitive processing for user query")
-
-        # Analyze user input
-        input_analysis = analyze_user_input(user_input, model_name)
-        logger.info(f"Input analysis: {input_analysis}")
-
-        # Process query
-        query_info = process_query(user_input, model_name)
-        logger.info(f"Query info: {query_info}")
-
-        # Gather context
-        context = gather_context(user_input, query_info['topic'], conversation_history, bullet_points, agent_name)
-
-        # Perform memory search
-        memory_results = search_memories(user_input, top_k=3)
-        logger.info(f"Found {len(memory_results)} relevant memories")
-
-        # Get knowledge graph relations
-        kg_relations = get_related_nodes(query_info['topic'])
-        logger.info(f"Found {len(kg_relations)} knowledge graph relations")
-
-        # Conduct research
-        research_results = perform_research(user_input, query_info['topic'], model_name)
-        logger.info("Completed research")
-
-        # Update context with research results
-        context = update_context(context, research_results, model_name)
-
-        # Assemble full prompt
-        full_prompt = assemble_prompt_with_history(user_input)
-
-        # Generate response
-        response = generate_response(full_prompt, context, input_analysis, agent_name, model_name)
-
-        # Assess source credibility
-        credibility = assess_source_credibility(response, model_name)
-        logger.info(f"Response credibility: {credibility}")
-
-        # Update knowledge base
-        update_knowledge_base(response, query_info['topic'], model_name)
-
-        # Extract key concepts
-        key_concepts = extract_key_concepts(response, model_name)
-        logger.info(f"Extracted key concepts: {key_concepts}")
-
-        # Update bullet points
-        new_bullets = update_bullet_points(response, model_name)
-        bullet_points.extend(new_bullets)
-        bullet_points = rank_bullet_points(bullet_points, model_name)
-
-        # Summarize topic
-        topic_summary = summarize_topic(query_info['topic'], context, model_name)
+        run = COGNITIVE_PIPELINE.run({
+            'user_input': user_input,
+            'model_name': model_name,
+            'conversation_history': conversation_history,
+            'bullet_points': list(bullet_points),
+            'agent_name': agent_name,
+        }, budget=latency_budget)
+        values = run.values
+        logger.info(f"Cognitive pipeline timings: {json.dumps({name: round(seconds, 3) for name, seconds in run.timings.items()})}"
+                    + (f", skipped: {run.skipped}" if run.skipped else ""))
+
+        bullet_points.extend(values['new_bullets'])
+        if values['ranked_bullets'] is not None:
+            bullet_points = values['ranked_bullets']
 
         return {
-            'response': response,
-            'input_analysis': input_analysis,
-            'query_info': query_info,
-            'context': context,
-            'credibility': credibility,
-            'key_concepts': key_concepts,
+            'response': values['response'],
+            'input_analysis': values['input_analysis'],
+            'query_info': values['query_info'],
+            'context': values['context'],
+            'credibility': values['credibility'],
+            'key_concepts': values['key_concepts'],
             'bullet_points': bullet_points,
-            'topic_summary': topic_summary,
-            'memory_results': memory_results,
-            'kg_relations': kg_relations
+            'topic_summary': values['topic_summary'],
+            'memory_results': values['memory_results'],
+            'kg_relations': values['kg_relations'],
+            'step_timings': run.timings,
+            'skipped_steps': run.skipped
         }
 
     except Exception as e:
@@ -0,0 +1,123 @@
+# src/modules/db_connection.py
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from .logging_setup import logger
+from .errors import DataProcessingError
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -20000,  # ~20 MB page cache
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+}
+
+# Stays well below SQLite's limit on bound parameters per statement
+IN_CHUNK_SIZE = 500
+
+def select_in(conn: sqlite3.Connection, sql: str, values: Sequence[Any], params: Sequence[Any] = (),
+              chunk_size: int = IN_CHUNK_SIZE) -> List[tuple]:
+    """
+    Run a query with an ``IN ({placeholders})`` list once per chunk of ``values`` and return all rows.
+
+    ``{placeholders}`` in ``sql`` becomes one ``?`` per value in the chunk;
+    ``params`` are bound before the chunk's values.
+    """
+    rows = []
+    for start in range(0, len(values), chunk_size):
+        chunk = list(values[start:start + chunk_size])
+        rows.extend(conn.execute(sql.format(placeholders=','.join('?' * len(chunk))), [*params, *chunk]).fetchall())
+    return rows
+
+class ConnectionManager:
+    """
+    Hands out one long-lived SQLite connection per thread for a database file.
+
+    Connections are opened once with WAL journaling and tuned pragmas, and
+    keep a statement cache so repeated queries reuse their prepared
+    statements. An optional schema (a script, or a function that takes the
+    connection and migrates it) is applied the first time the database is
+    opened. A connection that a caller closed is reopened on
+    the next request.
+    """
+
+    def __init__(self, db_path: Union[str, Path], schema: Optional[Union[str, Callable[[sqlite3.Connection], None]]] = None,
+                 pragmas: Optional[Dict[str, Union[str, int]]] = None, cached_statements: int = 256):
+        self.db_path = Path(db_path)
+        self.schema = schema
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = schema is None
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.total_changes
+            except sqlite3.ProgrammingError:
+                logger.debug(f"Reopening closed connection to {self.db_path}")
+                conn = None
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        if not self._schema_ready:
+            self._apply_schema(conn)
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            if self.db_path.parent != Path(''):
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, cached_statements=self.cached_statements)
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name}={value}")
+            logger.debug(f"Opened SQLite connection to {self.db_path} on thread {threading.get_ident()}")
+            return conn
+        except sqlite3.Error as e:
+            logger.error(f"Error connecting to database {self.db_path}: {str(e)}")
+            raise DataProcessingError(f"Failed to connect to database: {str(e)}")
+
+    def _apply_schema(self, conn: sqlite3.Connection):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            try:
+                if callable(self.schema):
+                    self.schema(conn)
+                else:
+                    conn.executescript(self.schema)
+            except sqlite3.Error as e:
+                # Typically an older database missing newer columns; src/utils/initialize_db.py upgrades it
+                logger.warning(f"Could not apply schema to {self.db_path}: {str(e)}")
+            self._schema_ready = True
+
+    def close(self):
+        """
+        Close the calling thread's connection, if it has one.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+_managers: Dict[Path, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+def get_connection_manager(db_path: Union[str, Path],
+                           schema: Optional[Union[str, Callable[[sqlite3.Connection], None]]] = None) -> ConnectionManager:
+    """
+    Return the shared ConnectionManager for a database file, creating it on first use.
+    """
+    key = Path(db_path).resolve()
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = ConnectionManager(db_path, schema)
+        elif schema is not None and manager.schema is None:
+            manager.schema, manager._schema_ready = schema, False
+        return manager
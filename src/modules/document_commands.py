@@ -3,13 +3,12 @@
 import os
 from typing import List
 from rich.console import Console
-from src.modules.memory_search import save_embeddings
+from src.modules.embedding_service import embed_texts
 from src.modules.save_history import save_document_chunk
 from src.modules.chunk_history import add_to_chunk_history, get_chunk_history
-from config import USER_NAME, DEFAULT_MODEL, CHUNK_SIZE, CHUNK_OVERLAP
-import ollama
+from src.modules.kb_graph import EdgeWriter
+from config import USER_NAME, DEFAULT_MODEL, EMBEDDING_MODEL, CHUNK_SIZE, CHUNK_OVERLAP
 from src.modules.logging_setup import logger
-import time
 
 console = Console()
 
@@ -62,18 +61,8 @@ def chunk_document(file_path: str, chunk_size: int = CHUNK_SIZE, overlap: int =
         start = end - overlap
     return chunks
 
-def generate_embeddings(text: str, model: str, max_retries: int = 3, retry_delay: int = 5) -> List[float]:
-    for attempt in range(max_retries):
-        try:
-            return ollama.embeddings(model=model, prompt=text)["embedding"]
-        except Exception as e:
-            logger.warning(f"Attempt {attempt + 1} failed to generate embeddings: {str(e)}")
-            if attempt < max_retries - 1:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                logger.error("Failed to generate embeddings after all attempts")
-                raise
+def generate_embeddings(text: str, model: str = EMBEDDING_MODEL) -> List[float]:
+    return embed_texts([text], model)[0]
 
 def upload_document(command: str) -> str:
     file_path = pick_file()
@@ -85,26 +74,27 @@ def upload_document(command: str) -> str:
     console.print(f"Processing file: {file_path}", style="bold green")
     chunks = chunk_document(file_path)
 
-    for i, chunk in enumerate(chunks):
-        chunk_id = f"{os.path.basename(file_path)}_chunk_{i+1}"
+    # Embed all chunks up front; the embedding service batches and parallelises the requests
+    try:
+        embeddings = embed_texts(chunks)
+    except Exception as e:
+        logger.error(f"Failed to generate embeddings for {file_path}: {str(e)}")
+        console.print("Error generating embeddings. Chunks will be indexed by the background backfill.", style="bold red")
+        embeddings = [None] * len(chunks)
 
-        # Save chunk as a separate memory
-        save_document_chunk(chunk_id, chunk, USER_NAME, DEFAULT_MODEL)
+    # Collect the chunks' graph edges into bulk transactions instead of one commit per edge
+    with EdgeWriter():
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+            chunk_id = f"{os.path.basename(file_path)}_chunk_{i+1}"
 
-        # Generate and save embeddings
-        try:
-            embeddings = generate_embeddings(chunk, DEFAULT_MODEL)
-            save_embeddings(chunk_id, embeddings)
-        except Exception as e:
-            logger.error(f"Failed to generate or save embeddings for chunk {chunk_id}: {str(e)}")
-            console.print(f"Error processing chunk {i+1}. Skipping.", style="bold red")
-            continue
+            # Save chunk as a separate memory and add its embedding to the vector index
+            save_document_chunk(chunk_id, chunk, USER_NAME, DEFAULT_MODEL, embedding=embedding)
 
-        # Add chunk to chunk history
-        add_to_chunk_history(chunk)
+            # Add chunk to chunk history
+            add_to_chunk_history(chunk)
 
-        logger.info(f"Processed chunk {i+1} of {len(chunks)}")
-        console.print(f"Processed chunk {i+1} of {len(chunks)}", style="bold green")
+            logger.info(f"Processed chunk {i+1} of {len(chunks)}")
+            console.print(f"Processed chunk {i+1} of {len(chunks)}", style="bold green")
 
     logger.info(f"Uploaded and processed {len(chunks)} chunks from {os.path.basename(file_path)}")
     console.print(f"Uploaded and processed {len(chunks)} chunks from {os.path.basename(file_path)}", style="bold green")
@@ -0,0 +1,476 @@
+# src/modules/edge_migration.py
+
+import os
+import json
+import math
+import hashlib
+import numpy as np
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Optional, Iterable, Iterator, NamedTuple, Callable, Set
+from .kb_graph import (EdgeRow, EdgeWriter, content_text, token_ids, text_ids, compare_timestamps,
+                       parse_timestamp, extract_key_concepts)
+from .memory_store import create_memory_store
+from .logging_setup import logger
+
+CONTENT_THRESHOLD = 0.3
+TITLE_THRESHOLD = 0.5
+TEMPORAL_WINDOW_SECONDS = 604800  # compare_timestamps emits nothing beyond a week
+
+class MemoryFeatures(NamedTuple):
+    """
+    Everything analyze_file_pair needs from a memory, computed once per memory.
+
+    Token sets are the sorted id arrays kb_graph's similarity functions use.
+    ``memory_id`` is the memory's id in the memory store, when known.
+    """
+    node_id: str
+    concepts: List[str]
+    content_tokens: Optional[np.ndarray]
+    tags: Optional[np.ndarray]
+    title_tokens: Optional[np.ndarray]
+    timestamp: Optional[str]
+    time: Optional[datetime]
+    memory_id: Optional[str] = None
+
+def memory_node_id(data: Any) -> str:
+    return hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+def extract_features(data: Dict[str, Any], memory_id: Optional[str] = None) -> MemoryFeatures:
+    time = None
+    if 'timestamp' in data:
+        try:
+            time = parse_timestamp(data['timestamp'])
+        except (TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Unparseable timestamp {data['timestamp']!r}: {str(e)}")
+    return MemoryFeatures(
+        node_id=memory_node_id(data),
+        concepts=extract_key_concepts(data),
+        content_tokens=text_ids(content_text(data['content'])) if 'content' in data else None,
+        tags=token_ids(data['tags']) if 'tags' in data else None,
+        title_tokens=text_ids(data['title']) if 'title' in data else None,
+        timestamp=data.get('timestamp'),
+        time=time,
+        memory_id=memory_id,
+    )
+
+def _gather(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Concatenate the slices ``values[start:start + length]`` without a Python loop.
+    """
+    offsets = np.cumsum(lengths) - lengths
+    return values[np.repeat(starts - offsets, lengths) + np.arange(offsets[-1] + lengths[-1] if lengths.size else 0)]
+
+class MemoryRecord(NamedTuple):
+    """
+    The part of a memory's features EdgeGenerator keeps once its token sets are indexed.
+    """
+    node_id: str
+    concepts: List[str]
+    timestamp: Optional[str]
+    time: Optional[datetime]
+    memory_id: Optional[str]
+
+class SimilarityJoin:
+    """
+    Finds, for each token set, the earlier sets whose Jaccard similarity exceeds a threshold.
+
+    Token sets are kb_graph token id arrays (strings are hashed with
+    ``token_ids``), added one at a time. The index is (re)built on the
+    first probe after an add: all records are packed into one flat ``int32``
+    array of dense token ranks, with tokens ranked by
+    ascending document frequency and only each set's prefix of its
+    ``|x| - ceil(t * |x|) + 1`` rarest tokens is indexed, since two sets with
+    similarity of at least ``t`` must share a prefix token. A probe counts
+    the prefix tokens it shares with each earlier record, drops records
+    outside the length bounds ``t * |x| <= |y| <= |x| / t`` or that cannot
+    reach the overlap the threshold needs even if every remaining token
+    matched, and verifies the exact overlap of the rest.
+    """
+
+    EPSILON = 1e-9
+
+    def __init__(self, threshold: float, token_sets: Iterable[Optional[Iterable]] = ()):
+        self.threshold = threshold
+        self.pending: List[np.ndarray] = []
+        self.token_ids = np.zeros(0, dtype=np.int64)  # rank -> token id
+        self.tokens = np.zeros(0, dtype=np.int32)
+        self.sizes = np.zeros(0, dtype=np.int64)
+        self.owners: Optional[np.ndarray] = None
+        for tokens in token_sets:
+            self.add(tokens)
+
+    def __len__(self) -> int:
+        return len(self.sizes) + len(self.pending)
+
+    def add(self, tokens: Optional[Iterable]) -> int:
+        """
+        Add a token id array (or an iterable of token strings) and return its record position.
+        """
+        if tokens is None:
+            tokens = np.zeros(0, dtype=np.int64)
+        self.pending.append(tokens if isinstance(tokens, np.ndarray) else token_ids(tokens))
+        self.owners = None
+        return len(self) - 1
+
+    def prefix_length(self, size: int) -> int:
+        if self.threshold <= 0:
+            return size
+        return min(size, size - math.ceil(self.threshold * size - self.EPSILON) + 1)
+
+    def build(self):
+        """
+        Rank tokens by document frequency and index every record's prefix.
+        """
+        sizes = np.concatenate([self.sizes, np.fromiter((ids.size for ids in self.pending), dtype=np.int64, count=len(self.pending))])
+        unique_ids, dense = np.unique(np.concatenate([self.token_ids[self.tokens], *self.pending]), return_inverse=True)
+        frequencies = np.bincount(dense, minlength=unique_ids.size)
+        order = np.argsort(frequencies, kind='stable')
+        rank = np.empty(unique_ids.size, dtype=np.int32)
+        rank[order] = np.arange(unique_ids.size, dtype=np.int32)
+        self.token_ids = unique_ids[order]
+        # Store tokens as ranks and sort each record, so its prefix is simply its first ranks
+        tokens = rank[dense.ravel()]
+        owners = np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
+        self.tokens, self.sizes, self.pending = tokens[np.lexsort((tokens, owners))], sizes, []
+        self.starts = np.cumsum(sizes) - sizes
+
+        prefix_sizes = np.fromiter((self.prefix_length(size) for size in sizes.tolist()), dtype=np.int64, count=len(sizes))
+        prefix_tokens = _gather(self.tokens, self.starts, prefix_sizes)
+        order = np.argsort(prefix_tokens, kind='stable')  # stable: each posting list stays in record order
+        self.bounds = np.searchsorted(prefix_tokens[order], np.arange(len(frequencies) + 1))
+        self.owners = np.repeat(np.arange(len(sizes), dtype=np.int32), prefix_sizes)[order]
+        # Postings sorted by (token, record) as one key, so a probe can cut every list at itself
+        self.stride = max(1, len(sizes))
+        self.keys = prefix_tokens[order].astype(np.int64) * self.stride + self.owners
+        self.suffix_sizes = sizes - prefix_sizes
+        self.prefix_ends = np.full(len(sizes), -1, dtype=np.int64)
+        indexed = prefix_sizes > 0
+        self.prefix_ends[indexed] = self.tokens[(self.starts + prefix_sizes - 1)[indexed]]
+        self._mask = np.zeros(len(frequencies), dtype=bool)
+
+    def probe(self, record: int) -> Iterator[Tuple[int, float]]:
+        """
+        Yield (earlier record, similarity) pairs above the threshold, in record order.
+        """
+        if self.owners is None:
+            self.build()
+        size = int(self.sizes[record])
+        if not size:
+            return
+        tokens = self.tokens[self.starts[record]:self.starts[record] + size]
+        prefix = tokens[:self.prefix_length(size)]
+        starts = self.bounds[prefix]
+        lengths = np.searchsorted(self.keys, prefix.astype(np.int64) * self.stride + record) - starts
+        hits = _gather(self.owners, starts, lengths)
+        if not hits.size:
+            return
+        counts = np.bincount(hits)
+        candidates = np.flatnonzero(counts)
+        sizes = self.sizes[candidates]
+        common = counts[candidates]
+        if self.threshold > 0:
+            # Tokens are in rank order, so whichever prefix ends on the lower rank shares
+            # nothing with the other's suffix: at most its own suffix can still match
+            suffix = np.where(self.prefix_ends[candidates] >= prefix[-1], size - prefix.size, self.suffix_sizes[candidates])
+            keep = ((sizes >= self.threshold * size - self.EPSILON) &
+                    (sizes * self.threshold <= size + self.EPSILON) &
+                    (common + suffix >= self.threshold / (1 + self.threshold) * (size + sizes) - self.EPSILON))
+            candidates, sizes = candidates[keep], sizes[keep]
+            if not candidates.size:
+                return
+            # Exact overlaps: mark this record's tokens, then sum the marks over each candidate's tokens
+            self._mask[tokens] = True
+            marked = self._mask[_gather(self.tokens, self.starts[candidates], sizes)]
+            self._mask[tokens] = False
+            common = np.add.reduceat(marked, np.cumsum(sizes) - sizes)
+        # With no threshold the prefix is the whole set, so the counts are already exact
+        similarities = common / (size + sizes - common)
+        keep = similarities > self.threshold
+        for candidate, similarity in zip(candidates[keep].tolist(), similarities[keep].tolist()):
+            yield candidate, similarity
+
+class EdgeGenerator:
+    """
+    Computes the edges analyze_file_pair would create between every pair of memories,
+    plus each memory's update_knowledge_graph concept edges and, when its
+    store id is known, the STORED_AS edge add_memory_to_edge_kb writes.
+
+    Edges run from the earlier memory (in the order memories are added) to
+    the later one. Memories are added one at a time: their token sets go
+    into a SimilarityJoin per edge category (content tokens, tags and title
+    tokens) as interned id arrays and only a MemoryRecord is kept, so memory
+    grows with the compact index rather than with the parsed memories.
+    Temporal edges link each memory to its ``temporal_neighbors`` nearest
+    later-timestamped memories within a week (all of them when None). Once
+    ``prepare`` has built the indexes, ``edges_for`` can produce the edges
+    of any subset of memories.
+    """
+
+    def __init__(self, features: Iterable[MemoryFeatures] = (), temporal_neighbors: Optional[int] = 10):
+        self.temporal_neighbors = temporal_neighbors
+        self.records: List[MemoryRecord] = []
+        self.joins = [
+            (SimilarityJoin(CONTENT_THRESHOLD), "content_tokens", "SIMILAR_CONTENT"),
+            (SimilarityJoin(0.0), "tags", "SHARED_TAGS"),
+            (SimilarityJoin(TITLE_THRESHOLD), "title_tokens", "RELATED_TOPIC"),
+        ]
+        self.temporal: Optional[Dict[int, List[Tuple[int, str, float]]]] = None
+        self.extend(features)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, feature: MemoryFeatures):
+        for join, field, _ in self.joins:
+            join.add(getattr(feature, field))
+        self.records.append(MemoryRecord(feature.node_id, feature.concepts, feature.timestamp, feature.time, feature.memory_id))
+        self.temporal = None
+
+    def extend(self, features: Iterable[MemoryFeatures]):
+        for feature in features:
+            self.add(feature)
+
+    def prepare(self):
+        """
+        Build the similarity indexes and temporal edges ahead of ``edges_for``.
+        """
+        for join, _, _ in self.joins:
+            if join.owners is None:
+                join.build()
+        if self.temporal is None:
+            self.temporal = temporal_edges(self.records, self.temporal_neighbors)
+
+    def edges_for(self, records: Iterable[int]) -> Iterator[EdgeRow]:
+        """
+        Yield the edges whose later memory is one of ``records`` (positions in the order added).
+        """
+        self.prepare()
+        memories = self.records
+        for j in records:
+            memory = memories[j]
+            if memory.memory_id:
+                yield (memory.node_id, memory.memory_id, "STORED_AS", 1.0)
+            yield from ((memory.node_id, concept, "RELATED_TO", 1.0) for concept in memory.concepts)
+            for join, _, category in self.joins:
+                for i, similarity in join.probe(j):
+                    yield (memories[i].node_id, memory.node_id, category, similarity)
+            for i, relation, strength in self.temporal.get(j, ()):
+                yield (memories[i].node_id, memory.node_id, relation, strength)
+
+def generate_edges(features: List[MemoryFeatures], temporal_neighbors: Optional[int] = 10,
+                   records: Optional[Iterable[int]] = None) -> Iterator[EdgeRow]:
+    """
+    Yield every migration edge for ``features``, or only those whose later memory is in ``records``.
+    """
+    generator = EdgeGenerator(features, temporal_neighbors)
+    return generator.edges_for(range(len(generator)) if records is None else records)
+
+def temporal_edges(features: List[MemoryRecord], neighbors: Optional[int] = 10) -> Dict[int, List[Tuple[int, str, float]]]:
+    """
+    Map each memory position to its (earlier position, relation, strength) temporal edges.
+
+    Memories are swept in timestamp order, so each one is only compared with
+    the memories that follow it within the week-long window.
+    """
+    timed = sorted(((feature.time, i) for i, feature in enumerate(features) if feature.time is not None),
+                   key=lambda item: (item[0].timestamp(), item[1]))
+    edges: Dict[int, List[Tuple[int, str, float]]] = defaultdict(list)
+    for position, (time, i) in enumerate(timed):
+        linked = 0
+        for other_time, j in (timed[k] for k in range(position + 1, len(timed))):
+            if neighbors is not None and linked >= neighbors:
+                break
+            try:
+                if (other_time - time).total_seconds() >= TEMPORAL_WINDOW_SECONDS:
+                    break
+            except TypeError:
+                continue  # naive and aware timestamps cannot be compared
+            relation = compare_timestamps(features[i].timestamp, features[j].timestamp)
+            if relation:
+                first, second = min(i, j), max(i, j)
+                edges[second].append((first, *relation))
+                linked += 1
+    return edges
+
+def migrate_memories(memories: Iterable[Dict[str, Any]], temporal_neighbors: Optional[int] = 10,
+                     writer: Optional[EdgeWriter] = None,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Build the edge graph for a stream of memories.
+
+    Each memory is featurised and added to an EdgeGenerator as it is read,
+    so only the interned token sets are kept in memory, and edges are
+    streamed to an EdgeWriter in bulk transactions.
+
+    Returns:
+        int: Number of edges written.
+    """
+    generator = EdgeGenerator(temporal_neighbors=temporal_neighbors)
+    for data in memories:
+        try:
+            generator.add(extract_features(data))
+        except Exception as e:
+            logger.error(f"Error extracting features from memory: {str(e)}")
+    logger.info(f"Extracted features for {len(generator)} memories")
+
+    with (writer or EdgeWriter()) as edge_writer:
+        written = 0
+        for edge in generator.edges_for(range(len(generator))):
+            edge_writer.add(*edge)
+            written += 1
+            if progress_callback and written % 10000 == 0:
+                progress_callback(written, len(generator))
+    logger.info(f"Edge migration wrote {written} edges for {len(generator)} memories")
+    return written
+
+def load_features(source: str, keys: List[str]) -> List[Optional[MemoryFeatures]]:
+    """
+    Read and featurise a batch of memories; ``None`` marks a memory that could not be read.
+
+    Args:
+        source (str): ``"json"`` when ``keys`` are JSON file paths, ``"store"`` when
+            they are ids in the configured memory store.
+        keys (List[str]): The memories to load.
+    """
+    if source == "json":
+        memories = []
+        for key in keys:
+            try:
+                with open(key, 'r', encoding='utf-8') as f:
+                    memories.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading memory file {key}: {str(e)}")
+                memories.append(None)
+    else:
+        # Opened per call rather than shared: worker processes must not reuse a forked SQLite handle
+        store = create_memory_store()
+        found = store.get_many(keys)
+        store.close()
+        memories = [found.get(key) for key in keys]
+
+    # JSON memories are stored under their file name
+    memory_ids = [Path(key).name for key in keys] if source == "json" else keys
+    features = []
+    for data, memory_id in zip(memories, memory_ids):
+        try:
+            features.append(extract_features(data, memory_id) if isinstance(data, dict) else None)
+        except Exception as e:
+            logger.error(f"Error extracting features from memory: {str(e)}")
+            features.append(None)
+    return features
+
+_worker_generator: Optional[EdgeGenerator] = None
+
+def _init_edge_worker(generator: EdgeGenerator):
+    global _worker_generator
+    _worker_generator = generator
+
+def _edges_for_shard(shard: int, start: int, end: int) -> Tuple[int, List[EdgeRow]]:
+    return shard, list(_worker_generator.edges_for(range(start, end)))
+
+def _load_checkpoint(path: Optional[Path], fingerprint: str) -> Set[int]:
+    if path is None or not path.exists():
+        return set()
+    try:
+        checkpoint = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable migration checkpoint {path}: {str(e)}")
+        return set()
+    if checkpoint.get("fingerprint") != fingerprint:
+        logger.info("Memories changed since the last checkpoint; starting the migration from scratch")
+        return set()
+    return set(checkpoint.get("completed_shards", []))
+
+def _save_checkpoint(path: Optional[Path], fingerprint: str, completed: Set[int]):
+    if path is None:
+        return
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    temp_path.write_text(json.dumps({"fingerprint": fingerprint, "completed_shards": sorted(completed)}), encoding='utf-8')
+    os.replace(temp_path, path)
+
+def migrate_parallel(source: str, keys: List[str], workers: Optional[int] = None, shard_size: int = 500,
+                     temporal_neighbors: Optional[int] = 10, checkpoint_path: Optional[Path] = None,
+                     progress_callback: Optional[Callable[[int, int, int], None]] = None) -> int:
+    """
+    Build the edge graph using a pool of worker processes and a single writer.
+
+    Workers parse and featurise the memories a batch at a time, and the
+    calling process adds each batch to an EdgeGenerator as it arrives, so
+    only the interned index outlives a batch. Each worker then computes the edges
+    of one shard of ``shard_size`` memories at a time. The calling process
+    is the only one that touches the database: it bulk-inserts each shard's
+    edges as they arrive and records the shard in ``checkpoint_path``, so a
+    crashed run resumes with the shards that were not yet written.
+
+    Args:
+        source (str): ``"json"`` for JSON file paths or ``"store"`` for memory store ids.
+        keys (List[str]): Memories to migrate.
+        workers (Optional[int]): Worker processes (CPU count when None; 1 runs in-process).
+        shard_size (int): Memories per unit of work and per checkpoint step.
+        temporal_neighbors (Optional[int]): Cap on temporal edges per memory.
+        checkpoint_path (Optional[Path]): File recording completed shards; removed on success.
+        progress_callback (Optional[Callable[[int, int, int], None]]): Called with
+            (completed shards, total shards, edges written) after each shard.
+
+    Returns:
+        int: Number of edges written in this run.
+    """
+    global _worker_generator
+    workers = max(1, workers or os.cpu_count() or 1)
+    keys = sorted(keys)
+    batches = [keys[i:i + shard_size] for i in range(0, len(keys), shard_size)]
+
+    generator = EdgeGenerator(temporal_neighbors=temporal_neighbors)
+    if workers == 1:
+        for batch in batches:
+            generator.extend(feature for feature in load_features(source, batch) if feature is not None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for loaded in pool.map(load_features, [source] * len(batches), batches):
+                generator.extend(feature for feature in loaded if feature is not None)
+    total = len(generator)
+    logger.info(f"Extracted features for {total} of {len(keys)} memories using {workers} workers")
+
+    fingerprint = hashlib.md5(json.dumps([temporal_neighbors, shard_size, [(r.node_id, r.memory_id) for r in generator.records]]).encode()).hexdigest()
+    completed = _load_checkpoint(checkpoint_path, fingerprint)
+    shards = [(shard, start, min(start + shard_size, total))
+              for shard, start in enumerate(range(0, total, shard_size))]
+    pending = [shard for shard in shards if shard[0] not in completed]
+    if completed:
+        logger.info(f"Resuming edge migration: {len(completed)} of {len(shards)} shards already written")
+
+    written = 0
+    with EdgeWriter() as writer:
+        def record(shard: int, edges: List[EdgeRow]):
+            nonlocal written
+            writer.add_many(edges)
+            writer.flush()
+            written += len(edges)
+            completed.add(shard)
+            _save_checkpoint(checkpoint_path, fingerprint, completed)
+            if progress_callback:
+                progress_callback(len(completed), len(shards), written)
+
+        # Built once here so forked workers share the indexes instead of each rebuilding them
+        generator.prepare()
+        if workers == 1:
+            _init_edge_worker(generator)
+            try:
+                for shard in pending:
+                    record(*_edges_for_shard(*shard))
+            finally:
+                _worker_generator = None
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_edge_worker,
+                                     initargs=(generator,)) as pool:
+                futures = [pool.submit(_edges_for_shard, *shard) for shard in pending]
+                for future in as_completed(futures):
+                    record(*future.result())
+
+    if checkpoint_path is not None and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    logger.info(f"Edge migration wrote {written} edges for {total} memories")
+    return written
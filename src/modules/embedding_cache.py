@@ -0,0 +1,120 @@
+# src/modules/embedding_cache.py
+
+import re
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Tuple, Iterable
+from .logging_setup import logger
+from .db_connection import get_connection_manager, select_in
+
+EMBEDDING_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS embeddings (
+        key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        dim INTEGER NOT NULL,
+        vector BLOB NOT NULL
+    );
+"""
+
+def normalize_text(text: str) -> str:
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+def cache_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+
+    Entries are keyed by a SHA-256 of the model name and the normalised text
+    and stored as float32 blobs in a single SQLite file, with a bounded
+    in-memory LRU of float32 arrays in front of it. Each model's vectors carry their dimension;
+    if a model starts returning a different dimension its stale entries are
+    dropped rather than mixed with the new ones.
+    """
+
+    def __init__(self, db_path: Path, max_memory_items: int = 4096):
+        self.db_path = Path(db_path)
+        self.max_memory_items = max_memory_items
+        self.memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.model_dims: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.connections = get_connection_manager(self.db_path, EMBEDDING_CACHE_SCHEMA)
+        try:
+            for model, dim in self.connections.get_connection().execute("SELECT model, MAX(dim) FROM embeddings GROUP BY model"):
+                self.model_dims[model] = dim
+        except sqlite3.Error as e:
+            logger.error(f"Error reading embedding cache {self.db_path}: {str(e)}")
+
+    def get_many(self, texts: Iterable[str], model: str) -> Dict[str, List[float]]:
+        """
+        Return cached vectors for whichever of ``texts`` are present, keyed by text.
+        """
+        arrays, missing = {}, {}
+        with self.lock:
+            for text in texts:
+                key = cache_key(text, model)
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    arrays[text] = self.memory[key]
+                else:
+                    missing.setdefault(key, []).append(text)
+
+            if missing:
+                keys = list(missing)
+                expected_dim = self.model_dims.get(model)
+                try:
+                    rows = select_in(self.connections.get_connection(),
+                                     "SELECT key, dim, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                                     keys, (model,))
+                    for key, dim, blob in rows:
+                        if expected_dim is not None and dim != expected_dim:
+                            continue
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        self._remember(key, vector)
+                        for text in missing[key]:
+                            arrays[text] = vector
+                except sqlite3.Error as e:
+                    logger.error(f"Error reading embedding cache: {str(e)}")
+        # Callers get plain lists; the cache itself keeps the compact arrays
+        return {text: vector.tolist() for text, vector in arrays.items()}
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]], model: str):
+        rows = []
+        conn = self.connections.get_connection()
+        with self.lock:
+            try:
+                with conn:
+                    for text, vector in items:
+                        array = np.array(vector, dtype=np.float32).ravel()
+                        if self.model_dims.get(model) != array.shape[0]:
+                            self._reset_model(conn, model, array.shape[0])
+                        key = cache_key(text, model)
+                        self._remember(key, array)
+                        rows.append((key, model, array.shape[0], array.tobytes()))
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)", rows
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Error writing to embedding cache: {str(e)}")
+
+    def _reset_model(self, conn: sqlite3.Connection, model: str, dim: int):
+        if model in self.model_dims:
+            logger.warning(f"Embedding dimension for {model} changed from {self.model_dims[model]} to {dim}; dropping cached vectors")
+            conn.execute("DELETE FROM embeddings WHERE model = ? AND dim != ?", (model, dim))
+            self.memory.clear()
+        self.model_dims[model] = dim
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+
+    def close(self):
+        self.connections.close()
@@ -0,0 +1,118 @@
+# src/modules/embedding_service.py
+
+import time
+import threading
+import ollama
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from config import EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_WORKERS, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MEMORY_ITEMS
+from .logging_setup import logger
+from .errors import ModelInferenceError
+from .embedding_cache import EmbeddingCache
+
+class EmbeddingService:
+    """
+    Generates embeddings through the Ollama server in deduplicated batches,
+    with a bounded number of requests in flight and exponential-backoff retries.
+    Texts found in the optional content-addressed cache never reach the server.
+    """
+
+    def __init__(self, model: str = EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE,
+                 max_workers: int = EMBEDDING_MAX_WORKERS, max_retries: int = 3, retry_delay: float = 1.0,
+                 cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(1, max_retries)
+        self.retry_delay = retry_delay
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="embedding")
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, float] = {
+            "requests": 0,
+            "texts": 0,
+            "duplicates": 0,
+            "cache_hits": 0,
+            "retries": 0,
+            "failures": 0,
+            "seconds": 0.0
+        }
+
+    def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        return self.embed_many([text], model)[0]
+
+    def embed_many(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """
+        Embed a list of texts, returning one vector per input text in input order.
+
+        Identical texts are embedded once and cached texts are not embedded at
+        all. The remaining texts are split into batches of ``batch_size`` that
+        run concurrently on the worker pool.
+
+        Raises:
+            ModelInferenceError: If any batch still fails after all retries.
+        """
+        if not texts:
+            return []
+        model = model or self.model
+        unique_texts = list(dict.fromkeys(texts))
+        vectors = self.cache.get_many(unique_texts, model) if self.cache else {}
+        pending = [text for text in unique_texts if text not in vectors]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+
+        start = time.perf_counter()
+        futures = [self.executor.submit(self._embed_batch, batch, model) for batch in batches]
+        for batch, future in zip(batches, futures):
+            embeddings = future.result()
+            vectors.update(zip(batch, embeddings))
+            if self.cache:
+                self.cache.put_many(zip(batch, embeddings), model)
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.metrics["texts"] += len(pending)
+            self.metrics["duplicates"] += len(texts) - len(unique_texts)
+            self.metrics["cache_hits"] += len(unique_texts) - len(pending)
+            self.metrics["seconds"] += elapsed
+        logger.debug(f"Embedded {len(pending)} texts in {len(batches)} batches ({elapsed:.2f}s), {len(unique_texts) - len(pending)} from cache")
+        return [vectors[text] for text in texts]
+
+    def _embed_batch(self, texts: List[str], model: str) -> List[List[float]]:
+        for attempt in range(self.max_retries):
+            with self.lock:
+                self.metrics["requests"] += 1
+            try:
+                embeddings = ollama.embed(model=model, input=texts)["embeddings"]
+                if len(embeddings) != len(texts):
+                    raise ModelInferenceError(f"Expected {len(texts)} embeddings, received {len(embeddings)}")
+                return embeddings
+            except Exception as e:
+                logger.warning(f"Attempt {attempt + 1} failed to embed batch of {len(texts)} texts: {str(e)}")
+                if attempt < self.max_retries - 1:
+                    with self.lock:
+                        self.metrics["retries"] += 1
+                    time.sleep(self.retry_delay * (2 ** attempt))
+                else:
+                    with self.lock:
+                        self.metrics["failures"] += 1
+                    logger.error(f"Failed to embed batch of {len(texts)} texts after {self.max_retries} attempts")
+                    raise ModelInferenceError(f"Failed to generate embeddings: {str(e)}") from e
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Return request counters plus throughput in texts per second of embedding wall time.
+        """
+        with self.lock:
+            metrics = dict(self.metrics)
+        metrics["texts_per_second"] = metrics["texts"] / metrics["seconds"] if metrics["seconds"] else 0.0
+        return metrics
+
+default_embedding_service = EmbeddingService(cache=EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MEMORY_ITEMS))
+
+def embed_text(text: str, model: Optional[str] = None) -> List[float]:
+    return default_embedding_service.embed(text, model)
+
+def embed_texts(texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+    return default_embedding_service.embed_many(texts, model)
+
+__all__ = ['EmbeddingService', 'embed_text', 'embed_texts', 'default_embedding_service']
@@ -0,0 +1,241 @@
+# src/modules/graph_snapshot.py
+
+import sqlite3
+import threading
+import time
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from .logging_setup import logger
+from .errors import DataProcessingError
+
+class GraphSnapshot:
+    """
+    Read-optimised, in-memory copy of the ``edges`` view.
+
+    Node ids and relationship types are interned to integers and edges are
+    held as compressed sparse row arrays, once ordered by source (out-edges)
+    and once by target (in-edges), with relationship type and strength
+    columns. Neighbour lookups are array slices and never touch SQLite.
+
+    The snapshot loads on first use. ``refresh`` then reads only rows whose
+    ``updated_at`` is newer than the newest one already seen: strengths of
+    known edges are updated in place and new edges go to a small overlay
+    that is folded into the arrays once it grows. Deleted edges leave
+    nothing to read, so every delete bumps the ``edge_deletions`` counter
+    (see ``schema.CHANGE_TRIGGERS``) and a refresh that finds the counter
+    changed reloads the snapshot instead.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], refresh_interval: float = 5.0,
+                 compact_threshold: int = 10000):
+        self.connect = connect
+        self.refresh_interval = refresh_interval
+        self.compact_threshold = compact_threshold
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.stale = False
+        self.node_ids: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.rel_types: List[str] = []
+        self.rel_index: Dict[str, int] = {}
+        self._watermark: Optional[str] = None
+        self._deletions = 0
+        self._last_refresh = 0.0
+        self._set_arrays(np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0))
+
+    def __len__(self) -> int:
+        with self.lock:
+            return int(self.out_targets.size) + len(self._extra)
+
+    def _intern(self, table: List[str], index: Dict[str, int], value: str) -> int:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(table)
+            table.append(value)
+        return code
+
+    def _set_arrays(self, sources: np.ndarray, targets: np.ndarray, rels: np.ndarray, strengths: np.ndarray):
+        n = len(self.node_ids)
+        out_order = np.argsort(sources, kind='stable')
+        self.out_indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=n)))).astype(np.int64)
+        self.out_targets = targets[out_order]
+        self.out_rels = rels[out_order]
+        self.out_strengths = strengths[out_order].astype(np.float64)
+        # In-edges point back into the out arrays so in-place strength updates show up in both
+        out_sources = sources[out_order]
+        self.in_edges = np.argsort(self.out_targets, kind='stable')
+        self.in_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.out_targets, minlength=n)))).astype(np.int64)
+        self.in_sources = out_sources[self.in_edges]
+        self._extra: Dict[Tuple[int, int, int], float] = {}
+        self._extra_out: Dict[int, List[Tuple[int, int, int]]] = {}
+        self._extra_in: Dict[int, List[Tuple[int, int, int]]] = {}
+
+    def _fetch(self, since: Optional[str] = None) -> List[Tuple[str, str, str, float, Optional[str]]]:
+        query = "SELECT source_id, target_id, relationship_type, strength, updated_at FROM edges"
+        try:
+            if since is None:
+                return self.connect().execute(query).fetchall()
+            return self.connect().execute(query + " WHERE updated_at > ?", (since,)).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading edges for graph snapshot: {str(e)}")
+            raise DataProcessingError(f"Failed to load graph snapshot: {str(e)}")
+
+    def _deletion_count(self) -> int:
+        try:
+            row = self.connect().execute("SELECT value FROM graph_counters WHERE name = 'edge_deletions'").fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading edge deletion counter for graph snapshot: {str(e)}")
+            raise DataProcessingError(f"Failed to refresh graph snapshot: {str(e)}")
+        return row[0] if row else 0
+
+    def _advance_watermark(self, rows):
+        stamps = [row[4] for row in rows if row[4] is not None]
+        if stamps:
+            newest = max(stamps)
+            if self._watermark is None or newest > self._watermark:
+                self._watermark = newest
+        # updated_at has one-second resolution, so rows written later in the
+        # current second must still be newer than the watermark
+        previous_second = (datetime.now(timezone.utc) - timedelta(seconds=1)).strftime('%Y-%m-%d %H:%M:%S')
+        if self._watermark is not None and self._watermark > previous_second:
+            self._watermark = previous_second
+
+    def load(self):
+        """
+        Read the whole edges table and rebuild the arrays.
+        """
+        with self.lock:
+            start = time.perf_counter()
+            # Read before the rows, so a delete racing with the load shows up at the next refresh
+            self._deletions = self._deletion_count()
+            rows = self._fetch()
+            self.node_ids, self.node_index, self.rel_types, self.rel_index = [], {}, [], {}
+            self._watermark = None
+            count = len(rows)
+            sources, targets, rels = np.empty(count, np.int32), np.empty(count, np.int32), np.empty(count, np.int32)
+            strengths = np.empty(count)
+            for i, (source_id, target_id, rel_type, strength, _) in enumerate(rows):
+                sources[i] = self._intern(self.node_ids, self.node_index, source_id)
+                targets[i] = self._intern(self.node_ids, self.node_index, target_id)
+                rels[i] = self._intern(self.rel_types, self.rel_index, rel_type)
+                strengths[i] = strength
+            self._set_arrays(sources, targets, rels, strengths)
+            self._advance_watermark(rows)
+            self.loaded, self.stale = True, False
+            self._last_refresh = time.monotonic()
+            logger.info(f"Loaded graph snapshot: {count} edges, {len(self.node_ids)} nodes in {time.perf_counter() - start:.2f}s")
+
+    def refresh(self) -> int:
+        """
+        Apply edges added or updated since the last load or refresh.
+
+        Returns:
+            int: Number of changed rows read.
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+                return len(self)
+            if self._deletion_count() != self._deletions:
+                logger.info("Edges were deleted since the graph snapshot was built; reloading")
+                self.load()
+                return len(self)
+            rows = self._fetch(self._watermark) if self._watermark is not None else self._fetch()
+            for source_id, target_id, rel_type, strength, _ in rows:
+                self._apply(source_id, target_id, rel_type, strength)
+            self._advance_watermark(rows)
+            if len(self._extra) > self.compact_threshold:
+                self.compact()
+            self.stale = False
+            self._last_refresh = time.monotonic()
+            return len(rows)
+
+    def _apply(self, source_id: str, target_id: str, rel_type: str, strength: float):
+        source = self._intern(self.node_ids, self.node_index, source_id)
+        target = self._intern(self.node_ids, self.node_index, target_id)
+        rel = self._intern(self.rel_types, self.rel_index, rel_type)
+        if source + 1 < self.out_indptr.size:
+            start, end = self.out_indptr[source], self.out_indptr[source + 1]
+            match = np.flatnonzero((self.out_targets[start:end] == target) & (self.out_rels[start:end] == rel))
+            if match.size:
+                self.out_strengths[start + match[0]] = strength
+                return
+        key = (source, target, rel)
+        if key not in self._extra:
+            self._extra_out.setdefault(source, []).append(key)
+            self._extra_in.setdefault(target, []).append(key)
+        self._extra[key] = strength
+
+    def compact(self):
+        """
+        Fold the overlay of new edges into the CSR arrays.
+        """
+        with self.lock:
+            if not self._extra:
+                return
+            keys = np.array(list(self._extra), dtype=np.int32).reshape(-1, 3)
+            out_sources = np.repeat(np.arange(self.out_indptr.size - 1, dtype=np.int32), np.diff(self.out_indptr))
+            self._set_arrays(
+                np.concatenate((out_sources, keys[:, 0])),
+                np.concatenate((self.out_targets, keys[:, 1])),
+                np.concatenate((self.out_rels, keys[:, 2])),
+                np.concatenate((self.out_strengths, np.fromiter(self._extra.values(), float, len(self._extra)))),
+            )
+
+    def ensure_fresh(self):
+        """
+        Load on first use, then refresh when marked stale or ``refresh_interval`` has passed.
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            elif self.stale or time.monotonic() - self._last_refresh >= self.refresh_interval:
+                self.refresh()
+
+    def _edges(self, node_id: str, relationship_type: Optional[str]) -> Tuple[List[Tuple[str, str, float]], List[Tuple[str, str, float]]]:
+        node = self.node_index.get(node_id)
+        rel = self.rel_index.get(relationship_type) if relationship_type else None
+        if node is None or (relationship_type and rel is None):
+            return [], []
+        result = []
+        for indptr, others, positions, extra, side in (
+            (self.out_indptr, self.out_targets, None, self._extra_out, 1),
+            (self.in_indptr, self.in_sources, self.in_edges, self._extra_in, 0),
+        ):
+            edges = []
+            if node + 1 < indptr.size:
+                span = slice(indptr[node], indptr[node + 1])
+                edge_ids = np.arange(span.start, span.stop) if positions is None else positions[span]
+                neighbours = others[span]
+                rels, strengths = self.out_rels[edge_ids], self.out_strengths[edge_ids]
+                if rel is not None:
+                    keep = rels == rel
+                    neighbours, rels, strengths = neighbours[keep], rels[keep], strengths[keep]
+                edges = [(self.node_ids[other], self.rel_types[code], float(strength))
+                         for other, code, strength in zip(neighbours.tolist(), rels.tolist(), strengths.tolist())]
+            for key in extra.get(node, ()):
+                if rel is None or key[2] == rel:
+                    edges.append((self.node_ids[key[side]], self.rel_types[key[2]], self._extra[key]))
+            result.append(edges)
+        return result[0], result[1]
+
+    def related_nodes(self, node_id: str, relationship_type: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        """
+        Same rows as ``kb_graph.get_related_nodes``: out- and in-neighbours with duplicates removed.
+        """
+        self.ensure_fresh()
+        with self.lock:
+            outgoing, incoming = self._edges(node_id, relationship_type)
+        return list(dict.fromkeys(outgoing + incoming))
+
+    def strongest_neighbors(self, node_id: str, limit: Optional[int] = None,
+                            relationship_type: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        """
+        Same rows as ``kb_graph.get_strongest_neighbors``.
+        """
+        self.ensure_fresh()
+        with self.lock:
+            outgoing, incoming = self._edges(node_id, relationship_type)
+        edges = sorted(outgoing + incoming, key=lambda edge: -edge[2])
+        return edges[:limit] if limit is not None else edges
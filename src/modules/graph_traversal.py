@@ -0,0 +1,206 @@
+# src/modules/graph_traversal.py
+
+import heapq
+import math
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .kb_graph import get_strongest_neighbors
+from .logging_setup import logger
+
+# (node_id, limit, relationship_type) -> [(neighbour_id, relationship_type, strength), ...], strongest first
+NeighborLookup = Callable[[str, Optional[int], Optional[str]], List[Tuple[str, str, float]]]
+
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_MAX_FANOUT = 25
+DEFAULT_MAX_NODES = 2000
+# Each expansion is one neighbour lookup; ~100 keeps a query near 10 ms against SQLite
+DEFAULT_MAX_EXPANSIONS = 100
+
+class TraversalHit(NamedTuple):
+    node_id: str
+    score: float
+    hops: int
+    relationship_type: str  # type of the last edge on the best path
+
+class _Adjacency:
+    """
+    Fan-out limited, memoised neighbour lists for the duration of one traversal.
+
+    Edges are treated as undirected. Parallel edges to the same neighbour
+    collapse to the strongest one, and self loops and edges of the
+    ``exclude`` types are dropped.
+    """
+
+    def __init__(self, neighbors: Optional[NeighborLookup], max_fanout: Optional[int],
+                 relationship_type: Optional[str], exclude: Iterable[str] = ()):
+        self.lookup = neighbors or get_strongest_neighbors
+        self.max_fanout = max_fanout
+        self.relationship_type = relationship_type
+        self.exclude = frozenset(exclude)
+        self._cache: Dict[str, List[Tuple[str, str, float]]] = {}
+
+    def __call__(self, node_id: str) -> List[Tuple[str, str, float]]:
+        adjacent = self._cache.get(node_id)
+        if adjacent is None:
+            strongest: Dict[str, Tuple[str, str, float]] = {}
+            for neighbor, rel_type, strength in self.lookup(node_id, self.max_fanout, self.relationship_type):
+                if neighbor == node_id or strength <= 0 or rel_type in self.exclude:
+                    continue
+                if neighbor not in strongest or strength > strongest[neighbor][2]:
+                    strongest[neighbor] = (neighbor, rel_type, strength)
+            adjacent = self._cache[node_id] = sorted(strongest.values(), key=lambda edge: -edge[2])
+        return adjacent
+
+def _seed_weights(seeds: Union[str, Iterable[str], Dict[str, float]]) -> Dict[str, float]:
+    if isinstance(seeds, str):
+        seeds = [seeds]
+    if not isinstance(seeds, dict):
+        seeds = {seed: 1.0 for seed in seeds}
+    total = sum(weight for weight in seeds.values() if weight > 0)
+    return {seed: weight / total for seed, weight in seeds.items() if weight > 0} if total else {}
+
+def k_hop_neighbors(seeds: Union[str, Iterable[str]], max_depth: int = DEFAULT_MAX_DEPTH,
+                    max_fanout: Optional[int] = DEFAULT_MAX_FANOUT, max_nodes: int = DEFAULT_MAX_NODES,
+                    relationship_type: Optional[str] = None, top_k: Optional[int] = None,
+                    neighbors: Optional[NeighborLookup] = None,
+                    exclude_relationships: Iterable[str] = ()) -> List[TraversalHit]:
+    """
+    Breadth-first expansion up to ``max_depth`` hops from the seed nodes.
+
+    A node's score is the largest product of edge strengths over the paths
+    found to it, so a strong two-hop path can outrank a weak direct edge.
+    Each node expands at most ``max_fanout`` of its strongest edges and no
+    more than ``max_nodes`` nodes are visited. Edges whose type is in
+    ``exclude_relationships`` are not followed, which keeps hub nodes such
+    as the user or model from dominating the results.
+
+    Returns:
+        List[TraversalHit]: Reached nodes other than the seeds, best score first.
+    """
+    adjacency = _Adjacency(neighbors, max_fanout, relationship_type, exclude_relationships)
+    seeds = [seeds] if isinstance(seeds, str) else list(seeds)
+    best: Dict[str, TraversalHit] = {seed: TraversalHit(seed, 1.0, 0, "") for seed in seeds}
+    frontier = {seed: 1.0 for seed in seeds}
+
+    for depth in range(1, max_depth + 1):
+        next_frontier: Dict[str, float] = {}
+        for node_id, score in frontier.items():
+            for neighbor, rel_type, strength in adjacency(node_id):
+                candidate = score * strength
+                known = best.get(neighbor)
+                if known is None and len(best) >= max_nodes:
+                    continue
+                if known is None or candidate > known.score:
+                    best[neighbor] = TraversalHit(neighbor, candidate, depth, rel_type)
+                    next_frontier[neighbor] = candidate
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    seed_set = set(seeds)
+    hits = sorted((hit for hit in best.values() if hit.node_id not in seed_set), key=lambda hit: (-hit.score, hit.hops))
+    return hits[:top_k] if top_k is not None else hits
+
+def personalized_pagerank(seeds: Union[str, Iterable[str], Dict[str, float]], alpha: float = 0.15,
+                          epsilon: float = 1e-3, max_fanout: Optional[int] = DEFAULT_MAX_FANOUT,
+                          max_expansions: int = DEFAULT_MAX_EXPANSIONS, relationship_type: Optional[str] = None,
+                          top_k: Optional[int] = None, include_seeds: bool = False,
+                          neighbors: Optional[NeighborLookup] = None) -> List[Tuple[str, float]]:
+    """
+    Approximate personalized PageRank around a seed set by local push.
+
+    Only nodes holding at least ``epsilon`` residual probability are
+    expanded, so the cost depends on the neighbourhood of the seeds rather
+    than on the size of the graph, and at most ``max_expansions`` nodes are
+    expanded. Random-walk steps follow edges in
+    proportion to their strength; ``alpha`` is the restart probability.
+
+    Args:
+        seeds: A node id, several node ids, or a {node_id: weight} restart distribution.
+
+    Returns:
+        List[Tuple[str, float]]: (node_id, score) pairs, highest first.
+    """
+    adjacency = _Adjacency(neighbors, max_fanout, relationship_type)
+    residual = _seed_weights(seeds)
+    rank: Dict[str, float] = {}
+    queue = deque(residual)
+    queued = set(queue)
+    expanded = 0
+
+    while queue and expanded < max_expansions:
+        node_id = queue.popleft()
+        queued.discard(node_id)
+        mass = residual.pop(node_id, 0.0)
+        if mass < epsilon:
+            continue
+        expanded += 1
+        rank[node_id] = rank.get(node_id, 0.0) + alpha * mass
+        edges = adjacency(node_id)
+        total_strength = sum(strength for _, _, strength in edges)
+        if not total_strength:
+            # Dangling node: the walk restarts, which keeps the mass local to it
+            rank[node_id] += (1 - alpha) * mass
+            continue
+        spread = (1 - alpha) * mass / total_strength
+        for neighbor, _, strength in edges:
+            residual[neighbor] = residual.get(neighbor, 0.0) + spread * strength
+            if residual[neighbor] >= epsilon and neighbor not in queued:
+                queue.append(neighbor)
+                queued.add(neighbor)
+
+    if queue:
+        logger.debug(f"Personalized PageRank stopped after expanding {expanded} nodes")
+    seed_set = set(_seed_weights(seeds))
+    ranked = sorted(((node_id, score) for node_id, score in rank.items()
+                     if include_seeds or node_id not in seed_set), key=lambda item: -item[1])
+    return ranked[:top_k] if top_k is not None else ranked
+
+def shortest_weighted_path(source: str, target: str, max_depth: int = 4,
+                           max_fanout: Optional[int] = DEFAULT_MAX_FANOUT, max_expansions: int = DEFAULT_MAX_EXPANSIONS,
+                           relationship_type: Optional[str] = None,
+                           neighbors: Optional[NeighborLookup] = None) -> Optional[Tuple[List[str], float]]:
+    """
+    Find the strongest path between two nodes with Dijkstra's algorithm.
+
+    Edge cost is ``-log(strength)`` (strengths above 1 count as 1), so the
+    shortest path is the one whose strength product is largest. The search
+    gives up after settling ``max_expansions`` nodes.
+
+    Returns:
+        Optional[Tuple[List[str], float]]: The node ids along the path and its
+        strength product, or None if no path exists within the limits.
+    """
+    if source == target:
+        return [source], 1.0
+    adjacency = _Adjacency(neighbors, max_fanout, relationship_type)
+    # Search states are (node, hops) so a costlier path with fewer hops can
+    # still be extended when the cheapest one has used up the depth budget.
+    previous: Dict[Tuple[str, int], Tuple[str, int]] = {}
+    state_costs: Dict[Tuple[str, int], float] = {(source, 0): 0.0}
+    fewest_hops: Dict[str, int] = {}
+    heap = [(0.0, 0, source)]
+
+    while heap and len(fewest_hops) < max_expansions:
+        cost, hop_count, node_id = heapq.heappop(heap)
+        if fewest_hops.get(node_id, max_depth + 1) <= hop_count:
+            continue
+        fewest_hops[node_id] = hop_count
+        if node_id == target:
+            path, state = [target], (target, hop_count)
+            while state in previous:
+                state = previous[state]
+                path.append(state[0])
+            return path[::-1], math.exp(-cost)
+        if hop_count >= max_depth:
+            continue
+        for neighbor, _, strength in adjacency(node_id):
+            if fewest_hops.get(neighbor, max_depth + 1) <= hop_count + 1:
+                continue
+            state, candidate = (neighbor, hop_count + 1), cost - math.log(min(strength, 1.0))
+            if candidate < state_costs.get(state, math.inf):
+                state_costs[state] = candidate
+                previous[state] = (node_id, hop_count)
+                heapq.heappush(heap, (candidate, hop_count + 1, neighbor))
+    return None
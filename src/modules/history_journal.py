@@ -0,0 +1,156 @@
+# src/modules/history_journal.py
+
+import os
+import json
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+from config import HISTORY_JOURNAL_FSYNC
+from .logging_setup import logger
+from .errors import FileOperationError
+
+class HistoryJournal:
+    """
+    Append-only JSON Lines file holding the most recent ``max_length`` records of a history.
+
+    An append writes one line, so its cost does not depend on the size of
+    the history. The file is compacted down to the last ``max_length``
+    records, written to a temporary file and atomically renamed over the
+    journal, once it holds ``compact_every`` records more than that. Loading
+    truncates a torn final line left by a crash and skips any other
+    undecodable line. A journal that does not exist yet is seeded from the
+    ``legacy_path`` JSON array the history used to be saved as.
+    """
+
+    def __init__(self, path: Path, max_length: int, compact_every: Optional[int] = None,
+                 legacy_path: Optional[Path] = None, fsync: bool = HISTORY_JOURNAL_FSYNC):
+        self.path = Path(path)
+        self.max_length = max(1, max_length)
+        self.compact_every = max(1, compact_every or self.max_length)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        self.lines: "deque[str]" = deque(maxlen=self.max_length)
+        self.line_count = 0
+        self.compactions = 0
+        self._file = None
+
+    @staticmethod
+    def _encode(record: Any) -> str:
+        # json.dumps escapes newlines inside strings, so every record is exactly one line
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    def load(self) -> List[Any]:
+        """
+        Read the journal, repairing a torn tail, and return its last ``max_length`` records.
+
+        Raises:
+            FileOperationError: If the journal cannot be read or repaired.
+        """
+        with self.lock:
+            self._close_file()
+            self.lines.clear()
+            self.line_count = 0
+            if not self.path.exists():
+                return self._import_legacy()
+            records = []
+            try:
+                with self.path.open('rb') as f:
+                    data = f.read()
+                good_end = data.rfind(b"\n") + 1
+                if good_end < len(data):
+                    logger.warning(f"Truncating torn record ({len(data) - good_end} bytes) at the end of {self.path}")
+                    with self.path.open('r+b') as f:
+                        f.truncate(good_end)
+                for number, raw in enumerate(data[:good_end].splitlines(), 1):
+                    try:
+                        records.append(json.loads(raw))
+                    except ValueError:
+                        logger.warning(f"Skipping undecodable line {number} of {self.path}")
+                        continue
+                    self.lines.append(raw.decode('utf-8') + "\n")
+                    self.line_count += 1
+            except OSError as e:
+                logger.error(f"Error reading history journal {self.path}: {str(e)}")
+                raise FileOperationError(f"Failed to read history journal {self.path}: {str(e)}")
+            logger.debug(f"Loaded {len(records)} records from {self.path}")
+            return records[-self.max_length:]
+
+    def _import_legacy(self) -> List[Any]:
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return []
+        try:
+            with self.legacy_path.open('r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading legacy history {self.legacy_path}: {str(e)}")
+            return []
+        records = records[-self.max_length:] if isinstance(records, list) else []
+        self.rewrite(records)
+        logger.info(f"Imported {len(records)} records from {self.legacy_path} into {self.path}")
+        return records
+
+    def append(self, record: Any):
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Any]):
+        """
+        Append records with a single write, compacting the journal when it has grown enough.
+
+        Raises:
+            FileOperationError: If the journal cannot be written.
+        """
+        lines = [self._encode(record) for record in records]
+        if not lines:
+            return
+        with self.lock:
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = self.path.open('a', encoding='utf-8')
+                self._file.write("".join(lines))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            except OSError as e:
+                logger.error(f"Error appending to history journal {self.path}: {str(e)}")
+                raise FileOperationError(f"Failed to append to history journal {self.path}: {str(e)}")
+            self.lines.extend(lines)
+            self.line_count += len(lines)
+            if self.line_count >= self.max_length + self.compact_every:
+                self._compact(list(self.lines))
+
+    def rewrite(self, records: Iterable[Any]):
+        """
+        Replace the journal's contents with ``records`` (the last ``max_length`` of them).
+        """
+        with self.lock:
+            self._compact([self._encode(record) for record in records][-self.max_length:])
+
+    def _compact(self, lines: List[str]):
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self._close_file()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with temp_path.open('w', encoding='utf-8') as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"Error compacting history journal {self.path}: {str(e)}")
+            raise FileOperationError(f"Failed to compact history journal {self.path}: {str(e)}")
+        self.lines = deque(lines, maxlen=self.max_length)
+        self.line_count = len(lines)
+        self.compactions += 1
+        logger.debug(f"Compacted {self.path} to {len(lines)} records")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self.lock:
+            self._close_file()
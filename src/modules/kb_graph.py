@@ -1,45 +1,176 @@
 # src/modules/kb_graph.py
 
 import json
+import time
 import hashlib
 import sqlite3
-from pathlib import Path
-from typing import Dict, Any, List, Tuple, Union, Optional
-from collections import Counter
+import threading
+import numpy as np
+from typing import Dict, Any, List, Tuple, Union, Optional, Iterable
+from collections import OrderedDict
 import re
 from datetime import datetime
 
-# Define DB_DIR and DB_FILE here
-DB_DIR = Path('data/edgebase')
-DB_FILE = 'knowledge_edges.db'
-DB_PATH = DB_DIR / DB_FILE
+from config import (DB_PATH, EDGE_WRITE_BATCH_SIZE, EDGE_WRITE_FLUSH_INTERVAL,
+                    GRAPH_SNAPSHOT_ENABLED, GRAPH_SNAPSHOT_REFRESH_INTERVAL)
+from src.utils.schema import INTERN_NODE_SQL, NODE_ID_SQL, apply_schema
+from .db_connection import get_connection_manager
+from .graph_snapshot import GraphSnapshot
+from .logging_setup import logger
+
+# Upsert in place: keeps the row id, created_at and any confidence/metadata set through KnowledgeManager.
+# Node keys must already be interned (see write_edges).
+INSERT_EDGE_SQL = f'''
+    INSERT INTO edge_store (source, target, relationship_type, strength)
+    VALUES ({NODE_ID_SQL}, {NODE_ID_SQL}, ?, ?)
+    ON CONFLICT(source, target, relationship_type)
+    DO UPDATE SET strength = excluded.strength, updated_at = CURRENT_TIMESTAMP
+'''
+
+def get_db_connection() -> sqlite3.Connection:
+    """
+    Return this thread's shared connection to the edge database.
+
+    The connection is long-lived and owned by the connection manager; use it
+    as a context manager for a transaction rather than closing it.
+    """
+    return get_connection_manager(DB_PATH, apply_schema).get_connection()
+
+_graph_snapshot: Optional[GraphSnapshot] = None
+_graph_snapshot_lock = threading.Lock()
+
+def get_graph_snapshot() -> Optional[GraphSnapshot]:
+    """
+    Return the shared in-memory edge snapshot, or None when GRAPH_SNAPSHOT_ENABLED is off.
+    """
+    global _graph_snapshot
+    if not GRAPH_SNAPSHOT_ENABLED:
+        return None
+    with _graph_snapshot_lock:
+        if _graph_snapshot is None:
+            _graph_snapshot = GraphSnapshot(get_db_connection, GRAPH_SNAPSHOT_REFRESH_INTERVAL)
+        return _graph_snapshot
+
+EdgeRow = Tuple[str, str, str, float]
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+_active_writers = threading.local()
 
 def create_edge(source_id: str, target_id: str, relationship_type: str, strength: float):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO edges (source_id, target_id, relationship_type, strength)
-            VALUES (?, ?, ?, ?)
-        ''', (source_id, target_id, relationship_type, strength))
-        conn.commit()
+    create_edges([(source_id, target_id, relationship_type, strength)])
+
+def create_edges(edges: Iterable[EdgeRow], batch_size: int = EDGE_WRITE_BATCH_SIZE) -> int:
+    """
+    Insert (source_id, target_id, relationship_type, strength) edges in bulk.
+
+    Rows are written with executemany, one transaction per ``batch_size``
+    edges. Inside an ``EdgeWriter`` block on the same thread the edges are
+    handed to that writer instead, so they share its transactions.
+
+    Returns:
+        int: Number of edges written or queued.
+    """
+    writer = _current_writer()
+    if writer is not None:
+        return writer.add_many(edges)
+
+    conn = get_db_connection()
+    written, batch = 0, []
+    for edge in edges:
+        batch.append(tuple(edge))
+        if len(batch) >= batch_size:
+            written += write_edges(conn, batch)
+            batch = []
+    return written + write_edges(conn, batch)
+
+def write_edges(conn: sqlite3.Connection, rows: List[EdgeRow]) -> int:
+    """
+    Intern the rows' node keys and upsert the edges, all in one transaction.
+    """
+    if not rows:
+        return 0
+    with conn:
+        conn.executemany(INTERN_NODE_SQL, ((key,) for row in rows for key in row[:2]))
+        conn.executemany(INSERT_EDGE_SQL, rows)
+    if _graph_snapshot is not None:
+        _graph_snapshot.stale = True
+    return len(rows)
+
+def _current_writer() -> Optional["EdgeWriter"]:
+    stack = getattr(_active_writers, "stack", None)
+    return stack[-1] if stack else None
+
+class EdgeWriter:
+    """
+    Buffers edge inserts and writes them in bulk transactions.
+
+    The buffer is flushed when it reaches ``batch_size`` edges, when
+    ``flush_interval`` seconds have passed since the last flush (checked as
+    edges are added), and when the ``with`` block exits. While the block is
+    active, ``create_edge``/``create_edges`` calls on the same thread are
+    routed through the writer.
+    """
+
+    def __init__(self, batch_size: int = EDGE_WRITE_BATCH_SIZE, flush_interval: float = EDGE_WRITE_FLUSH_INTERVAL,
+                 conn: Optional[sqlite3.Connection] = None):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.conn = conn
+        self.buffer: List[EdgeRow] = []
+        self.written = 0
+        self.last_flush = time.monotonic()
+
+    def __enter__(self) -> "EdgeWriter":
+        if not hasattr(_active_writers, "stack"):
+            _active_writers.stack = []
+        _active_writers.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_writers.stack.remove(self)
+        self.flush()
+        return False
+
+    def add(self, source_id: str, target_id: str, relationship_type: str, strength: float):
+        self.add_many([(source_id, target_id, relationship_type, strength)])
+
+    def add_many(self, edges: Iterable[EdgeRow]) -> int:
+        count = 0
+        for edge in edges:
+            self.buffer.append(tuple(edge))
+            count += 1
+            if len(self.buffer) >= self.batch_size:
+                self.flush()
+        if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return count
+
+    def flush(self) -> int:
+        """
+        Write all buffered edges in one transaction.
+        """
+        rows, self.buffer = self.buffer, []
+        self.last_flush = time.monotonic()
+        if not rows:
+            return 0
+        try:
+            written = write_edges(self.conn or get_db_connection(), rows)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing {len(rows)} edges: {str(e)}")
+            raise
+        self.written += written
+        logger.debug(f"Flushed {written} edges ({self.written} total)")
+        return written
 
 def update_knowledge_graph(new_information: Union[Dict[str, Any], List[Any], str]):
     info_id = hashlib.md5(json.dumps(new_information, sort_keys=True).encode()).hexdigest()
 
     key_concepts = extract_key_concepts(new_information)
-
-    for concept in key_concepts:
-        create_edge(info_id, concept, "RELATED_TO", 1.0)
-
     related_info = find_related_information(new_information)
 
-    for related_id, similarity in related_info:
-        create_edge(info_id, related_id, "SIMILAR_TO", similarity)
+    create_edges(
+        [(info_id, concept, "RELATED_TO", 1.0) for concept in key_concepts]
+        + [(info_id, related_id, "SIMILAR_TO", similarity) for related_id, similarity in related_info]
+    )
 
     print(f"Updated knowledge graph with new information (ID: {info_id})")
 
@@ -58,29 +189,51 @@ def find_related_information(information: Union[Dict[str, Any], List[Any], str])
     return []
 
 def get_related_nodes(node_id: str, relationship_type: str = None) -> List[Tuple[str, str, float]]:
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        if relationship_type:
-            cursor.execute('''
-                SELECT target_id, relationship_type, strength
-                FROM edges
-                WHERE source_id = ? AND relationship_type = ?
-                UNION
-                SELECT source_id, relationship_type, strength
-                FROM edges
-                WHERE target_id = ? AND relationship_type = ?
-            ''', (node_id, relationship_type, node_id, relationship_type))
-        else:
-            cursor.execute('''
-                SELECT target_id, relationship_type, strength
-                FROM edges
-                WHERE source_id = ?
-                UNION
-                SELECT source_id, relationship_type, strength
-                FROM edges
-                WHERE target_id = ?
-            ''', (node_id, node_id))
-        return [(row['target_id'], row['relationship_type'], row['strength']) for row in cursor.fetchall()]
+    snapshot = get_graph_snapshot()
+    if snapshot is not None:
+        return snapshot.related_nodes(node_id, relationship_type)
+    cursor = get_db_connection().cursor()
+    if relationship_type:
+        cursor.execute('''
+            SELECT target_id, relationship_type, strength
+            FROM edges
+            WHERE source_id = ? AND relationship_type = ?
+            UNION
+            SELECT source_id, relationship_type, strength
+            FROM edges
+            WHERE target_id = ? AND relationship_type = ?
+        ''', (node_id, relationship_type, node_id, relationship_type))
+    else:
+        cursor.execute('''
+            SELECT target_id, relationship_type, strength
+            FROM edges
+            WHERE source_id = ?
+            UNION
+            SELECT source_id, relationship_type, strength
+            FROM edges
+            WHERE target_id = ?
+        ''', (node_id, node_id))
+    return [(target_id, rel_type, strength) for target_id, rel_type, strength in cursor.fetchall()]
+
+def get_strongest_neighbors(node_id: str, limit: Optional[int] = None,
+                            relationship_type: Optional[str] = None) -> List[Tuple[str, str, float]]:
+    """
+    Neighbours of ``node_id`` in either direction, strongest edges first, at most ``limit`` of them.
+    """
+    snapshot = get_graph_snapshot()
+    if snapshot is not None:
+        return snapshot.strongest_neighbors(node_id, limit, relationship_type)
+    type_filter = "AND relationship_type = ?" if relationship_type else ""
+    type_params = (relationship_type,) if relationship_type else ()
+    cursor = get_db_connection().cursor()
+    cursor.execute(f'''
+        SELECT target_id, relationship_type, strength FROM edges WHERE source_id = ? {type_filter}
+        UNION ALL
+        SELECT source_id, relationship_type, strength FROM edges WHERE target_id = ? {type_filter}
+        ORDER BY strength DESC
+        LIMIT ?
+    ''', (node_id, *type_params, node_id, *type_params, -1 if limit is None else limit))
+    return cursor.fetchall()
 
 def analyze_file_pair(file1: Dict[str, Any], file2: Dict[str, Any]) -> List[Tuple[str, float]]:
     edge_categories = []
@@ -107,36 +260,116 @@ def analyze_file_pair(file1: Dict[str, Any], file2: Dict[str, Any]) -> List[Tupl
 
     return edge_categories
 
+def content_text(content: Union[str, Dict, List]) -> str:
+    if isinstance(content, str):
+        return content
+    elif isinstance(content, dict):
+        # Concatenate all string values in the dictionary
+        return ' '.join(str(v) for v in content.values() if isinstance(v, str))
+    elif isinstance(content, list):
+        # Concatenate all string items in the list
+        return ' '.join(str(item) for item in content if isinstance(item, str))
+    else:
+        return ''
+
+def word_set(text: str) -> set:
+    return set(re.findall(r'\w+', text.lower()))
+
+def jaccard(set1: set, set2: set) -> float:
+    common = len(set1 & set2)
+    return common / (len(set1) + len(set2) - common) if (set1 or set2) else 0
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+def token_ids(tokens: Iterable[str]) -> np.ndarray:
+    """
+    Sorted, duplicate-free ``int64`` ids of ``tokens``.
+
+    An id is a 64-bit hash of the token, so ids agree across processes and
+    runs and no vocabulary has to be kept.
+    """
+    return np.unique(np.fromiter((_token_hash(token) for token in set(tokens)), dtype=np.int64))
+
+def text_ids(text: str) -> np.ndarray:
+    return token_ids(re.findall(r'\w+', text.lower()))
+
+class TokenSetCache:
+    """
+    Caches each text's token set as a sorted array of token ids (see ``token_ids``).
+
+    Memories are compared against many others, so a text is tokenized once
+    and every later comparison works on the cached array. Entries are keyed
+    by the text itself and evicted least-recently-used.
+    """
+
+    def __init__(self, max_items: int = 10000):
+        self.max_items = max_items
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def token_ids(self, text: str) -> np.ndarray:
+        with self._lock:
+            ids = self._entries.get(text)
+            if ids is not None:
+                self._entries.move_to_end(text)
+                return ids
+        ids = text_ids(text)
+        ids.flags.writeable = False
+        with self._lock:
+            self._entries[text] = ids
+            if len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+        return ids
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+token_cache = TokenSetCache()
+
+def text_token_ids(text: str) -> np.ndarray:
+    return token_cache.token_ids(text)
+
+def content_token_ids(content: Union[str, Dict, List]) -> np.ndarray:
+    return token_cache.token_ids(content_text(content))
+
+def jaccard_ids(ids1: np.ndarray, ids2: np.ndarray) -> float:
+    """
+    Jaccard similarity of two sorted, duplicate-free token id arrays.
+    """
+    if not (ids1.size or ids2.size):
+        return 0
+    common = np.intersect1d(ids1, ids2, assume_unique=True).size
+    return common / (ids1.size + ids2.size - common)
+
+def jaccard_many(ids: np.ndarray, candidates: List[np.ndarray]) -> np.ndarray:
+    """
+    Jaccard similarity of one token id array against many in a single vectorized pass.
+
+    Returns:
+        np.ndarray: float64 similarities, one per candidate (0 where both sets are empty).
+    """
+    if not candidates:
+        return np.zeros(0)
+    sizes = np.fromiter((candidate.size for candidate in candidates), dtype=np.int64, count=len(candidates))
+    hits = np.isin(np.concatenate(candidates), ids, assume_unique=True)
+    owners = np.repeat(np.arange(len(candidates)), sizes)
+    common = np.bincount(owners[hits], minlength=len(candidates))
+    union = ids.size + sizes - common
+    return np.divide(common, union, out=np.zeros(len(candidates)), where=union > 0)
+
+def content_similarities(content: Union[str, Dict, List], others: List[Union[str, Dict, List]]) -> np.ndarray:
+    return jaccard_many(content_token_ids(content), [content_token_ids(other) for other in others])
+
 def compare_content(content1: Union[str, Dict, List], content2: Union[str, Dict, List]) -> float:
-    def extract_text(content: Union[str, Dict, List]) -> str:
-        if isinstance(content, str):
-            return content
-        elif isinstance(content, dict):
-            # Concatenate all string values in the dictionary
-            return ' '.join(str(v) for v in content.values() if isinstance(v, str))
-        elif isinstance(content, list):
-            # Concatenate all string items in the list
-            return ' '.join(str(item) for item in content if isinstance(item, str))
-        else:
-            return ''
-
-    text1 = extract_text(content1)
-    text2 = extract_text(content2)
-
-    words1 = set(re.findall(r'\w+', text1.lower()))
-    words2 = set(re.findall(r'\w+', text2.lower()))
-    common_words = words1.intersection(words2)
-    return len(common_words) / (len(words1) + len(words2) - len(common_words)) if (words1 or words2) else 0
+    return jaccard_ids(content_token_ids(content1), content_token_ids(content2))
 
 def compare_tags(tags1: List[str], tags2: List[str]) -> float:
-    common_tags = set(tags1).intersection(set(tags2))
-    return len(common_tags) / len(set(tags1).union(set(tags2))) if (tags1 or tags2) else 0
+    return jaccard_ids(token_ids(tags1), token_ids(tags2))
 
 def compare_titles(title1: str, title2: str) -> float:
-    words1 = set(re.findall(r'\w+', title1.lower()))
-    words2 = set(re.findall(r'\w+', title2.lower()))
-    common_words = words1.intersection(words2)
-    return len(common_words) / (len(words1) + len(words2) - len(common_words)) if (words1 or words2) else 0
+    return jaccard_ids(text_token_ids(title1), text_token_ids(title2))
 
 def compare_timestamps(timestamp1: str, timestamp2: str) -> Optional[Tuple[str, float]]:
     t1 = parse_timestamp(timestamp1)
@@ -2,39 +2,72 @@
 
 import sqlite3
 import json
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Iterable
+from config import EDGE_WRITE_BATCH_SIZE
 from src.modules.errors import DataProcessingError
+from src.modules.db_connection import get_connection_manager
+from src.utils.schema import INTERN_NODE_SQL, NODE_ID_SQL
 
 class KnowledgeManager:
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.connection_manager = get_connection_manager(db_path)
         self.conn = self._get_connection()
 
     def _get_connection(self):
-        try:
-            return sqlite3.connect(self.db_path)
-        except sqlite3.Error as e:
-            raise DataProcessingError(f"Failed to connect to database: {str(e)}")
+        # Shares the per-thread connection that kb_graph uses for the same database file
+        return self.connection_manager.get_connection()
 
     def close_connection(self):
         if self.conn:
-            self.conn.close()
+            self.connection_manager.close()
 
     def add_edge(self, source_id: str, target_id: str, relationship_type: str, strength: float,
                  confidence: float = 1.0, bidirectional: bool = False,
                  start_time: str = None, end_time: str = None, metadata: Dict[str, Any] = None):
+        self.add_edges([{
+            "source_id": source_id, "target_id": target_id, "relationship_type": relationship_type,
+            "strength": strength, "confidence": confidence, "bidirectional": bidirectional,
+            "start_time": start_time, "end_time": end_time, "metadata": metadata
+        }])
+
+    def add_edges(self, edges: Iterable[Dict[str, Any]], batch_size: int = EDGE_WRITE_BATCH_SIZE) -> int:
+        """
+        Insert many edges, given as dicts of add_edge arguments, one transaction per batch.
+        """
+        def row(edge: Dict[str, Any]) -> Tuple:
+            metadata = edge.get("metadata")
+            return (edge["source_id"], edge["target_id"], edge["relationship_type"], edge["strength"],
+                    edge.get("confidence", 1.0), edge.get("bidirectional", False),
+                    edge.get("start_time"), edge.get("end_time"), json.dumps(metadata) if metadata else None)
+
+        written, batch = 0, []
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO edges
-                (source_id, target_id, relationship_type, strength, confidence, bidirectional, start_time, end_time, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (source_id, target_id, relationship_type, strength, confidence, bidirectional,
-                  start_time, end_time, json.dumps(metadata) if metadata else None))
-            self.conn.commit()
+            for edge in edges:
+                batch.append(row(edge))
+                if len(batch) >= batch_size:
+                    written += self._write_edges(batch)
+                    batch = []
+            return written + self._write_edges(batch)
         except sqlite3.Error as e:
             raise DataProcessingError(f"Failed to add edge: {str(e)}")
 
+    def _write_edges(self, rows: List[Tuple]) -> int:
+        if rows:
+            with self.conn:
+                self.conn.executemany(INTERN_NODE_SQL, ((key,) for row in rows for key in row[:2]))
+                self.conn.executemany(f"""
+                    INSERT INTO edge_store
+                    (source, target, relationship_type, strength, confidence, bidirectional, start_time, end_time, metadata)
+                    VALUES ({NODE_ID_SQL}, {NODE_ID_SQL}, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(source, target, relationship_type) DO UPDATE SET
+                        strength = excluded.strength, confidence = excluded.confidence,
+                        bidirectional = excluded.bidirectional, start_time = excluded.start_time,
+                        end_time = excluded.end_time, metadata = excluded.metadata,
+                        updated_at = CURRENT_TIMESTAMP
+                """, rows)
+        return len(rows)
+
     def get_related_nodes(self, node_id: str, relationship_type: str = None) -> List[Tuple[str, str, float, float]]:
         try:
             cursor = self.conn.cursor()
@@ -65,10 +98,10 @@ class KnowledgeManager:
     def update_edge_strength(self, source_id: str, target_id: str, relationship_type: str, new_strength: float):
         try:
             cursor = self.conn.cursor()
-            cursor.execute("""
-                UPDATE edges
+            cursor.execute(f"""
+                UPDATE edge_store
                 SET strength = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE source_id = ? AND target_id = ? AND relationship_type = ?
+                WHERE source = {NODE_ID_SQL} AND target = {NODE_ID_SQL} AND relationship_type = ?
             """, (new_strength, source_id, target_id, relationship_type))
             self.conn.commit()
         except sqlite3.Error as e:
@@ -77,10 +110,14 @@ class KnowledgeManager:
     def add_node_attribute(self, node_id: str, attribute_name: str, attribute_value: str, confidence: float = 1.0):
         try:
             cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO node_attributes
-                (node_id, attribute_name, attribute_value, confidence)
-                VALUES (?, ?, ?, ?)
+            cursor.execute(INTERN_NODE_SQL, (node_id,))
+            cursor.execute(f"""
+                INSERT INTO node_attribute_store
+                (node, attribute_name, attribute_value, confidence)
+                VALUES ({NODE_ID_SQL}, ?, ?, ?)
+                ON CONFLICT(node, attribute_name) DO UPDATE SET
+                    attribute_value = excluded.attribute_value, confidence = excluded.confidence,
+                    updated_at = CURRENT_TIMESTAMP
             """, (node_id, attribute_name, attribute_value, confidence))
             self.conn.commit()
         except sqlite3.Error as e:
@@ -101,10 +138,13 @@ class KnowledgeManager:
     def add_hierarchy(self, parent_id: str, child_id: str, hierarchy_type: str, confidence: float = 1.0):
         try:
             cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO hierarchies
-                (parent_id, child_id, hierarchy_type, confidence)
-                VALUES (?, ?, ?, ?)
+            cursor.executemany(INTERN_NODE_SQL, ((parent_id,), (child_id,)))
+            cursor.execute(f"""
+                INSERT INTO hierarchy_store
+                (parent, child, hierarchy_type, confidence)
+                VALUES ({NODE_ID_SQL}, {NODE_ID_SQL}, ?, ?)
+                ON CONFLICT(parent, child, hierarchy_type) DO UPDATE SET
+                    confidence = excluded.confidence, updated_at = CURRENT_TIMESTAMP
             """, (parent_id, child_id, hierarchy_type, confidence))
             self.conn.commit()
         except sqlite3.Error as e:
@@ -1,26 +1,38 @@
 # src/modules/memory_search.py
 
 import numpy as np
-from numpy.linalg import norm
-import ollama
 import json
-from typing import List, Tuple, Dict, Any
+import threading
+from typing import List, Tuple, Dict, Any, Optional, Union, Callable
 from pathlib import Path
-from config import DATA_DIR, EMBEDDINGS_DIR, EMBEDDING_MODEL, DEFAULT_MODEL
-from .file_utils import read_json_file, write_json_file, get_json_files_in_directory, increment_json_field
+from config import EMBEDDINGS_DIR, EMBEDDING_MODEL, DEFAULT_MODEL
+from .file_utils import read_json_file, write_json_file
 from .logging_setup import logger
 from .ollama_client import process_prompt
 from .kb_graph import get_related_nodes, get_db_connection
+from .vector_index import get_memory_index, top_k_similar
+from .embedding_service import embed_text, embed_texts
+from .access_counter import access_counter
+from .memory_store import get_memory_store
 
 def read_memory(filename: str) -> Dict[str, Any]:
-    file_path = DATA_DIR / filename
+    """
+    Read a memory from the memory store without modifying it.
+
+    The returned ``access_count`` combines the count stored with the memory
+    and the counter store; this read is recorded there and flushed later.
+    """
     try:
-        data = read_json_file(file_path)
-        increment_json_field(file_path, 'access_count')
+        data = get_memory_store().get(filename)
+        if data is None:
+            logger.error(f"Memory not found: {filename}")
+            return {}
+        data['access_count'] = data.get('access_count', 0) + access_counter.get(filename)
+        access_counter.increment(filename)
         logger.debug(f"Read memory: {filename}, access count: {data['access_count']}")
         return data
     except Exception as e:
-        logger.error(f"Error reading memory file {filename}: {str(e)}")
+        logger.error(f"Error reading memory {filename}: {str(e)}")
         return {}
 
 def save_embeddings(filename: str, embeddings: List[float]) -> None:
@@ -41,21 +53,22 @@ def load_embeddings(filename: str) -> List[float]:
         logger.error(f"Error loading embeddings for file {filename}: {str(e)}")
         return []
 
-def get_embeddings(filename: str) -> List[float]:
-    if embeddings := load_embeddings(filename):
-        return embeddings
-    memory_data = read_memory(filename)
+def memory_text(memory_data: Dict[str, Any]) -> str:
     if 'type' not in memory_data:
-        text = str(memory_data)
+        return str(memory_data)
     elif memory_data['type'] == 'interaction':
         if isinstance(memory_data['content'], dict) and 'prompt' in memory_data['content'] and 'response' in memory_data['content']:
-            text = f"{memory_data['content']['prompt']}\n{memory_data['content']['response']}"
-        else:
-            text = str(memory_data['content'])
+            return f"{memory_data['content']['prompt']}\n{memory_data['content']['response']}"
+        return str(memory_data['content'])
     else:  # document_chunk or any other type
-        text = str(memory_data['content'])
+        return str(memory_data['content'])
+
+def get_embeddings(filename: str) -> List[float]:
+    if embeddings := load_embeddings(filename):
+        return embeddings
+    text = memory_text(read_memory(filename))
     try:
-        embeddings = ollama.embeddings(model=EMBEDDING_MODEL, prompt=text)["embedding"]
+        embeddings = embed_text(text)
         save_embeddings(filename, embeddings)
         logger.info(f"Generated new embeddings for file: {filename}")
         return embeddings
@@ -63,38 +76,90 @@ def get_embeddings(filename: str) -> List[float]:
         logger.error(f"Error generating embeddings for file {filename}: {str(e)}")
         return []
 
-def find_most_similar(needle: List[float], haystack: List[List[float]]) -> List[Tuple[float, int]]:
+def index_memory(filename: str, memory_data: Dict[str, Any], embeddings: Optional[List[float]] = None) -> bool:
+    """
+    Append a freshly saved memory to the persistent vector index, embedding it unless a vector is supplied.
+    """
+    index = get_memory_index()
+    if filename in index:
+        return False
+    try:
+        if embeddings is None:
+            embeddings = embed_text(memory_text(memory_data))
+        return index.add(filename, embeddings)
+    except Exception as e:
+        logger.error(f"Error indexing memory {filename}: {str(e)}")
+        return False
+
+def index_memories(memories: List[Tuple[str, Dict[str, Any]]]) -> int:
+    """
+    Embed freshly saved memories in one batch and append them to the vector index.
+    """
+    index = get_memory_index()
+    memories = [(filename, data) for filename, data in memories if filename not in index]
+    if not memories:
+        return 0
+    try:
+        embeddings = embed_texts([memory_text(data) for _, data in memories])
+        return index.add_many(zip((filename for filename, _ in memories), embeddings))
+    except Exception as e:
+        logger.error(f"Error indexing {len(memories)} memories: {str(e)}")
+        return 0
+
+def find_most_similar(needle: Union[List[float], List[List[float]], np.ndarray],
+                      haystack: Union[List[List[float]], np.ndarray],
+                      top_k: Optional[int] = None,
+                      normalized: bool = False) -> Union[List[Tuple[float, int]], List[List[Tuple[float, int]]]]:
+    """
+    Rank haystack vectors by cosine similarity to one or more query vectors.
+
+    A single query vector returns one ranked list; a list (or 2-D array) of
+    query vectors returns one ranked list per query. All scores are computed
+    in one matrix product and only the best ``top_k`` are selected and sorted.
+    Pass ``normalized=True`` when the haystack rows and needles are already
+    L2-normalised to skip the norm computation.
+    """
     try:
-        needle_norm = norm(needle)
-        similarity_scores = [
-            np.dot(needle, item) / (needle_norm * norm(item)) for item in haystack
-        ]
-        return sorted(zip(similarity_scores, range(len(haystack))), reverse=True)
+        needles = np.asarray(needle)
+        results = top_k_similar(np.atleast_2d(needles), haystack, top_k, normalized)
+        return results[0] if needles.ndim == 1 else results
     except Exception as e:
         logger.error(f"Error in finding most similar embeddings: {str(e)}")
         return []
 
 def search_memories(query: str, top_k: int = 5, similarity_threshold: float = 0.0) -> List[Dict[str, Any]]:
-    logger.info(f"Searching memories for query: {query[:50]}...")  # Log only first 50 characters
+    return search_memories_batch([query], top_k, similarity_threshold)[0]
+
+def search_memories_batch(queries: List[str], top_k: int = 5, similarity_threshold: float = 0.0) -> List[List[Dict[str, Any]]]:
+    """
+    Search memories for several queries, scoring all of them against the vector index in one pass.
 
-    # Embedding-based search
-    memory_files = get_json_files_in_directory(DATA_DIR)
-    embeddings = [get_embeddings(f.name) for f in memory_files]
+    Returns:
+        List[List[Dict[str, Any]]]: The ranked memories for each query, in query order.
+    """
+    logger.info(f"Searching memories for {len(queries)} queries: {[query[:50] for query in queries]}")  # Log only first 50 characters
+
+    # Embedding-based search against the persistent vector index
     try:
-        query_embedding = ollama.embeddings(model=EMBEDDING_MODEL, prompt=query)["embedding"]
-        most_similar_files = find_most_similar(query_embedding, embeddings)
+        query_embeddings = embed_texts(queries)
+        most_similar_per_query = get_memory_index().search_many(query_embeddings, top_k)
     except Exception as e:
         logger.error(f"Error generating query embedding: {str(e)}")
-        most_similar_files = []
+        most_similar_per_query = [[] for _ in queries]
+
+    return [
+        _rank_memories(query, most_similar_files, top_k, similarity_threshold)
+        for query, most_similar_files in zip(queries, most_similar_per_query)
+    ]
 
+def _rank_memories(query: str, most_similar_files: List[Tuple[float, str]], top_k: int, similarity_threshold: float) -> List[Dict[str, Any]]:
     relevant_memories = []
-    for similarity, index in most_similar_files:
+    for similarity, filename in most_similar_files:
         if similarity < similarity_threshold:
             break
-        if len(relevant_memories) >= top_k:
-            break
-        filename = memory_files[index].name
         memory_data = read_memory(filename)
+        if not memory_data:
+            continue
 
         relevant_memories.append({
             "content": memory_data.get("content", ""),
@@ -142,12 +207,86 @@ def search_memories(query: str, top_k: int = 5, similarity_threshold: float = 0.
 
     return combined_results
 
+backfill_progress: Dict[str, int] = {"total": 0, "processed": 0, "added": 0}
+_backfill_thread: Optional[threading.Thread] = None
+_backfill_stop = threading.Event()
+
+def backfill_embeddings(batch_size: int = 32, limit: Optional[int] = None,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        stop_event: Optional[threading.Event] = None) -> int:
+    """
+    Embed every stored memory that is missing from the vector index.
+
+    Vectors are appended to the index every ``batch_size`` memories, so an
+    interrupted run loses at most one batch and the next run resumes with
+    whatever is still missing. Embeddings cached by the legacy per-file
+    layout in EMBEDDINGS_DIR are reused instead of being regenerated.
+
+    Args:
+        batch_size (int): Number of memories embedded and appended to the index at a time.
+        limit (Optional[int]): Maximum number of memories to process in this run.
+        progress_callback (Optional[Callable[[int, int], None]]): Called with (processed, total) after each batch.
+        stop_event (Optional[threading.Event]): Stops the run after the current batch when set.
+
+    Returns:
+        int: Number of memories added to the index.
+    """
+    index, store = get_memory_index(), get_memory_store()
+    pending = [memory_id for memory_id in store.ids() if memory_id not in index]
+    if limit is not None:
+        pending = pending[:limit]
+    total, processed, added = len(pending), 0, 0
+    backfill_progress.update({"total": total, "processed": 0, "added": 0})
+    logger.info(f"Backfilling embeddings for {total} unindexed memories")
+
+    for start in range(0, total, batch_size):
+        if stop_event is not None and stop_event.is_set():
+            logger.info("Embedding backfill stopped before completion")
+            break
+        batch = pending[start:start + batch_size]
+        vectors = {filename: embeddings for filename in batch if (embeddings := load_embeddings(filename))}
+        memories = store.get_many(filename for filename in batch if filename not in vectors)
+        texts = {filename: memory_text(memory_data) for filename, memory_data in memories.items()}
+        try:
+            vectors.update(zip(texts, embed_texts(list(texts.values()))))
+        except Exception as e:
+            logger.error(f"Error generating embeddings for batch starting at {batch[0]}: {str(e)}")
+
+        added += index.add_many((filename, vectors[filename]) for filename in batch if filename in vectors)
+        processed += len(batch)
+        backfill_progress.update({"processed": processed, "added": added})
+        logger.info(f"Embedding backfill progress: {processed}/{total} processed, {added} indexed")
+        if progress_callback:
+            progress_callback(processed, total)
+
+    logger.info(f"Embedding backfill finished: {added} memories indexed ({len(index)} total)")
+    return added
+
+def start_backfill_worker(batch_size: int = 32) -> threading.Thread:
+    """
+    Run backfill_embeddings on a daemon thread so startup does not wait for it.
+    """
+    global _backfill_thread
+    if _backfill_thread is not None and _backfill_thread.is_alive():
+        return _backfill_thread
+    _backfill_stop.clear()
+    _backfill_thread = threading.Thread(
+        target=backfill_embeddings,
+        kwargs={"batch_size": batch_size, "stop_event": _backfill_stop},
+        name="embedding-backfill",
+        daemon=True
+    )
+    _backfill_thread.start()
+    logger.info("Started embedding backfill worker")
+    return _backfill_thread
+
+def stop_backfill_worker(timeout: Optional[float] = None):
+    _backfill_stop.set()
+    if _backfill_thread is not None:
+        _backfill_thread.join(timeout)
+
 def generate_embeddings_for_existing_files():
-    memory_files = get_json_files_in_directory(DATA_DIR)
-    for file in memory_files:
-        if not load_embeddings(file.name):
-            get_embeddings(file.name)
-    logger.info(f"Generated embeddings for {len(memory_files)} files")
+    backfill_embeddings()
 
 def generate_search_query(topic: str, perspective: str) -> str:
     prompt = f"""Generate a short, focused search query to find information supporting the {perspective} side of the debate topic: '{topic}'.
@@ -166,6 +305,3 @@ def generate_search_query(topic: str, perspective: str) -> str:
     except KeyError:
         logger.error(f"Missing 'query' key in JSON response: {response}")
         return f"Error: Invalid response format for {topic} ({perspective})"
-
-# Run this function when the module is imported to ensure all files have embeddings
-generate_embeddings_for_existing_files()
@@ -0,0 +1,261 @@
+# src/modules/memory_store.py
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from config import DATA_DIR, MEMORY_DB_PATH, MEMORY_STORE_BACKEND
+from .file_utils import read_json_file, write_json_file, ensure_directory_exists
+from .logging_setup import logger
+from .errors import DataProcessingError, FileOperationError
+from .db_connection import get_connection_manager, select_in
+
+MEMORY_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS memories (
+        id TEXT PRIMARY KEY,
+        type TEXT,
+        timestamp TEXT,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_memories_type ON memories(type);
+    CREATE TABLE IF NOT EXISTS store_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+class MemoryStore(ABC):
+    """
+    Storage backend for saved memories.
+
+    Memories are JSON-serialisable dicts addressed by a string id (the
+    historical filename, e.g. ``20240101_120000_000000_interaction.json``),
+    which is also the id used by the vector index and the access counters.
+    """
+
+    @abstractmethod
+    def put(self, memory_id: str, data: Dict[str, Any]):
+        ...
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        count = 0
+        for memory_id, data in items:
+            self.put(memory_id, data)
+            count += 1
+        return count
+
+    @abstractmethod
+    def get(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    def get_many(self, memory_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for memory_id in memory_ids:
+            data = self.get(memory_id)
+            if data is not None:
+                found[memory_id] = data
+        return found
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        ...
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for memory_id in self.ids():
+            data = self.get(memory_id)
+            if data is not None:
+                yield memory_id, data
+
+    @abstractmethod
+    def delete(self, memory_id: str) -> bool:
+        ...
+
+    def __contains__(self, memory_id: str) -> bool:
+        return self.get(memory_id) is not None
+
+    def __len__(self) -> int:
+        return len(self.ids())
+
+    def close(self):
+        pass
+
+class JsonDirectoryMemoryStore(MemoryStore):
+    """
+    The original layout: one indented JSON file per memory in a directory.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        ensure_directory_exists(self.directory)
+
+    def put(self, memory_id: str, data: Dict[str, Any]):
+        write_json_file(self.directory / memory_id, data)
+
+    def get(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        file_path = self.directory / memory_id
+        if not file_path.exists():
+            return None
+        try:
+            return read_json_file(file_path)
+        except FileOperationError as e:
+            logger.error(f"Error reading memory {memory_id}: {str(e)}")
+            return None
+
+    def ids(self) -> List[str]:
+        return sorted(f.name for f in self.directory.glob("*.json"))
+
+    def delete(self, memory_id: str) -> bool:
+        file_path = self.directory / memory_id
+        if not file_path.exists():
+            return False
+        file_path.unlink()
+        return True
+
+class SqliteMemoryStore(MemoryStore):
+    """
+    All memories in a single SQLite database in WAL mode.
+
+    Each memory is one row holding its JSON document, so listing memories is
+    an index scan and reads never touch the filesystem directory.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.connections = get_connection_manager(self.db_path, MEMORY_SCHEMA)
+        self.connections.get_connection()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.connections.get_connection()
+
+    @staticmethod
+    def _row(memory_id: str, data: Dict[str, Any]) -> Tuple[str, Any, Any, str]:
+        return (memory_id, data.get("type"), data.get("timestamp"), json.dumps(data, ensure_ascii=False))
+
+    def put(self, memory_id: str, data: Dict[str, Any]):
+        self.put_many([(memory_id, data)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        rows = [self._row(memory_id, data) for memory_id, data in items]
+        if not rows:
+            return 0
+        conn = self.conn
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO memories (id, type, timestamp, data) VALUES (?, ?, ?, ?)", rows
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing to memory store: {str(e)}")
+            raise DataProcessingError(f"Failed to write memories: {str(e)}")
+        return len(rows)
+
+    def get(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([memory_id]).get(memory_id)
+
+    def get_many(self, memory_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        memory_ids = list(dict.fromkeys(memory_ids))
+        found = {}
+        try:
+            rows = select_in(self.conn, "SELECT id, data FROM memories WHERE id IN ({placeholders})", memory_ids)
+            for memory_id, data in rows:
+                found[memory_id] = json.loads(data)
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error reading from memory store: {str(e)}")
+        return found
+
+    def ids(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT id FROM memories ORDER BY id")]
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rows = self.conn.execute("SELECT id, data FROM memories ORDER BY id").fetchall()
+        for memory_id, data in rows:
+            yield memory_id, json.loads(data)
+
+    def delete(self, memory_id: str) -> bool:
+        conn = self.conn
+        with conn:
+            return conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,)).rowcount > 0
+
+    def __contains__(self, memory_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM memories WHERE id = ?", (memory_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        conn = self.conn
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        self.connections.close()
+
+def migrate_memory_store(source: MemoryStore, destination: MemoryStore, batch_size: int = 500) -> int:
+    """
+    Copy every memory from ``source`` into ``destination``, skipping ids already present.
+
+    Returns:
+        int: Number of memories copied.
+    """
+    copied, batch = 0, []
+    for memory_id, data in source.items():
+        if memory_id in destination:
+            continue
+        batch.append((memory_id, data))
+        if len(batch) >= batch_size:
+            copied += destination.put_many(batch)
+            batch = []
+            logger.info(f"Migrated {copied} memories")
+    copied += destination.put_many(batch)
+    logger.info(f"Memory migration finished: {copied} memories copied")
+    return copied
+
+def import_json_memories(store: SqliteMemoryStore, directory: Path) -> int:
+    """
+    Copy the JSON memories in ``directory`` into ``store`` unless that has already been done.
+
+    The import is recorded in the store, so memories deleted later are not
+    brought back from the JSON files.
+
+    Returns:
+        int: Number of memories copied.
+    """
+    if store.get_meta("json_import") is not None:
+        return 0
+    copied = 0
+    if any(Path(directory).glob("*.json")):
+        logger.info(f"Importing JSON memories from {directory} into {store.db_path}")
+        copied = migrate_memory_store(JsonDirectoryMemoryStore(directory), store)
+    store.set_meta("json_import", json.dumps({"source": str(directory), "copied": copied,
+                                              "at": datetime.now().isoformat()}))
+    return copied
+
+def create_memory_store(backend: str = MEMORY_STORE_BACKEND) -> MemoryStore:
+    if backend == "json":
+        return JsonDirectoryMemoryStore(DATA_DIR)
+    if backend == "sqlite":
+        store = SqliteMemoryStore(MEMORY_DB_PATH)
+        import_json_memories(store, DATA_DIR)
+        return store
+    raise DataProcessingError(f"Unknown memory store backend: {backend}")
+
+_memory_store: Optional[MemoryStore] = None
+_memory_store_lock = threading.Lock()
+
+def get_memory_store() -> MemoryStore:
+    """
+    Return the configured memory store, opening it on first use.
+    """
+    global _memory_store
+    with _memory_store_lock:
+        if _memory_store is None:
+            _memory_store = create_memory_store()
+        return _memory_store
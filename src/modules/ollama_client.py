@@ -1,84 +1,252 @@
 # src/modules/ollama_client.py
 
-import requests
 import json
 import asyncio
+import threading
+import httpx
 import nest_asyncio
-from typing import Callable, Dict, Any
+from typing import Awaitable, Callable, Dict, Any, List, Optional, TypeVar
 from rich.console import Console
-from rich.live import Live
-from rich.text import Text
-from .save_history import save_interaction
+from config import (STREAM_HEADLESS, OLLAMA_BASE_URL, OLLAMA_MAX_CONCURRENCY, RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_PATH,
+                    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_DEFAULT_TTL, RESPONSE_CACHE_TTLS,
+                    SEMANTIC_CACHE_MODE, SEMANTIC_CACHE_PATH, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_THRESHOLDS,
+                    SEMANTIC_CACHE_MAX_ENTRIES)
+from .persistence_queue import persist_interaction
+from .response_cache import ResponseCache
+from .semantic_cache import SemanticResponseCache
+from .stream_renderer import StreamRenderer
 from .logging_setup import logger
 
 # Apply nest_asyncio to allow nested event loops
 nest_asyncio.apply()
 
-class OllamaClient:
-    def __init__(self, base_url="http://localhost:11434", timeout=60):
+T = TypeVar("T")
+
+class AsyncOllamaClient:
+    """
+    asyncio-native client for Ollama's streaming generate endpoint.
+
+    Every call goes through one pooled ``httpx.AsyncClient``, so connections
+    are kept alive and reused, and at most ``max_concurrency`` generations
+    are in flight at once; further calls wait for a free slot. The pool
+    belongs to the event loop that first uses the client.
+
+    With a ``cache``, ``process_prompt`` answers repeated requests (same
+    model, prompt and options) from it without contacting Ollama. A
+    ``semantic_cache`` is consulted next and also answers prompts that are
+    near-identical to an earlier one.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, timeout: float = 60,
+                 max_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 cache: Optional[ResponseCache] = None,
+                 semantic_cache: Optional[SemanticResponseCache] = None):
         self.base_url = base_url
         self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.transport = transport
+        self.cache = cache
+        self.semantic_cache = semantic_cache
         self.console = Console()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
 
-    def process_prompt(self, prompt: str, model: str, username: str) -> str:
-        logger.info(f"Processing prompt for user: {username}, model: {model}")
-        url = f"{self.base_url}/api/generate"
+    async def __aenter__(self) -> "AsyncOllamaClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    def _session(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            self._http = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits,
+                                           transport=self.transport)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def generate(self, prompt: str, model: str, on_chunk: Optional[Callable[[str], None]] = None,
+                       options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Stream one generation and return the full response text.
+
+        Raises:
+            httpx.HTTPError: If the request fails or Ollama answers with an error status.
+        """
         headers = {"Content-Type": "application/json"}
         data = {"model": model, "prompt": prompt}
+        if options:
+            data["options"] = options
+        self._session()
+        async with self._slots:
+            return await self._stream_response("/api/generate", headers, data, on_chunk)
 
-        try:
-            with Live(Text("Processing...", style="yellow bold"), refresh_per_second=4) as live:
-                full_response = self._stream_response(url, headers, data, live)
-
-            logger.info(f"Response generated for prompt: {prompt[:50]}...")
-            save_interaction(prompt, full_response.strip(), username, model)
-            return full_response.strip()
-
-        except requests.Timeout:
-            error_msg = f"Error: Request timed out after {self.timeout} seconds"
-            logger.error(error_msg)
-            self.console.print(error_msg, style="bold red")
-            return error_msg
-        except requests.RequestException as e:
-            error_msg = f"Error connecting to Ollama: {str(e)}"
-            logger.error(error_msg)
-            self.console.print(error_msg, style="bold red")
-            return error_msg
-        except json.JSONDecodeError as e:
-            error_msg = f"Error decoding JSON response: {str(e)}"
-            logger.error(error_msg)
-            self.console.print(error_msg, style="bold red")
-            return error_msg
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            logger.error(error_msg)
-            self.console.print(error_msg, style="bold red")
-            return error_msg
-
-    def _stream_response(self, url: str, headers: Dict[str, str], data: Dict[str, Any], live: Live) -> str:
-        full_response = ""
-        with requests.post(url, headers=headers, json=data, stream=True, timeout=self.timeout) as response:
+    async def _stream_response(self, url: str, headers: Dict[str, str], data: Dict[str, Any],
+                               on_chunk: Optional[Callable[[str], None]]) -> str:
+        parts: List[str] = []
+        async with self._session().stream("POST", url, headers=headers, json=data) as response:
             response.raise_for_status()
-            for line in response.iter_lines():
+            async for line in response.aiter_lines():
                 if line:
                     try:
                         json_response = json.loads(line)
                         if "response" in json_response:
                             chunk = json_response["response"]
-                            full_response += chunk
-                            live.update(Text(full_response, style="yellow bold"))
+                            parts.append(chunk)
+                            if on_chunk:
+                                on_chunk(chunk)
                         if json_response.get("done", False):
                             break
                     except json.JSONDecodeError:
                         logger.warning(f"Failed to decode JSON from line: {line}")
                         continue
-        return full_response
+        return "".join(parts)
+
+    def _error(self, error_msg: str) -> str:
+        logger.error(error_msg)
+        self.console.print(error_msg, style="bold red")
+        return error_msg
+
+    async def process_prompt(self, prompt: str, model: str, username: str,
+                             on_chunk: Optional[Callable[[str], None]] = None,
+                             options: Optional[Dict[str, Any]] = None) -> str:
+        if self.semantic_cache is not None:
+            # The semantic lookup embeds the prompt; keep it off the event loop
+            cached = await asyncio.to_thread(self.cached_response, prompt, model, username, options)
+        else:
+            cached = self.cached_response(prompt, model, username, options)
+        if cached is not None:
+            if on_chunk:
+                on_chunk(cached)
+            return cached
+        return await self._process_uncached(prompt, model, username, on_chunk, options)
+
+    def cached_response(self, prompt: str, model: str, username: str,
+                        options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        The cached response to this request, or to a near-identical one, if a cache holds one.
+        """
+        # The interaction was saved when the response was first generated
+        if self.cache is not None:
+            cached = self.cache.get(prompt, model, options, username)
+            if cached is not None:
+                logger.info(f"Response cache hit for {username}: {prompt[:50]}...")
+                return cached
+        if self.semantic_cache is not None:
+            return self.semantic_cache.get(prompt, model, options, username)
+        return None
+
+    async def _process_uncached(self, prompt: str, model: str, username: str,
+                                on_chunk: Optional[Callable[[str], None]], options: Optional[Dict[str, Any]]) -> str:
+        logger.info(f"Processing prompt for user: {username}, model: {model}")
+        try:
+            full_response = (await self.generate(prompt, model, on_chunk, options)).strip()
+            logger.info(f"Response generated for prompt: {prompt[:50]}...")
+            if self.cache:
+                self.cache.put(prompt, model, full_response, options, username)
+            if self.semantic_cache is not None:
+                await asyncio.to_thread(self.semantic_cache.put, prompt, model, full_response, options, username)
+            # Queueing blocks while the persistence queue is full; keep it off the event loop
+            await asyncio.to_thread(persist_interaction, prompt, full_response, username, model)
+            return full_response
+        except httpx.TimeoutException:
+            return self._error(f"Error: Request timed out after {self.timeout} seconds")
+        except httpx.HTTPStatusError as e:
+            return self._error(f"Error: Received status code {e.response.status_code}")
+        except httpx.HTTPError as e:
+            return self._error(f"Error connecting to Ollama: {str(e)}")
+        except Exception as e:
+            return self._error(f"Unexpected error: {str(e)}")
+
+    async def process_prompts(self, prompts: List[str], model: str, username: str) -> List[str]:
+        """
+        Run several prompts concurrently, up to ``max_concurrency`` at a time, returning responses in order.
+        """
+        return await asyncio.gather(*(self.process_prompt(prompt, model, username) for prompt in prompts))
 
-default_client = OllamaClient()
+class OllamaClient:
+    """
+    Blocking wrapper around AsyncOllamaClient for existing callers.
+
+    Requests run on a private event loop in a daemon thread, so the pooled
+    connections and the concurrency limit are shared by every caller,
+    whichever thread or event loop it runs on. ``process_prompt`` shows the
+    response as it streams in unless the client is ``headless``.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, timeout: float = 60,
+                 max_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 cache: Optional[ResponseCache] = None,
+                 semantic_cache: Optional[SemanticResponseCache] = None,
+                 headless: bool = STREAM_HEADLESS):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.headless = headless
+        self.console = Console()
+        self.async_client = AsyncOllamaClient(base_url, timeout, max_concurrency, transport, cache, semantic_cache)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="ollama-client", daemon=True).start()
+            return self._loop
+
+    def _run(self, coro: Awaitable[T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._event_loop()).result()
+
+    def process_prompt(self, prompt: str, model: str, username: str, options: Optional[Dict[str, Any]] = None) -> str:
+        cached = self.async_client.cached_response(prompt, model, username, options)
+        if cached is not None:
+            return cached
+        with StreamRenderer(self.console, headless=self.headless) as renderer:
+            on_chunk = renderer.feed if renderer.live else None
+            return self._run(self.async_client._process_uncached(prompt, model, username, on_chunk, options))
+
+    def process_prompts(self, prompts: List[str], model: str, username: str) -> List[str]:
+        return self._run(self.async_client.process_prompts(prompts, model, username))
+
+    async def process_prompt_async(self, prompt: str, model: str, username: str,
+                                   on_chunk: Optional[Callable[[str], None]] = None,
+                                   options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Await a generation from any event loop without blocking it.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.async_client.process_prompt(prompt, model, username, on_chunk, options), self._event_loop())
+        return await asyncio.wrap_future(future)
+
+    def close(self):
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.async_client.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+default_client = OllamaClient(
+    cache=ResponseCache(RESPONSE_CACHE_PATH, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_DEFAULT_TTL,
+                        RESPONSE_CACHE_TTLS) if RESPONSE_CACHE_ENABLED else None,
+    semantic_cache=SemanticResponseCache(SEMANTIC_CACHE_PATH, default_threshold=SEMANTIC_CACHE_THRESHOLD,
+                                         thresholds=SEMANTIC_CACHE_THRESHOLDS, max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                                         default_ttl=RESPONSE_CACHE_DEFAULT_TTL, ttls=RESPONSE_CACHE_TTLS,
+                                         shadow=SEMANTIC_CACHE_MODE == "shadow")
+    if SEMANTIC_CACHE_MODE in ("shadow", "on") else None)
 
 def process_prompt(prompt: str, model: str, username: str) -> str:
     return default_client.process_prompt(prompt, model, username)
 
+async def process_prompt_async(prompt: str, model: str, username: str) -> str:
+    return await default_client.process_prompt_async(prompt, model, username)
+
 generate_response = process_prompt
 
-__all__ = ['OllamaClient', 'process_prompt', 'generate_response']
+__all__ = ['AsyncOllamaClient', 'OllamaClient', 'process_prompt', 'process_prompt_async', 'generate_response']
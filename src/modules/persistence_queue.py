@@ -0,0 +1,146 @@
+# src/modules/persistence_queue.py
+
+import queue
+import atexit
+import threading
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config import PERSIST_QUEUE_SIZE, PERSIST_BATCH_SIZE, PERSIST_DEFAULT_POLICY, PERSIST_POLICIES
+from .logging_setup import logger
+from .save_history import ChatHistory, chat_history, save_interactions
+
+POLICIES = ("full", "memory", "none")
+
+# (prompt, response, username, model_name, timestamp, add to chat history)
+Interaction = Tuple[str, str, str, str, datetime, bool]
+
+class PersistenceQueue:
+    """
+    Write-behind persistence of generated interactions.
+
+    ``submit`` applies the call site's policy and returns at once: "full"
+    appends the exchange to the in-memory chat history and saves it as a
+    memory, "memory" only saves the memory, and "none" drops it. Saving
+    happens on a background writer thread that takes everything queued so
+    far, up to ``batch_size`` interactions, and writes it in one batch (see
+    ``save_interactions``). When ``max_size`` interactions are waiting,
+    ``submit`` blocks until the writer catches up; a ``max_size`` of 0 writes
+    on the calling thread instead. ``flush`` waits for the queue to drain,
+    and ``close`` also stops the writer; the application closes the queue on
+    its way out, while the embedding executor still accepts work.
+    """
+
+    def __init__(self, max_size: int = 1000, batch_size: int = 32, default_policy: str = "full",
+                 policies: Optional[Dict[str, str]] = None,
+                 write: Callable[[Iterable[Tuple[str, str, str, str, datetime]], Iterable[Tuple[str, str]]], int] = save_interactions,
+                 history: Optional[ChatHistory] = None):
+        for policy in [default_policy, *(policies or {}).values()]:
+            if policy not in POLICIES:
+                raise ValueError(f"Unknown persistence policy '{policy}'; expected one of {', '.join(POLICIES)}")
+        self.max_size = max(0, max_size)
+        self.batch_size = max(1, batch_size)
+        self.default_policy = default_policy
+        self.policies = dict(policies or {})
+        self.write = write
+        self.history = history or chat_history
+        self.queue: "queue.Queue[Optional[Interaction]]" = queue.Queue(self.max_size)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"submitted": 0, "skipped": 0, "written": 0, "failed": 0, "batches": 0}
+        self._thread: Optional[threading.Thread] = None
+
+    def policy_for(self, call_site: str) -> str:
+        return self.policies.get(call_site, self.default_policy)
+
+    def submit(self, prompt: str, response: str, username: str, model_name: str) -> bool:
+        """
+        Queue an interaction for saving according to the call site's policy.
+
+        Returns:
+            bool: False if the policy drops the interaction.
+        """
+        policy = self.policy_for(username)
+        with self.lock:
+            self.stats["skipped" if policy == "none" else "submitted"] += 1
+        if policy == "none":
+            logger.debug(f"Not persisting interaction from {username} (policy none)")
+            return False
+        if policy == "full":
+            # Readers see the exchange at once; the writer saves the file
+            self.history.add_entry(prompt, response, persist=False)
+        item = (prompt, response, username, model_name, datetime.now(), policy == "full")
+        if self.max_size == 0:
+            self._write([item])
+            return True
+        self._ensure_writer()
+        self.queue.put(item)
+        return True
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            with self.lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch, stop = [], item is None
+            if item is not None:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + stop):
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[Interaction]):
+        try:
+            self.write([item[:5] for item in batch], [(item[0], item[1]) for item in batch if item[5]])
+        except Exception as e:
+            logger.error(f"Error persisting {len(batch)} interactions: {str(e)}")
+            with self.lock:
+                self.stats["failed"] += len(batch)
+            return
+        with self.lock:
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+
+    def flush(self):
+        """
+        Block until every queued interaction has been written.
+        """
+        if self._thread is not None:
+            self.queue.join()
+
+    def close(self):
+        with self.lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+            logger.debug(f"Persistence queue closed: {self.stats}")
+
+persistence_queue = PersistenceQueue(PERSIST_QUEUE_SIZE, PERSIST_BATCH_SIZE, PERSIST_DEFAULT_POLICY, PERSIST_POLICIES)
+
+def _close_at_exit():
+    # Executors are shut down before atexit handlers run, so whatever is still
+    # queued is saved without embeddings and left to the embedding backfill
+    persistence_queue.write = partial(save_interactions, index=False)
+    persistence_queue.close()
+
+atexit.register(_close_at_exit)
+
+def persist_interaction(prompt: str, response: str, username: str, model_name: str) -> bool:
+    return persistence_queue.submit(prompt, response, username, model_name)
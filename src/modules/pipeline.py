@@ -0,0 +1,105 @@
+# src/modules/pipeline.py
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .step_scheduler import Step, StepScheduler, default_scheduler
+
+class PipelineStep(NamedTuple):
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()   # values passed to func as positional arguments, in order
+    outputs: Tuple[str, ...] = ()  # defaults to (name,); with several outputs func returns a tuple
+    timeout: Optional[float] = None
+    optional: bool = False         # may be skipped (budget, timeout or error); its outputs then take ``default``
+    default: Any = None            # a tuple of defaults when there are several outputs
+    cache: bool = False            # reuse the outputs of an earlier run with identical inputs
+    estimate: float = 0.0          # expected seconds until the step has been timed
+
+    @property
+    def produces(self) -> Tuple[str, ...]:
+        return self.outputs or (self.name,)
+
+class PipelineRun(NamedTuple):
+    values: Dict[str, Any]
+    timings: Dict[str, float]      # seconds per executed or cached step
+    skipped: Dict[str, str]        # step name -> "budget", "timeout" or "error"
+    cache_hits: List[str]
+
+class Pipeline:
+    """
+    Declarative DAG of steps that exchange named values.
+
+    Each step becomes a ``Step`` on a ``StepScheduler`` that requires the
+    steps producing its inputs, so the pipeline shares the scheduler's
+    worker pool and budget handling. Latencies and cache entries are kept
+    under the pipeline's ``name``.
+    """
+
+    def __init__(self, name: str, steps: Iterable[PipelineStep], scheduler: StepScheduler = default_scheduler):
+        self.name = name
+        self.steps = list(steps)
+        self.scheduler = scheduler
+        self.external_inputs = self._validate()
+        self.scheduled = [self._schedule(step) for step in self.steps]
+
+    def _validate(self) -> Tuple[str, ...]:
+        self.producers: Dict[str, str] = {}
+        for step in self.steps:
+            for name in step.produces:
+                if name in self.producers:
+                    raise ValueError(f"Value '{name}' is produced by both '{self.producers[name]}' and '{step.name}'")
+                self.producers[name] = step.name
+        external = tuple(dict.fromkeys(name for step in self.steps for name in step.inputs if name not in self.producers))
+        clashing = [name for name in external if name in {step.name for step in self.steps}]
+        if clashing:
+            raise ValueError(f"Pipeline inputs share a name with a step: {', '.join(clashing)}")
+        available, remaining = set(external), list(self.steps)
+        while remaining:
+            ready = [step for step in remaining if all(name in available for name in step.inputs)]
+            if not ready:
+                raise ValueError(f"Steps have circular inputs: {', '.join(step.name for step in remaining)}")
+            for step in ready:
+                available.update(step.produces)
+                remaining.remove(step)
+        return external
+
+    def _schedule(self, step: PipelineStep) -> Step:
+        # Each input is read from the result of the step producing it, picking
+        # its position when that step has several outputs
+        requires, picks = [], []
+        for name in step.inputs:
+            producer = self.producers.get(name)
+            outputs = next(s.produces for s in self.steps if s.name == producer) if producer else (name,)
+            requires.append(producer or name)
+            picks.append(outputs.index(name) if len(outputs) > 1 else None)
+
+        def call(*args):
+            return step.func(*[arg if index is None else arg[index] for arg, index in zip(args, picks)])
+
+        return Step(step.name, call, tuple(requires), step.timeout, step.optional, step.default, step.cache, step.estimate)
+
+    @property
+    def latency(self) -> Dict[str, float]:
+        keys = {step.name: self.scheduler.step_key(step, self.name) for step in self.steps}
+        return {name: self.scheduler.latency[key] for name, key in keys.items() if key in self.scheduler.latency}
+
+    def run(self, inputs: Dict[str, Any], budget: Optional[float] = None) -> PipelineRun:
+        """
+        Run the pipeline on ``inputs`` within an optional latency ``budget`` in seconds.
+
+        Raises:
+            ValueError: If an external input is missing.
+            TimeoutError: If a required step exceeds its timeout.
+            Exception: The error raised by a required step.
+        """
+        missing = [name for name in self.external_inputs if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {', '.join(missing)}")
+        run = self.scheduler.execute(self.scheduled, {name: inputs[name] for name in self.external_inputs}, budget, self.name)
+        values = dict(inputs)
+        for step in self.steps:
+            result = run.results[step.name]
+            if len(step.produces) == 1:
+                values[step.produces[0]] = result
+            else:
+                values.update(zip(step.produces, result))
+        return PipelineRun(values, run.timings, run.skipped, run.cache_hits)
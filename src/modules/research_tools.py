@@ -4,6 +4,7 @@ from typing import List, Dict, Any
 from src.modules.logging_setup import logger
 from src.modules.ddg_search import DDGSearch
 from src.modules.ollama_client import process_prompt
+from src.modules.memory_search import search_memories_batch
 
 ddg_search = DDGSearch()
 
@@ -146,15 +147,22 @@ def conduct_comprehensive_research(user_input: str, topic: str, model_name: str)
     ]
 
     comprehensive_results = []
+    search_queries = [f"{topic} {aspect} {user_input}" for aspect in research_aspects]
 
-    for aspect in research_aspects:
+    # Retrieve stored memories for every aspect in a single pass over the vector index
+    memories_per_aspect = search_memories_batch(search_queries, top_k=2, similarity_threshold=0.7)
+
+    for aspect, search_query, memories in zip(research_aspects, search_queries, memories_per_aspect):
         logger.info(f"Researching aspect: {aspect}")
-        search_query = f"{topic} {aspect} {user_input}"
         search_results = ddg_search.run_search(search_query)
+        memory_context = "\n".join(f"- {m['content']}" for m in memories)
 
         aspect_prompt = f"""Based on the following search results about {aspect} related to "{topic}" and "{user_input}":
         {' '.join(search_results[:3])}
 
+        Related memories:
+        {memory_context or 'None'}
+
         Provide a concise summary of the most relevant information:"""
 
         aspect_summary = process_prompt(aspect_prompt, model_name, "AspectResearcher")
@@ -0,0 +1,127 @@
+# src/modules/response_cache.py
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .logging_setup import logger
+from .db_connection import get_connection_manager
+
+RESPONSE_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        call_site TEXT,
+        response TEXT NOT NULL,
+        expires_at REAL,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+"""
+
+def response_key(prompt: str, model: str, options: Optional[Dict[str, Any]] = None) -> str:
+    # The prompt is hashed verbatim: whitespace can change what a model generates
+    payload = json.dumps([model, prompt, options or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """
+    Exact-match cache of generated responses.
+
+    Entries are keyed by a SHA-256 of the model, the prompt and the
+    generation options and stored in a single SQLite file. The least
+    recently used entries are evicted beyond ``max_entries``. Each call site
+    (the name passed to ``process_prompt``) has its own time to live, taken
+    from ``ttls`` or else ``default_ttl``; a TTL of 0 turns caching off for
+    that call site and None keeps entries until they are evicted.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 10000, default_ttl: Optional[float] = None,
+                 ttls: Optional[Dict[str, Optional[float]]] = None):
+        self.db_path = Path(db_path)
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        self.connections = get_connection_manager(self.db_path, RESPONSE_CACHE_SCHEMA)
+        self.count = self.connections.get_connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def ttl_for(self, call_site: Optional[str]) -> Optional[float]:
+        return self.ttls.get(call_site, self.default_ttl) if call_site is not None else self.default_ttl
+
+    def enabled_for(self, call_site: Optional[str]) -> bool:
+        return self.ttl_for(call_site) != 0
+
+    def get(self, prompt: str, model: str, options: Optional[Dict[str, Any]] = None,
+            call_site: Optional[str] = None) -> Optional[str]:
+        """
+        Return the cached response for this exact request, or None.
+        """
+        if not self.enabled_for(call_site):
+            return None
+        key = response_key(prompt, model, options)
+        now = time.time()
+        with self.lock:
+            try:
+                conn = self.connections.get_connection()
+                row = conn.execute("SELECT response, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[1] is not None and row[1] <= now:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                    self.count -= 1
+                    self.stats["expired"] += 1
+                    row = None
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.stats["hits"] += 1
+                return row[0]
+            except sqlite3.Error as e:
+                logger.error(f"Error reading response cache: {str(e)}")
+                self.stats["misses"] += 1
+                return None
+
+    def put(self, prompt: str, model: str, response: str, options: Optional[Dict[str, Any]] = None,
+            call_site: Optional[str] = None):
+        ttl = self.ttl_for(call_site)
+        if ttl == 0:
+            return
+        now = time.time()
+        key = response_key(prompt, model, options)
+        with self.lock:
+            try:
+                conn = self.connections.get_connection()
+                replaced = conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, call_site, response, expires_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, call_site, response, now + ttl if ttl is not None else None, now)
+                )
+                self.count += 0 if replaced else 1
+                self.stats["stores"] += 1
+                if self.count > self.max_entries:
+                    evicted = conn.execute(
+                        "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                        (self.count - self.max_entries,)
+                    ).rowcount
+                    self.count -= evicted
+                    self.stats["evictions"] += evicted
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing to response cache: {str(e)}")
+
+    def clear(self):
+        with self.lock:
+            conn = self.connections.get_connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+            self.count = 0
+
+    def close(self):
+        with self.lock:
+            self.connections.close()
@@ -2,13 +2,20 @@
 
 import json
 import hashlib
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
-from config import MEMORY_LENGTH, DATA_DIR, CHAT_HISTORY_FILE
-from .file_utils import read_json_file, write_json_file, ensure_directory_exists
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from config import MEMORY_LENGTH, CHAT_HISTORY_FILE, CHAT_HISTORY_JOURNAL
 from .logging_setup import logger
-from .kb_graph import create_edge, get_db_connection
+from .history_journal import HistoryJournal
+from .kb_graph import EdgeWriter, create_edge, create_edges, get_strongest_neighbors
+from .memory_store import get_memory_store
+from .graph_traversal import k_hop_neighbors
+
+# Edges to nodes shared by every memory (the user, the model) or to a memory's store id;
+# traversing them would make those nodes the nearest neighbours of everything
+HUB_RELATIONSHIPS = ("CREATED_BY", "USED_MODEL", "STORED_AS")
 
 class ChatHistory:
     _instance = None
@@ -18,45 +25,64 @@ class ChatHistory:
             cls._instance = super(ChatHistory, cls).__new__(cls)
             cls._instance.max_length = MEMORY_LENGTH
             cls._instance.history = []
-            cls._instance.file_path = CHAT_HISTORY_FILE
+            cls._instance.file_path = CHAT_HISTORY_JOURNAL
+            cls._instance.journal = HistoryJournal(CHAT_HISTORY_JOURNAL, MEMORY_LENGTH, legacy_path=CHAT_HISTORY_FILE)
+            # Agent steps save interactions from several threads at once
+            cls._instance.lock = threading.RLock()
             cls._instance.load_history()
         return cls._instance
 
-    def add_entry(self, prompt: str, response: str):
+    def add_entry(self, prompt: str, response: str, persist: bool = True):
+        """
+        Append an exchange to the history; with ``persist=False`` only in memory,
+        leaving the journal and the knowledge graph to a later ``save_entries``/``add_to_edge_kb``.
+        """
         logger.debug(f"Adding new entry to chat history: prompt='{prompt[:50]}...', response='{response[:50]}...'")
-        self.history.append({"prompt": prompt, "response": response})
-        if len(self.history) > self.max_length:
-            self.history.pop(0)
-        self.save_history()
+        entry = {"prompt": prompt, "response": response}
+        with self.lock:
+            self.history.append(entry)
+            if len(self.history) > self.max_length:
+                self.history.pop(0)
+            if persist:
+                self.journal.append(entry)
         logger.info(f"Added new entry to chat history. Total entries: {len(self.history)}")
 
-        # Add entry to edge-based knowledge graph
-        self.add_to_edge_kb(prompt, response)
+        if persist:
+            # Add entry to edge-based knowledge graph
+            self.add_to_edge_kb(prompt, response)
 
     def get_history(self):
         return self.history
 
     def clear(self):
-        self.history = []
-        self.save_history()
+        with self.lock:
+            self.history = []
+            self.save_history()
         logger.info("Chat history cleared")
 
+    def save_entries(self, entries: Iterable[Tuple[str, str]]):
+        """
+        Append exchanges already added to the history with ``persist=False`` to the journal.
+        """
+        self.journal.append_many({"prompt": prompt, "response": response} for prompt, response in entries)
+
     def save_history(self):
+        """
+        Rewrite the journal with the current history, e.g. after ``history`` was replaced.
+        """
         logger.debug(f"Saving chat history to {self.file_path}")
-        write_json_file(self.file_path, self.history)
+        with self.lock:
+            self.journal.rewrite(self.history)
         logger.info(f"Saved chat history to {self.file_path}")
 
     def load_history(self):
-        if self.file_path.exists():
-            loaded_history = read_json_file(self.file_path)
-            self.history = [
-                {"prompt": entry["prompt"], "response": entry["response"]}
-                for entry in loaded_history
-                if isinstance(entry, dict) and "prompt" in entry and "response" in entry
-            ][-self.max_length:]
-            logger.info(f"Loaded {len(self.history)} entries from chat history")
-        else:
-            logger.warning(f"Chat history file not found at {self.file_path}")
+        loaded_history = self.journal.load()
+        self.history = [
+            {"prompt": entry["prompt"], "response": entry["response"]}
+            for entry in loaded_history
+            if isinstance(entry, dict) and "prompt" in entry and "response" in entry
+        ][-self.max_length:]
+        logger.info(f"Loaded {len(self.history)} entries from chat history")
 
     def add_to_edge_kb(self, prompt: str, response: str):
         """
@@ -74,12 +100,15 @@ class ChatHistory:
 
 chat_history = ChatHistory()
 
-def save_memory(memory_type: str, content: Dict[str, Any], username: str, model_name: str, metadata: Dict[str, Any] = None):
-    ensure_directory_exists(DATA_DIR)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{memory_type}.json"
+def memory_record(memory_type: str, content: Dict[str, Any], username: str, model_name: str,
+                  metadata: Dict[str, Any] = None, now: Optional[datetime] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the (filename, data) pair under which a memory is stored.
+    """
+    now = now or datetime.now()
+    filename = f"{now.strftime('%Y%m%d_%H%M%S_%f')}_{memory_type}.json"
     data = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now.isoformat(),
         "username": username,
         "model_name": model_name,
         "type": memory_type,
@@ -89,12 +118,19 @@ def save_memory(memory_type: str, content: Dict[str, Any], username: str, model_
     }
     if metadata:
         data.update(metadata)
-    file_path = DATA_DIR / filename
-    write_json_file(file_path, data)
+    return filename, data
+
+def save_memory(memory_type: str, content: Dict[str, Any], username: str, model_name: str, metadata: Dict[str, Any] = None, embedding: List[float] = None):
+    filename, data = memory_record(memory_type, content, username, model_name, metadata)
+    get_memory_store().put(filename, data)
     logger.info(f"Saved {memory_type} memory: {filename}")
 
+    # Append to the vector index (imported lazily: memory_search imports this module via ollama_client)
+    from .memory_search import index_memory
+    index_memory(filename, data, embedding)
+
     # Add to edge-based knowledge graph
-    add_memory_to_edge_kb(data)
+    add_memory_to_edge_kb(data, filename)
 
 def save_interaction(prompt: str, response: str, username: str, model_name: str):
     logger.debug(f"Saving interaction: prompt='{prompt[:50]}...', response='{response[:50]}...', username='{username}', model='{model_name}'")
@@ -102,32 +138,80 @@ def save_interaction(prompt: str, response: str, username: str, model_name: str)
     save_memory("interaction", {"prompt": prompt, "response": response}, username, model_name)
     logger.debug(f"Saved interaction for user {username}")
 
-def save_document_chunk(chunk_id: str, chunk_content: str, username: str, model_name: str):
-    save_memory("document_chunk", chunk_content, username, model_name, {"chunk_id": chunk_id})
+def save_interactions(interactions: Iterable[Tuple[str, str, str, str, datetime]], history: Iterable[Tuple[str, str]] = (),
+                      index: bool = True) -> int:
+    """
+    Store (prompt, response, username, model_name, timestamp) interactions as memories in bulk.
+
+    The memories are written in one memory store transaction and embedded in
+    one batch, and their edges, together with the PROMPT_RESPONSE edges of the
+    ``history`` exchanges already appended to the chat history in memory, in
+    one edge transaction; those exchanges are also appended to the chat
+    history journal in one write. With ``index`` False the memories are not
+    embedded and are left to the embedding backfill.
+
+    Returns:
+        int: Number of memories written.
+    """
+    memories, seen = [], set()
+    for prompt, response, username, model_name, now in interactions:
+        filename, data = memory_record("interaction", {"prompt": prompt, "response": response}, username, model_name, now=now)
+        # Interactions saved in the same microsecond would otherwise overwrite each other
+        suffix = 1
+        while filename in seen:
+            suffix += 1
+            filename = f"{now.strftime('%Y%m%d_%H%M%S_%f')}_interaction_{suffix}.json"
+        seen.add(filename)
+        memories.append((filename, data))
+    history = list(history)
+    if history:
+        chat_history.save_entries(history)
+
+    get_memory_store().put_many(memories)
+    if index:
+        from .memory_search import index_memories
+        index_memories(memories)
+    with EdgeWriter():
+        for prompt, response in history:
+            chat_history.add_to_edge_kb(prompt, response)
+        for filename, data in memories:
+            add_memory_to_edge_kb(data, filename)
+    logger.debug(f"Saved {len(memories)} interactions")
+    return len(memories)
+
+def save_document_chunk(chunk_id: str, chunk_content: str, username: str, model_name: str, embedding: List[float] = None):
+    save_memory("document_chunk", chunk_content, username, model_name, {"chunk_id": chunk_id}, embedding=embedding)
     logger.debug(f"Saved document chunk {chunk_id} for user {username}")
 
 def get_chat_history():
     return chat_history.get_history()
 
-def add_memory_to_edge_kb(memory_data: Dict[str, Any]):
+def add_memory_to_edge_kb(memory_data: Dict[str, Any], memory_id: Optional[str] = None):
     """
     Add a memory entry to the edge-based knowledge graph.
+
+    The memory's node is the hash of its data; a STORED_AS edge links it to
+    ``memory_id``, its id in the memory store, when one is given.
     """
-    memory_id = hashlib.md5(json.dumps(memory_data, sort_keys=True).encode()).hexdigest()
+    node_id = hashlib.md5(json.dumps(memory_data, sort_keys=True).encode()).hexdigest()
 
     # Create edges based on memory type
+    edges = []
     if memory_data['type'] == 'interaction':
         prompt_id = hashlib.md5(memory_data['content']['prompt'].encode()).hexdigest()
         response_id = hashlib.md5(memory_data['content']['response'].encode()).hexdigest()
-        create_edge(memory_id, prompt_id, "CONTAINS_PROMPT", 1.0)
-        create_edge(memory_id, response_id, "CONTAINS_RESPONSE", 1.0)
+        edges.append((node_id, prompt_id, "CONTAINS_PROMPT", 1.0))
+        edges.append((node_id, response_id, "CONTAINS_RESPONSE", 1.0))
     elif memory_data['type'] == 'document_chunk':
         chunk_id = memory_data['chunk_id']
-        create_edge(memory_id, chunk_id, "CONTAINS_CHUNK", 1.0)
+        edges.append((node_id, chunk_id, "CONTAINS_CHUNK", 1.0))
 
     # Create edges for metadata
-    create_edge(memory_id, memory_data['username'], "CREATED_BY", 1.0)
-    create_edge(memory_id, memory_data['model_name'], "USED_MODEL", 1.0)
+    edges.append((node_id, memory_data['username'], "CREATED_BY", 1.0))
+    edges.append((node_id, memory_data['model_name'], "USED_MODEL", 1.0))
+    if memory_id:
+        edges.append((node_id, memory_id, "STORED_AS", 1.0))
+    create_edges(edges)
 
     # TODO: Implement more sophisticated edge creation based on content analysis
     # For example, extract entities or topics from the memory content
@@ -136,32 +220,33 @@ def add_memory_to_edge_kb(memory_data: Dict[str, Any]):
 def get_related_memories(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     """
     Retrieve related memories from the edge-based knowledge graph.
+
+    Walks out from the query's node without following HUB_RELATIONSHIPS
+    edges and keeps the nodes that are stored memories, best first. Memories
+    hang off their prompt, response and chunk nodes, so three hops reach a
+    memory that shares one of those with a memory of the query.
     """
     query_id = hashlib.md5(query.encode()).hexdigest()
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # This is a simplified query. In a more advanced implementation,
-    # you might want to use more sophisticated graph traversal algorithms.
-    cursor.execute("""
-        SELECT e.target_id, e.relationship_type, e.strength
-        FROM edges e
-        WHERE e.source_id = ?
-        ORDER BY e.strength DESC
-        LIMIT ?
-    """, (query_id, top_k))
-
-    related_nodes = cursor.fetchall()
-    conn.close()
-
+    related = []
+    for hit in k_hop_neighbors(query_id, max_depth=3, exclude_relationships=HUB_RELATIONSHIPS):
+        stored = get_strongest_neighbors(hit.node_id, 1, "STORED_AS")
+        if stored:
+            related.append((hit, stored[0][0]))
+            if len(related) >= top_k:
+                break
+
+    memories = get_memory_store().get_many(memory_id for _, memory_id in related)
     related_memories = []
-    for node_id, relationship_type, strength in related_nodes:
-        memory_data = read_json_file(DATA_DIR / f"{node_id}.json")
+    for hit, memory_id in related:
+        memory_data = memories.get(memory_id)
+        if memory_data is None:
+            continue
         related_memories.append({
             "content": memory_data.get("content", ""),
             "type": memory_data.get("type", "unknown"),
-            "relationship": relationship_type,
-            "strength": strength
+            "relationship": hit.relationship_type,
+            "strength": hit.score,
+            "hops": hit.hops
         })
 
     return related_memories
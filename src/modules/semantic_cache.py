@@ -0,0 +1,271 @@
+# src/modules/semantic_cache.py
+
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from .logging_setup import logger
+from .errors import DataProcessingError
+from .db_connection import get_connection_manager
+from .embedding_service import default_embedding_service
+
+SEMANTIC_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS semantic_responses (
+        id INTEGER PRIMARY KEY,
+        scope TEXT NOT NULL,
+        prompt TEXT NOT NULL,
+        response TEXT NOT NULL,
+        embedding BLOB NOT NULL,
+        created_at REAL NOT NULL
+    );
+"""
+
+def cache_scope(model: str, options: Optional[Dict[str, Any]] = None, call_site: Optional[str] = None) -> str:
+    # Only prompts sent to the same model, with the same options, from the same call site are compared
+    return json.dumps([model, options or {}, call_site], sort_keys=True, ensure_ascii=False)
+
+class SemanticMatch(NamedTuple):
+    prompt: str        # the cached prompt that matched
+    response: str
+    similarity: float  # cosine similarity between the two prompt embeddings
+
+class _ScopeRows:
+    """
+    Entries of one scope: metadata lists plus an L2-normalised embedding matrix.
+
+    The matrix is preallocated and doubled when full, so adding an entry is
+    amortised O(1); a removed row is overwritten by the last one.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 16):
+        self.vectors = np.empty((capacity, dimension), dtype=np.float32)
+        self.created = np.empty(capacity, dtype=np.float64)
+        self.rowids: List[int] = []
+        self.prompts: List[str] = []
+        self.responses: List[str] = []
+        self.positions: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.rowids)
+
+    def add(self, rowid: int, prompt: str, response: str, vector: np.ndarray, created: float):
+        row = len(self.rowids)
+        if row == self.vectors.shape[0]:
+            self.vectors = np.concatenate([self.vectors, np.empty_like(self.vectors)])
+            self.created = np.concatenate([self.created, np.empty_like(self.created)])
+        self.vectors[row] = vector
+        self.created[row] = created
+        self.rowids.append(rowid)
+        self.prompts.append(prompt)
+        self.responses.append(response)
+        self.positions[rowid] = row
+
+    def remove(self, rowid: int):
+        row, last = self.positions.pop(rowid), len(self.rowids) - 1
+        if row != last:
+            self.vectors[row], self.created[row] = self.vectors[last], self.created[last]
+            self.rowids[row], self.prompts[row], self.responses[row] = self.rowids[last], self.prompts[last], self.responses[last]
+            self.positions[self.rowids[row]] = row
+        del self.rowids[last], self.prompts[last], self.responses[last]
+
+    def nearest(self, vector: np.ndarray, oldest: Optional[float]) -> Optional[Tuple[int, float]]:
+        """
+        Return the row and score of the most similar entry created after ``oldest``.
+        """
+        count = len(self.rowids)
+        if not count:
+            return None
+        scores = self.vectors[:count] @ vector
+        if oldest is not None:
+            scores[self.created[:count] <= oldest] = -np.inf
+        best = int(np.argmax(scores))
+        return (best, float(scores[best])) if np.isfinite(scores[best]) else None
+
+class SemanticResponseCache:
+    """
+    Response cache that also answers prompts which are near-identical to a cached one.
+
+    Every stored prompt is embedded and kept, L2-normalised, in an in-memory
+    matrix per scope (model, options and call site) that is searched with one
+    matrix-vector product; the rows are persisted in SQLite so the cache
+    survives restarts. A lookup returns the response of the most similar
+    prompt in the same scope when the cosine similarity reaches that call
+    site's threshold, taken from ``thresholds`` or else ``default_threshold``;
+    a threshold of None turns the call site off. Entries expire after the
+    call site's TTL from ``ttls`` or else ``default_ttl`` (None keeps them, 0
+    turns the call site off), and the oldest entries are evicted beyond
+    ``max_entries``.
+
+    In ``shadow`` mode lookups never serve a response: matches are only
+    logged and counted, so thresholds can be tuned before the cache is used.
+    """
+
+    def __init__(self, db_path: Path, embed: Optional[Callable[[str], List[float]]] = None,
+                 default_threshold: Optional[float] = 0.95, thresholds: Optional[Dict[str, Optional[float]]] = None,
+                 max_entries: int = 2000, default_ttl: Optional[float] = None,
+                 ttls: Optional[Dict[str, Optional[float]]] = None, shadow: bool = False):
+        self.db_path = Path(db_path)
+        self.embed = embed or default_embedding_service.embed
+        self.default_threshold = default_threshold
+        self.thresholds = dict(thresholds or {})
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.shadow = shadow
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "shadow_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+        self.dimension: Optional[int] = None
+        self.scopes: Dict[str, _ScopeRows] = {}
+        self.order: "OrderedDict[int, str]" = OrderedDict()  # rowid -> scope, oldest first
+        self.connections = get_connection_manager(self.db_path, SEMANTIC_CACHE_SCHEMA)
+        try:
+            self._load()
+        except sqlite3.Error as e:
+            logger.error(f"Error opening semantic response cache {self.db_path}: {str(e)}")
+            raise DataProcessingError(f"Failed to open semantic response cache: {str(e)}")
+
+    def _load(self):
+        rows = self.connections.get_connection().execute(
+            "SELECT id, scope, prompt, response, embedding, created_at FROM semantic_responses ORDER BY id"
+        ).fetchall()
+        for rowid, scope, prompt, response, blob, created_at in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if self.dimension is None:
+                self.dimension = vector.shape[0]
+            elif vector.shape[0] != self.dimension:
+                # Left behind by a different embedding model; it can never match again
+                continue
+            self._add(rowid, scope, prompt, response, vector, created_at)
+        logger.info(f"Loaded semantic response cache with {len(self.order)} entries")
+
+    def _add(self, rowid: int, scope: str, prompt: str, response: str, vector: np.ndarray, created: float):
+        if scope not in self.scopes:
+            self.scopes[scope] = _ScopeRows(self.dimension, min(16, self.max_entries))
+        self.scopes[scope].add(rowid, prompt, response, vector, created)
+        self.order[rowid] = scope
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def threshold_for(self, call_site: Optional[str]) -> Optional[float]:
+        return self.thresholds.get(call_site, self.default_threshold) if call_site is not None else self.default_threshold
+
+    def ttl_for(self, call_site: Optional[str]) -> Optional[float]:
+        return self.ttls.get(call_site, self.default_ttl) if call_site is not None else self.default_ttl
+
+    def enabled_for(self, call_site: Optional[str]) -> bool:
+        return self.threshold_for(call_site) is not None and self.ttl_for(call_site) != 0
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(self.embed(prompt), dtype=np.float32).ravel()
+        except Exception as e:
+            logger.warning(f"Could not embed prompt for the semantic response cache: {str(e)}")
+            with self.lock:
+                self.stats["errors"] += 1
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def nearest(self, prompt: str, model: str, options: Optional[Dict[str, Any]] = None,
+                call_site: Optional[str] = None) -> Optional[SemanticMatch]:
+        """
+        Return the most similar unexpired cached prompt in the same scope, whatever its similarity.
+        """
+        vector = self._embed(prompt)
+        if vector is None:
+            return None
+        ttl = self.ttl_for(call_site)
+        oldest = time.time() - ttl if ttl is not None else None
+        with self.lock:
+            rows = self.scopes.get(cache_scope(model, options, call_site))
+            if rows is None or vector.shape[0] != self.dimension:
+                return None
+            found = rows.nearest(vector, oldest)
+            if found is None:
+                return None
+            row, similarity = found
+            return SemanticMatch(rows.prompts[row], rows.responses[row], similarity)
+
+    def get(self, prompt: str, model: str, options: Optional[Dict[str, Any]] = None,
+            call_site: Optional[str] = None) -> Optional[str]:
+        """
+        Return the response to a near-identical cached prompt, or None.
+
+        In shadow mode a match is logged but None is returned.
+        """
+        threshold = self.threshold_for(call_site)
+        if threshold is None:
+            return None
+        match = self.nearest(prompt, model, options, call_site)
+        if match is None or match.similarity < threshold:
+            if match is not None:
+                logger.debug(f"Semantic cache miss for {call_site}: best similarity {match.similarity:.3f} < {threshold}")
+            with self.lock:
+                self.stats["misses"] += 1
+            return None
+        with self.lock:
+            self.stats["shadow_hits" if self.shadow else "hits"] += 1
+        if self.shadow:
+            logger.info(f"Semantic cache (shadow) would serve {call_site} at similarity {match.similarity:.3f}: "
+                        f"prompt {prompt[:80]!r} matched {match.prompt[:80]!r}, response {match.response[:80]!r}")
+            return None
+        logger.info(f"Semantic cache hit for {call_site} at similarity {match.similarity:.3f}: {prompt[:50]}...")
+        return match.response
+
+    def put(self, prompt: str, model: str, response: str, options: Optional[Dict[str, Any]] = None,
+            call_site: Optional[str] = None):
+        if not self.enabled_for(call_site):
+            return
+        vector = self._embed(prompt)
+        if vector is None:
+            return
+        scope = cache_scope(model, options, call_site)
+        now = time.time()
+        with self.lock:
+            if self.dimension is not None and self.dimension != vector.shape[0]:
+                if self.order:
+                    logger.warning(f"Embedding dimension changed to {vector.shape[0]}; clearing the semantic response cache")
+                self._clear()
+            self.dimension = vector.shape[0]
+            evicted = list(islice(self.order, max(0, len(self.order) + 1 - self.max_entries)))
+            try:
+                conn = self.connections.get_connection()
+                rowid = conn.execute(
+                    "INSERT INTO semantic_responses (scope, prompt, response, embedding, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (scope, prompt, response, vector.tobytes(), now)
+                ).lastrowid
+                if evicted:
+                    conn.executemany("DELETE FROM semantic_responses WHERE id = ?", [(old,) for old in evicted])
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing to semantic response cache: {str(e)}")
+                return
+            for old in evicted:
+                old_scope = self.order.pop(old)
+                self.scopes[old_scope].remove(old)
+                if not self.scopes[old_scope]:
+                    del self.scopes[old_scope]
+            self.stats["evictions"] += len(evicted)
+            self._add(rowid, scope, prompt, response, vector, now)
+            self.stats["stores"] += 1
+
+    def _clear(self):
+        conn = self.connections.get_connection()
+        conn.execute("DELETE FROM semantic_responses")
+        conn.commit()
+        self.dimension = None
+        self.scopes, self.order = {}, OrderedDict()
+
+    def clear(self):
+        with self.lock:
+            self._clear()
+
+    def close(self):
+        with self.lock:
+            self.connections.close()
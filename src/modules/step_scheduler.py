@@ -0,0 +1,209 @@
+# src/modules/step_scheduler.py
+
+import copy
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from config import AGENT_STEP_MAX_WORKERS, COGNITIVE_CACHE_SIZE
+from .logging_setup import logger
+
+class Step(NamedTuple):
+    name: str
+    func: Callable[..., Any]
+    requires: Tuple[str, ...] = ()  # called with these results as positional arguments, in order
+    timeout: Optional[float] = None
+    optional: bool = False          # may be skipped (budget, timeout or error); its result is then ``default``
+    default: Any = None
+    cache: bool = False             # reuse the result of an earlier step of this name with identical arguments
+    estimate: float = 0.0           # expected seconds until the step has been timed
+
+class StepRun(NamedTuple):
+    results: Dict[str, Any]
+    timings: Dict[str, float]       # seconds per executed or cached step
+    skipped: Dict[str, str]         # step name -> "budget", "timeout" or "error"
+    cache_hits: List[str]
+
+class StepScheduler:
+    """
+    Runs named steps on a thread pool, each as soon as the steps it requires have finished.
+
+    Independent steps (typically blocking Ollama calls) overlap, so a batch
+    takes roughly as long as its critical path. Background batches run one
+    at a time on a separate coordinator thread, in submission order.
+
+    Each step's latency is kept as a moving average; under a latency budget,
+    an optional step whose expected latency no longer fits is skipped and
+    its result falls back to the step's default. Steps marked ``cache`` are
+    answered from an LRU cache keyed by a hash of their name and arguments.
+    Callers that share the scheduler pass a ``namespace`` so that equally
+    named steps of different DAGs keep separate latencies and cache entries.
+    """
+
+    def __init__(self, max_workers: int = AGENT_STEP_MAX_WORKERS, cache_size: int = 256, smoothing: float = 0.3):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="agent-step")
+        self.background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-background")
+        self.cache_size = cache_size
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+        self.latency: Dict[str, float] = {}
+        self.cache: "OrderedDict[str, Any]" = OrderedDict()
+
+    def _check(self, steps: Dict[str, Step], known: Iterable[str]):
+        available = set(known) | set(steps)
+        for step in steps.values():
+            missing = [name for name in step.requires if name not in available]
+            if missing:
+                raise ValueError(f"Step '{step.name}' requires unknown steps: {', '.join(missing)}")
+        done, remaining = set(known), dict(steps)
+        while remaining:
+            ready = [name for name, step in remaining.items() if all(dep in done for dep in step.requires)]
+            if not ready:
+                raise ValueError(f"Steps have circular requirements: {', '.join(sorted(remaining))}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    @staticmethod
+    def step_key(step: Step, namespace: str = "") -> str:
+        return f"{namespace}/{step.name}" if namespace else step.name
+
+    def expected_latency(self, step: Step, namespace: str = "") -> float:
+        return self.latency.get(self.step_key(step, namespace), step.estimate)
+
+    def _cache_key(self, step: Step, args: List[Any], namespace: str) -> str:
+        payload = json.dumps([self.step_key(step, namespace), args], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Tuple[bool, Any]:
+        with self.lock:
+            if key not in self.cache:
+                return False, None
+            self.cache.move_to_end(key)
+            return True, copy.deepcopy(self.cache[key])
+
+    def _cache_put(self, key: str, result: Any):
+        with self.lock:
+            self.cache[key] = copy.deepcopy(result)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def _record(self, key: str, seconds: float):
+        with self.lock:
+            self.timings[key] = seconds
+            previous = self.latency.get(key)
+            self.latency[key] = seconds if previous is None else previous + self.smoothing * (seconds - previous)
+
+    @staticmethod
+    def _timed(step: Step, args: List[Any]) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        result = step.func(*args)
+        return result, time.perf_counter() - start
+
+    @staticmethod
+    def _skip(run: StepRun, step: Step, reason: str):
+        run.skipped[step.name] = reason
+        run.results[step.name] = copy.copy(step.default)
+        logger.info(f"Skipped step {step.name} ({reason})")
+
+    def execute(self, steps: Iterable[Step], results: Optional[Dict[str, Any]] = None,
+                budget: Optional[float] = None, namespace: str = "") -> StepRun:
+        """
+        Run the steps within an optional latency ``budget`` in seconds and report how each went.
+
+        Raises:
+            ValueError: If a requirement is unknown or the requirements form a cycle.
+            TimeoutError: If a required step exceeds its timeout.
+            Exception: The first error raised by a required step; steps not yet started are cancelled.
+        """
+        steps = {step.name: step for step in steps}
+        run = StepRun(dict(results or {}), {}, {}, [])
+        self._check(steps, run.results)
+        start = time.monotonic()
+        deadline = start + budget if budget is not None else None
+        waiting = dict(steps)
+        pending: Dict[Future, Tuple[Step, Optional[str], float]] = {}
+        try:
+            while waiting or pending:
+                # Cache hits and skips finish at once and may make further steps ready
+                ready = [step for step in waiting.values() if all(dep in run.results for dep in step.requires)]
+                while ready:
+                    for step in ready:
+                        del waiting[step.name]
+                        args = [run.results[dep] for dep in step.requires]
+                        key = self._cache_key(step, args, namespace) if step.cache else None
+                        hit, result = self._cache_get(key) if key else (False, None)
+                        if hit:
+                            run.results[step.name] = result
+                            run.timings[step.name] = 0.0
+                            run.cache_hits.append(step.name)
+                        elif step.optional and deadline is not None and time.monotonic() + self.expected_latency(step, namespace) > deadline:
+                            self._skip(run, step, "budget")
+                        else:
+                            pending[self.executor.submit(self._timed, step, args)] = (step, key, time.monotonic())
+                    ready = [step for step in waiting.values() if all(dep in run.results for dep in step.requires)]
+                if not pending:
+                    break
+                now = time.monotonic()
+                limits = [started + step.timeout - now for step, _, started in pending.values() if step.timeout is not None]
+                finished, _ = wait(pending, timeout=max(0.0, min(limits)) if limits else None, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for future, (step, key, started) in list(pending.items()):
+                    if future in finished:
+                        del pending[future]
+                        try:
+                            result, seconds = future.result()
+                        except Exception as e:
+                            if not step.optional:
+                                raise
+                            logger.warning(f"Step {step.name} failed: {str(e)}")
+                            self._skip(run, step, "error")
+                            continue
+                        run.timings[step.name] = seconds
+                        self._record(self.step_key(step, namespace), seconds)
+                        if key:
+                            self._cache_put(key, result)
+                        run.results[step.name] = result
+                    elif step.timeout is not None and now - started >= step.timeout:
+                        # The worker thread cannot be interrupted; its late result is dropped
+                        del pending[future]
+                        future.cancel()
+                        self._record(self.step_key(step, namespace), now - started)
+                        if not step.optional:
+                            raise TimeoutError(f"Step '{step.name}' timed out after {step.timeout}s")
+                        self._skip(run, step, "timeout")
+        finally:
+            for future in pending:
+                future.cancel()
+        logger.debug(f"Ran {len(steps)} steps in {time.monotonic() - start:.2f}s: "
+                     + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in run.timings.items())
+                     + (f"; skipped {run.skipped}" if run.skipped else ""))
+        return run
+
+    def run(self, steps: Iterable[Step], results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run every step and return all results by step name, including the ``results`` passed in.
+
+        Raises:
+            ValueError: If a requirement is unknown or the requirements form a cycle.
+            Exception: The first error raised by a step; steps not yet started are cancelled.
+        """
+        return self.execute(steps, results).results
+
+    def run_in_background(self, steps: Iterable[Step], results: Optional[Dict[str, Any]] = None) -> Future:
+        """
+        Queue a batch behind any earlier background batches and return a Future of its results.
+        """
+        return self.background.submit(self.run, list(steps), results)
+
+    def shutdown(self, wait: bool = True):
+        self.background.shutdown(wait=wait)
+        self.executor.shutdown(wait=wait)
+
+# Shared by the agents and pipelines so all of their steps count against one worker cap
+default_scheduler = StepScheduler(cache_size=COGNITIVE_CACHE_SIZE)
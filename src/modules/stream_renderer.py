@@ -0,0 +1,116 @@
+# src/modules/stream_renderer.py
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional, TypeVar
+from rich.console import Console
+from rich.live import Live
+from rich.text import Text
+from config import STREAM_HEADLESS, STREAM_REFRESH_PER_SECOND
+
+# Rich allows one Live display at a time; concurrent streams render headless
+_live_display = threading.Lock()
+_thread_state = threading.local()
+
+T = TypeVar("T")
+
+@contextmanager
+def headless_streams():
+    """
+    Render every stream started on the current thread headless while the block runs.
+    """
+    previous = getattr(_thread_state, "headless", False)
+    _thread_state.headless = True
+    try:
+        yield
+    finally:
+        _thread_state.headless = previous
+
+def run_headless(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap ``func`` so it runs under ``headless_streams`` on whichever thread calls it.
+    """
+    def run(*args, **kwargs) -> T:
+        with headless_streams():
+            return func(*args, **kwargs)
+    return run
+
+class StreamRenderer:
+    """
+    Shows a streamed response as it arrives, in time linear in its length.
+
+    Chunks are collected in a list and joined once. Rendering happens at most
+    ``refresh_per_second`` times a second: lines completed since the last
+    render are printed above the live region once, and the live region only
+    holds the unfinished last line, so no frame re-renders earlier text.
+
+    A ``headless`` renderer, one started under ``headless_streams`` or one
+    started while another stream holds the display only collects chunks.
+    """
+
+    def __init__(self, console: Optional[Console] = None, style: str = "yellow bold",
+                 refresh_per_second: float = STREAM_REFRESH_PER_SECOND, headless: bool = STREAM_HEADLESS,
+                 placeholder: str = "Processing..."):
+        self.console = console or Console()
+        self.style = style
+        self.interval = 1 / refresh_per_second if refresh_per_second > 0 else 0.0
+        self.headless = headless
+        self.placeholder = placeholder
+        self.parts: List[str] = []
+        self.pending: List[str] = []
+        self.renders = 0
+        self._live: Optional[Live] = None
+        self._next_render = 0.0
+
+    def __enter__(self) -> "StreamRenderer":
+        headless = self.headless or getattr(_thread_state, "headless", False)
+        if not headless and _live_display.acquire(blocking=False):
+            self._live = Live(Text(self.placeholder, style=self.style), console=self.console, auto_refresh=False)
+            try:
+                self._live.start(refresh=True)
+            except Exception:
+                self._live = None
+                _live_display.release()
+                raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._live is not None:
+            try:
+                if self.pending:
+                    self._render()
+                self._live.stop()
+            finally:
+                self._live = None
+                _live_display.release()
+
+    @property
+    def live(self) -> bool:
+        return self._live is not None
+
+    def feed(self, chunk: str):
+        """
+        Add a chunk, rendering if the last render is at least one refresh interval old.
+        """
+        self.parts.append(chunk)
+        if self._live is None:
+            return
+        self.pending.append(chunk)
+        now = time.monotonic()
+        if now >= self._next_render:
+            self._next_render = now + self.interval
+            self._render()
+
+    __call__ = feed
+
+    def _render(self):
+        done, newline, tail = "".join(self.pending).rpartition("\n")
+        if newline:
+            self._live.console.print(Text(done, style=self.style))
+        self.pending = [tail] if tail else []
+        self._live.update(Text(tail, style=self.style), refresh=True)
+        self.renders += 1
+
+    def getvalue(self) -> str:
+        return "".join(self.parts)
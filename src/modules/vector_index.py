@@ -0,0 +1,214 @@
+# src/modules/vector_index.py
+
+import re
+import json
+import threading
+import numpy as np
+from pathlib import Path
+from typing import List, Tuple, Dict, Iterable, Optional
+from config import VECTOR_INDEX_DIR, EMBEDDING_MODEL
+from .logging_setup import logger
+from .errors import DataProcessingError
+
+def top_k_similar(queries: np.ndarray, matrix: np.ndarray, top_k: Optional[int] = None, normalized: bool = False) -> List[List[Tuple[float, int]]]:
+    """
+    Score every query against every matrix row by cosine similarity in one matrix product.
+
+    Args:
+        queries (np.ndarray): (q, dim) array of query vectors.
+        matrix (np.ndarray): (n, dim) array of candidate vectors.
+        top_k (Optional[int]): Number of best matches to keep per query; all rows when None.
+        normalized (bool): Whether the rows of both arrays are already L2-normalised.
+
+    Returns:
+        List[List[Tuple[float, int]]]: Per query, (similarity, row index) pairs, best first.
+    """
+    queries, matrix = np.atleast_2d(np.asarray(queries)), np.atleast_2d(np.asarray(matrix))
+    dtype = np.result_type(queries, matrix, np.float32)
+    queries, matrix = queries.astype(dtype, copy=False), matrix.astype(dtype, copy=False)
+    if matrix.shape[0] == 0 or matrix.shape[1] == 0:
+        return [[] for _ in range(queries.shape[0])]
+    if queries.shape[1] != matrix.shape[1]:
+        raise DataProcessingError(f"Query dimension {queries.shape[1]} does not match matrix dimension {matrix.shape[1]}")
+
+    scores = matrix @ queries.T
+    if not normalized:
+        query_norms = np.linalg.norm(queries, axis=1)
+        row_norms = np.linalg.norm(matrix, axis=1)
+        denominator = np.outer(row_norms, query_norms)
+        scores = np.divide(scores, denominator, out=np.zeros_like(scores), where=denominator != 0)
+    scores = scores.T
+
+    n = scores.shape[1]
+    k = n if top_k is None else max(0, min(top_k, n))
+    if k == 0:
+        return [[] for _ in range(queries.shape[0])]
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k < n else np.tile(np.arange(n), (scores.shape[0], 1))
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return [
+        [(float(score), int(row)) for score, row in zip(row_scores, row_indices)]
+        for row_scores, row_indices in zip(top_scores, top)
+    ]
+
+class VectorIndex:
+    """
+    Persistent, append-only index of L2-normalised embedding vectors.
+
+    Vectors are stored as one contiguous float32 matrix (``vectors.f32``) whose
+    row ``i`` belongs to line ``i`` of the id table (``ids.txt``). The matrix is
+    memory-mapped for reads, so a search is a single matrix-vector product.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.vectors_path = self.directory / "vectors.f32"
+        self.ids_path = self.directory / "ids.txt"
+        self.meta_path = self.directory / "meta.json"
+        self.lock = threading.RLock()
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self.id_to_row: Dict[str, int] = {}
+        self._matrix = None
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.id_to_row
+
+    def load(self):
+        """
+        Load the id table and metadata from disk, repairing a torn append.
+
+        Vectors are written before ids, so after a crash the two files can
+        disagree by a partial row; both are truncated to the common prefix.
+        """
+        with self.lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.ids, self.id_to_row, self._matrix = [], {}, None
+            if not self.meta_path.exists():
+                self.dim = None
+                return
+            try:
+                self.dim = json.loads(self.meta_path.read_text(encoding='utf-8'))['dim']
+                ids = self.ids_path.read_text(encoding='utf-8').splitlines() if self.ids_path.exists() else []
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error loading vector index from {self.directory}: {str(e)}")
+                raise DataProcessingError(f"Failed to load vector index from {self.directory}: {str(e)}")
+
+            row_bytes = self.dim * 4
+            rows = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+            count = min(len(ids), rows)
+            if count != len(ids) or (self.vectors_path.exists() and self.vectors_path.stat().st_size != count * row_bytes):
+                logger.warning(f"Repairing vector index {self.directory}: keeping {count} consistent rows")
+                with self.vectors_path.open('r+b' if self.vectors_path.exists() else 'wb') as f:
+                    f.truncate(count * row_bytes)
+                self.ids_path.write_text(''.join(f"{item_id}\n" for item_id in ids[:count]), encoding='utf-8')
+
+            self.ids = ids[:count]
+            self.id_to_row = {item_id: row for row, item_id in enumerate(self.ids)}
+            logger.info(f"Loaded vector index with {len(self.ids)} vectors of dimension {self.dim}")
+
+    def add(self, item_id: str, vector: List[float]) -> bool:
+        return self.add_many([(item_id, vector)]) == 1
+
+    def add_many(self, items: Iterable[Tuple[str, List[float]]]) -> int:
+        """
+        Append vectors to the index, skipping ids that are already present.
+
+        Returns:
+            int: Number of vectors appended.
+        """
+        with self.lock:
+            new_ids, rows = [], []
+            for item_id, vector in items:
+                if item_id in self.id_to_row or '\n' in item_id:
+                    continue
+                row = np.asarray(vector, dtype=np.float32).ravel()
+                if self.dim is None:
+                    self.dim = int(row.shape[0])
+                    self.meta_path.write_text(json.dumps({"dim": self.dim}), encoding='utf-8')
+                if row.shape[0] != self.dim:
+                    logger.error(f"Skipping vector for {item_id}: dimension {row.shape[0]} != index dimension {self.dim}")
+                    continue
+                row_norm = np.linalg.norm(row)
+                if row_norm == 0:
+                    logger.warning(f"Skipping zero vector for {item_id}")
+                    continue
+                self.id_to_row[item_id] = len(self.ids) + len(new_ids)
+                new_ids.append(item_id)
+                rows.append(row / row_norm)
+
+            if not new_ids:
+                return 0
+
+            try:
+                with self.vectors_path.open('ab') as f:
+                    f.write(np.vstack(rows).astype(np.float32).tobytes())
+                with self.ids_path.open('a', encoding='utf-8') as f:
+                    f.write(''.join(f"{item_id}\n" for item_id in new_ids))
+            except OSError as e:
+                logger.error(f"Error appending to vector index {self.directory}: {str(e)}")
+                self.load()
+                raise DataProcessingError(f"Failed to append to vector index: {str(e)}")
+
+            self.ids.extend(new_ids)
+            self._matrix = None
+            logger.debug(f"Appended {len(new_ids)} vectors to index (total: {len(self.ids)})")
+            return len(new_ids)
+
+    def matrix(self) -> np.ndarray:
+        """
+        Return the (n, dim) memory-mapped matrix of normalised vectors.
+        """
+        with self.lock:
+            if not self.ids:
+                return np.empty((0, self.dim or 0), dtype=np.float32)
+            if self._matrix is None or self._matrix.shape[0] != len(self.ids):
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(len(self.ids), self.dim))
+            return self._matrix
+
+    def search(self, query: List[float], top_k: int = 5) -> List[Tuple[float, str]]:
+        """
+        Return the ``top_k`` (cosine similarity, id) pairs for a query vector, best first.
+        """
+        return self.search_many([query], top_k)[0]
+
+    def search_many(self, queries: List[List[float]], top_k: int = 5) -> List[List[Tuple[float, str]]]:
+        """
+        Search several query vectors in a single pass over the index.
+        """
+        with self.lock:
+            matrix, ids = self.matrix(), self.ids
+        if matrix.shape[0] == 0 or top_k <= 0:
+            return [[] for _ in queries]
+        needles = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if needles.shape[1] != matrix.shape[1]:
+            logger.error(f"Query vectors of dimension {needles.shape[1]} cannot be searched against index dimension {matrix.shape[1]}")
+            return [[] for _ in queries]
+
+        norms = np.linalg.norm(needles, axis=1, keepdims=True)
+        needles = np.divide(needles, norms, out=np.zeros_like(needles), where=norms != 0)
+        return [
+            [(score, ids[row]) for score, row in matches]
+            for matches in top_k_similar(needles, matrix, top_k, normalized=True)
+        ]
+
+_memory_indexes: Dict[str, VectorIndex] = {}
+_memory_index_lock = threading.Lock()
+
+def get_memory_index(model: str = EMBEDDING_MODEL) -> VectorIndex:
+    """
+    Return the shared index of memory embeddings for ``model``, loading it on first use.
+
+    Each embedding model gets its own index directory so vectors from
+    different models are never compared with each other.
+    """
+    with _memory_index_lock:
+        if model not in _memory_indexes:
+            _memory_indexes[model] = VectorIndex(VECTOR_INDEX_DIR / re.sub(r'[^A-Za-z0-9_.-]', '_', model))
+        return _memory_indexes[model]
@@ -0,0 +1,37 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from src.modules.access_counter import AccessCounterStore
+
+class TestAccessCounterStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "counts.db"
+        self.store = AccessCounterStore(self.db_path, flush_interval=0)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_increments_are_visible_before_flush(self):
+        self.store.increment("a.json")
+        self.store.increment("a.json", 2)
+        self.assertEqual(self.store.get("a.json"), 3)
+        self.assertEqual(self.store.get("missing.json"), 0)
+
+    def test_flush_accumulates_into_sqlite(self):
+        self.store.increment("a.json")
+        self.store.increment("b.json")
+        self.assertEqual(self.store.flush(), 2)
+        self.store.increment("a.json")
+        self.store.flush()
+        self.store.close()
+        self.store = AccessCounterStore(self.db_path, flush_interval=0)
+        self.assertEqual(self.store.get_many(["a.json", "b.json"]), {"a.json": 2, "b.json": 1})
+
+    def test_flush_with_nothing_pending_writes_nothing(self):
+        self.assertEqual(self.store.flush(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
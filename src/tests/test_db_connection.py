@@ -0,0 +1,48 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from src.modules.db_connection import ConnectionManager, get_connection_manager, select_in
+
+class TestConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = ConnectionManager(self.temp_dir / "test.db", "CREATE TABLE IF NOT EXISTS t (x INTEGER);")
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_reuses_connection_per_thread(self):
+        conn = self.manager.get_connection()
+        self.assertIs(self.manager.get_connection(), conn)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.manager.get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+    def test_reopens_closed_connection(self):
+        conn = self.manager.get_connection()
+        conn.close()
+        reopened = self.manager.get_connection()
+        self.assertIsNot(reopened, conn)
+        self.assertEqual(reopened.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_select_in_chunks_parameters(self):
+        conn = self.manager.get_connection()
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(10)])
+        rows = select_in(conn, "SELECT x FROM t WHERE x > ? AND x IN ({placeholders}) ORDER BY x", list(range(8)), (2,), chunk_size=3)
+        self.assertEqual([row[0] for row in rows], [3, 4, 5, 6, 7])
+        self.assertEqual(select_in(conn, "SELECT x FROM t WHERE x IN ({placeholders})", []), [])
+
+    def test_registry_shares_manager_per_path(self):
+        path = self.temp_dir / "shared.db"
+        self.assertIs(get_connection_manager(path), get_connection_manager(str(path)))
+
+if __name__ == '__main__':
+    unittest.main()
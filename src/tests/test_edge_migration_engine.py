@@ -0,0 +1,128 @@
+import json
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+from src.modules.db_connection import ConnectionManager
+from src.modules.edge_migration import extract_features, generate_edges, SimilarityJoin, migrate_parallel
+from src.modules.kb_graph import analyze_file_pair, extract_key_concepts
+from src.utils.schema import SCHEMA
+
+WORDS = ["python", "data", "graph", "memory", "edge", "vector", "search", "model", "agent", "query", "index", "token"]
+
+def random_memory(rng: random.Random, start: datetime) -> dict:
+    memory = {
+        "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))),
+        "timestamp": (start + timedelta(hours=rng.randint(0, 400))).isoformat(),
+    }
+    if rng.random() < 0.5:
+        memory["tags"] = rng.sample(WORDS[:5], rng.randint(0, 2))
+    if rng.random() < 0.5:
+        memory["title"] = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+    return memory
+
+def brute_force_edges(memories):
+    features = [extract_features(memory) for memory in memories]
+    edges = set()
+    for i, memory in enumerate(memories):
+        edges.update((features[i].node_id, concept, "RELATED_TO", 1.0) for concept in extract_key_concepts(memory))
+        for j in range(i + 1, len(memories)):
+            for category, strength in analyze_file_pair(memory, memories[j]):
+                edges.add((features[i].node_id, features[j].node_id, category, strength))
+    return edges
+
+class TestEdgeMigration(unittest.TestCase):
+    def test_matches_pairwise_analysis(self):
+        rng = random.Random(7)
+        memories = [random_memory(rng, datetime(2024, 1, 1)) for _ in range(80)]
+        features = [extract_features(memory) for memory in memories]
+        self.assertEqual(set(generate_edges(features, temporal_neighbors=None)), brute_force_edges(memories))
+
+    def test_shards_cover_all_edges(self):
+        rng = random.Random(11)
+        memories = [random_memory(rng, datetime(2024, 1, 1)) for _ in range(40)]
+        features = [extract_features(memory) for memory in memories]
+        sharded = set(generate_edges(features, None, records=range(0, 20))) | set(generate_edges(features, None, records=range(20, 40)))
+        self.assertEqual(sharded, set(generate_edges(features, None)))
+
+    def test_temporal_neighbors_cap(self):
+        start = datetime(2024, 1, 1)
+        memories = [{"timestamp": (start + timedelta(minutes=i)).isoformat()} for i in range(6)]
+        features = [extract_features(memory) for memory in memories]
+        temporal = [edge for edge in generate_edges(features, temporal_neighbors=2) if edge[2] == "TEMPORALLY_CLOSE"]
+        self.assertEqual(len(temporal), 9)  # 2 + 2 + 2 + 2 + 1
+
+    def test_similarity_join(self):
+        join = SimilarityJoin(0.5, [frozenset({"a", "c"}), frozenset({"b", "d"}), None, frozenset({"a", "c", "d"})])
+        self.assertEqual(list(join.probe(3)), [(0, 2 / 3)])
+        self.assertEqual(list(join.probe(0)), [])
+        self.assertEqual(list(join.probe(2)), [])
+
+    def test_prefix_filter_matches_brute_force(self):
+        rng = random.Random(5)
+        words = [f"w{i}" for i in range(30)]
+        sets = [frozenset(rng.sample(words, rng.randint(0, 12))) for _ in range(150)]
+        sets += [frozenset(words[:10]), frozenset(words[3:13])]  # 0.3 * 10 evaluates just above 3
+        for threshold in (0.0, 0.3, 0.5, 0.8):
+            join = SimilarityJoin(threshold, sets[:100])
+            join.probe(0)
+            for tokens in sets[100:]:
+                join.add(tokens)  # adding after a probe rebuilds the index
+            found = {(i, j): similarity for j in range(len(sets)) for i, similarity in join.probe(j)}
+            expected = {}
+            for j, b in enumerate(sets):
+                for i, a in enumerate(sets[:j]):
+                    if a & b and len(a & b) / len(a | b) > threshold:
+                        expected[(i, j)] = len(a & b) / len(a | b)
+            self.assertEqual(found, expected)
+
+class TestParallelMigration(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        rng = random.Random(3)
+        self.memories = [random_memory(rng, datetime(2024, 1, 1)) for _ in range(30)]
+        self.paths = []
+        for i, memory in enumerate(self.memories):
+            path = self.temp_dir / f"{i:03d}.json"
+            path.write_text(json.dumps(memory))
+            self.paths.append(str(path))
+        self.manager = ConnectionManager(self.temp_dir / "edges.db", SCHEMA)
+        self.patcher = patch('src.modules.kb_graph.get_db_connection', self.manager.get_connection)
+        self.patcher.start()
+        self.checkpoint = self.temp_dir / "checkpoint.json"
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def stored_edges(self):
+        return set(self.manager.get_connection().execute("SELECT source_id, target_id, relationship_type, strength FROM edges"))
+
+    def test_workers_write_all_edges(self):
+        migrate_parallel("json", self.paths, workers=2, shard_size=7, temporal_neighbors=None)
+        features = [extract_features(memory, Path(path).name) for memory, path in zip(self.memories, self.paths)]
+        edges = self.stored_edges()
+        self.assertEqual(edges, set(generate_edges(features, None)))
+        stored_as = {(source, target) for source, target, relationship, _ in edges if relationship == "STORED_AS"}
+        self.assertEqual(stored_as, {(feature.node_id, feature.memory_id) for feature in features})
+
+    def test_resumes_from_checkpoint(self):
+        def crash_after_first_shard(done, total, edges):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            migrate_parallel("json", self.paths, workers=1, shard_size=10, checkpoint_path=self.checkpoint,
+                             progress_callback=crash_after_first_shard)
+        self.assertEqual(json.loads(self.checkpoint.read_text())["completed_shards"], [0])
+
+        progress = []
+        migrate_parallel("json", self.paths, workers=1, shard_size=10, checkpoint_path=self.checkpoint,
+                         progress_callback=lambda done, total, edges: progress.append(done))
+        self.assertEqual(progress, [2, 3])
+        self.assertFalse(self.checkpoint.exists())
+
+if __name__ == '__main__':
+    unittest.main()
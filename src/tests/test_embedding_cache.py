@@ -0,0 +1,48 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+from src.modules.embedding_cache import EmbeddingCache, cache_key
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "cache.db"
+        self.cache = EmbeddingCache(self.db_path, max_memory_items=2)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_key_normalises_whitespace_and_includes_model(self):
+        self.assertEqual(cache_key("hello   world\n", "m"), cache_key("hello world", "m"))
+        self.assertNotEqual(cache_key("hello world", "m"), cache_key("hello world", "other"))
+
+    def test_put_and_get_round_trip(self):
+        self.cache.put_many([("a", [1.0, 2.0]), ("b", [3.0, 4.0])], "m")
+        found = self.cache.get_many(["a", "b", "c"], "m")
+        self.assertEqual(found, {"a": [1.0, 2.0], "b": [3.0, 4.0]})
+        self.assertEqual(self.cache.get_many(["a"], "other"), {})
+
+    def test_entries_persist_beyond_memory_lru(self):
+        self.cache.put_many([("a", [1.0]), ("b", [2.0]), ("c", [3.0])], "m")
+        self.assertEqual(len(self.cache.memory), 2)
+        self.cache.close()
+        self.cache = EmbeddingCache(self.db_path)
+        self.assertEqual(self.cache.get_many(["a", "c"], "m"), {"a": [1.0], "c": [3.0]})
+
+    def test_memory_lru_keeps_float32_arrays(self):
+        vector = [0.5, 0.25]
+        self.cache.put_many([("a", vector)], "m")
+        vector[0] = 9.0
+        self.assertEqual(self.cache.memory[cache_key("a", "m")].dtype, np.float32)
+        self.assertEqual(self.cache.get_many(["a"], "m"), {"a": [0.5, 0.25]})
+
+    def test_dimension_change_drops_stale_vectors(self):
+        self.cache.put_many([("a", [1.0, 2.0])], "m")
+        self.cache.put_many([("b", [1.0, 2.0, 3.0])], "m")
+        self.assertEqual(self.cache.get_many(["a", "b"], "m"), {"b": [1.0, 2.0, 3.0]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.modules.embedding_service import EmbeddingService
+from src.modules.embedding_cache import EmbeddingCache
+from src.modules.errors import ModelInferenceError
+
+class TestEmbeddingService(unittest.TestCase):
+    def setUp(self):
+        self.service = EmbeddingService(model="test-embed", batch_size=2, max_workers=2, max_retries=3, retry_delay=0)
+
+    @patch('src.modules.embedding_service.ollama.embed')
+    def test_embed_many_batches_and_preserves_order(self, mock_embed):
+        mock_embed.side_effect = lambda model, input: {"embeddings": [[float(len(text))] for text in input]}
+        result = self.service.embed_many(["a", "bbb", "cc", "dddd", "e"])
+        self.assertEqual(result, [[1.0], [3.0], [2.0], [4.0], [1.0]])
+        self.assertEqual(mock_embed.call_count, 3)
+        self.assertTrue(all(len(call.kwargs["input"]) <= 2 for call in mock_embed.call_args_list))
+
+    @patch('src.modules.embedding_service.ollama.embed')
+    def test_duplicate_texts_are_embedded_once(self, mock_embed):
+        mock_embed.side_effect = lambda model, input: {"embeddings": [[1.0] for _ in input]}
+        result = self.service.embed_many(["same", "same", "same"])
+        self.assertEqual(len(result), 3)
+        mock_embed.assert_called_once_with(model="test-embed", input=["same"])
+        self.assertEqual(self.service.get_metrics()["duplicates"], 2)
+
+    @patch('src.modules.embedding_service.time.sleep')
+    @patch('src.modules.embedding_service.ollama.embed')
+    def test_retries_with_backoff(self, mock_embed, mock_sleep):
+        mock_embed.side_effect = [Exception("busy"), Exception("busy"), {"embeddings": [[0.5]]}]
+        self.service.retry_delay = 1.0
+        self.assertEqual(self.service.embed("text"), [0.5])
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [1.0, 2.0])
+        self.assertEqual(self.service.get_metrics()["retries"], 2)
+
+    @patch('src.modules.embedding_service.ollama.embed')
+    def test_raises_after_all_retries(self, mock_embed):
+        mock_embed.side_effect = Exception("down")
+        with self.assertRaises(ModelInferenceError):
+            self.service.embed("text")
+        self.assertEqual(mock_embed.call_count, 3)
+        self.assertEqual(self.service.get_metrics()["failures"], 1)
+
+    @patch('src.modules.embedding_service.ollama.embed')
+    def test_metrics_report_throughput(self, mock_embed):
+        mock_embed.side_effect = lambda model, input: {"embeddings": [[1.0] for _ in input]}
+        self.service.embed_many(["a", "b", "c"])
+        metrics = self.service.get_metrics()
+        self.assertEqual(metrics["texts"], 3)
+        self.assertEqual(metrics["requests"], 2)
+        self.assertGreater(metrics["texts_per_second"], 0)
+
+    @patch('src.modules.embedding_service.ollama.embed')
+    def test_cached_texts_skip_the_server(self, mock_embed):
+        temp_dir = Path(tempfile.mkdtemp())
+        cache = EmbeddingCache(temp_dir / "cache.db")
+        try:
+            service = EmbeddingService(model="test-embed", batch_size=2, max_workers=2, retry_delay=0, cache=cache)
+            mock_embed.side_effect = lambda model, input: {"embeddings": [[float(len(text))] for text in input]}
+            service.embed_many(["a", "bb"])
+            result = service.embed_many(["bb", "ccc", "a"])
+            self.assertEqual(result, [[2.0], [3.0], [1.0]])
+            self.assertEqual(mock_embed.call_args.kwargs["input"], ["ccc"])
+            self.assertEqual(service.get_metrics()["cache_hits"], 2)
+        finally:
+            cache.close()
+            shutil.rmtree(temp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.modules import kb_graph
+from src.modules.db_connection import ConnectionManager
+from src.modules.graph_snapshot import GraphSnapshot
+from src.modules.kb_graph import create_edges, get_related_nodes, get_strongest_neighbors
+from src.utils.schema import SCHEMA
+
+class TestGraphSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = ConnectionManager(self.temp_dir / "edges.db", SCHEMA)
+        self.patcher = patch('src.modules.kb_graph.get_db_connection', self.manager.get_connection)
+        self.patcher.start()
+        rng = random.Random(7)
+        self.nodes = [f"n{i}" for i in range(40)]
+        create_edges((rng.choice(self.nodes), rng.choice(self.nodes), rng.choice(["A", "B"]), round(rng.random(), 3))
+                     for _ in range(300))
+        self.snapshot = GraphSnapshot(self.manager.get_connection, refresh_interval=3600)
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def assertMatchesDatabase(self):
+        for node in self.nodes + ["missing"]:
+            for rel in (None, "A", "C"):
+                self.assertEqual(sorted(self.snapshot.related_nodes(node, rel)), sorted(get_related_nodes(node, rel)))
+                self.assertEqual(sorted(self.snapshot.strongest_neighbors(node, None, rel)),
+                                 sorted(get_strongest_neighbors(node, None, rel)))
+
+    def test_matches_sql_queries(self):
+        self.assertMatchesDatabase()
+        self.assertEqual(len(self.snapshot), self.manager.get_connection().execute("SELECT COUNT(*) FROM edges").fetchone()[0])
+        strongest = self.snapshot.strongest_neighbors("n1", limit=3)
+        self.assertEqual(len(strongest), 3)
+        self.assertEqual([edge[2] for edge in strongest], sorted((edge[2] for edge in strongest), reverse=True))
+
+    def test_incremental_refresh(self):
+        self.snapshot.ensure_fresh()
+        source, target, rel = self.manager.get_connection().execute(
+            "SELECT source_id, target_id, relationship_type FROM edges LIMIT 1").fetchone()
+        create_edges([(source, target, rel, 0.99), ("new", "n1", "B", 0.5), ("n3", "new", "C", 0.25)])
+        # Rows stamped in the same second as the watermark are read again, so at least the three changes
+        self.assertGreaterEqual(self.snapshot.refresh(), 3)
+        self.assertEqual(len(self.snapshot._extra), 2)
+        self.assertMatchesDatabase()
+        self.snapshot.compact()
+        self.assertEqual(len(self.snapshot._extra), 0)
+        self.assertMatchesDatabase()
+        self.assertIn(("n1", "B", 0.5), self.snapshot.related_nodes("new"))
+
+    def test_reloads_after_delete(self):
+        self.snapshot.ensure_fresh()
+        with self.manager.get_connection() as conn:
+            conn.execute("DELETE FROM edges WHERE source_id = 'n1'")
+        self.snapshot.refresh()
+        self.assertMatchesDatabase()
+
+    def test_reloads_after_delete_and_backdated_insert(self):
+        self.snapshot.ensure_fresh()
+        with self.manager.get_connection() as conn:
+            conn.execute("DELETE FROM edges WHERE id = (SELECT MIN(id) FROM edges)")
+            # Stamped before the watermark, so only the deletion counter reveals the change
+            conn.execute("INSERT INTO edges (source_id, target_id, relationship_type, strength, updated_at) "
+                         "VALUES ('n1', 'old', 'A', 0.5, '2000-01-01 00:00:00')")
+        self.snapshot.refresh()
+        self.assertMatchesDatabase()
+        self.assertIn(("old", "A", 0.5), self.snapshot.related_nodes("n1"))
+
+    def test_kb_graph_reads_through_snapshot_when_enabled(self):
+        with patch('src.modules.kb_graph.GRAPH_SNAPSHOT_ENABLED', True), \
+             patch('src.modules.kb_graph._graph_snapshot', None):
+            snapshot = kb_graph.get_graph_snapshot()
+            self.assertIsNotNone(snapshot)
+            create_edges([("n1", "fresh", "A", 1.0)])
+            self.assertTrue(snapshot.stale or not snapshot.loaded)
+            self.assertIn(("fresh", "A", 1.0), get_related_nodes("n1"))
+            with patch.object(snapshot, 'connect', side_effect=AssertionError("snapshot read hit SQLite")):
+                get_related_nodes("n1")
+                get_strongest_neighbors("n2", 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.modules.db_connection import ConnectionManager
+from src.modules.graph_traversal import k_hop_neighbors, personalized_pagerank, shortest_weighted_path
+from src.modules.kb_graph import create_edges, get_strongest_neighbors
+from src.utils.schema import SCHEMA
+
+class TestGraphTraversal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = ConnectionManager(self.temp_dir / "edges.db", SCHEMA)
+        self.patcher = patch('src.modules.kb_graph.get_db_connection', self.manager.get_connection)
+        self.patcher.start()
+        create_edges([
+            ("a", "b", "R", 0.9),
+            ("b", "c", "R", 0.9),
+            ("a", "c", "S", 0.5),
+            ("c", "d", "R", 0.8),
+            ("x", "y", "R", 1.0),
+        ])
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_strongest_neighbors_both_directions(self):
+        self.assertEqual(get_strongest_neighbors("c"), [("b", "R", 0.9), ("d", "R", 0.8), ("a", "S", 0.5)])
+        self.assertEqual(get_strongest_neighbors("c", limit=1), [("b", "R", 0.9)])
+        self.assertEqual(get_strongest_neighbors("c", relationship_type="S"), [("a", "S", 0.5)])
+
+    def test_k_hop_scores_by_strength_product(self):
+        hits = {hit.node_id: hit for hit in k_hop_neighbors("a", max_depth=2)}
+        self.assertEqual(set(hits), {"b", "c", "d"})
+        self.assertAlmostEqual(hits["c"].score, 0.81)
+        self.assertEqual((hits["c"].hops, hits["c"].relationship_type), (2, "R"))
+        self.assertAlmostEqual(hits["d"].score, 0.4)
+        self.assertEqual([hit.node_id for hit in k_hop_neighbors("a", max_depth=1)], ["b", "c"])
+
+    def test_k_hop_limits(self):
+        self.assertEqual([hit.node_id for hit in k_hop_neighbors("a", max_depth=1, max_fanout=1)], ["b"])
+        self.assertEqual(len(k_hop_neighbors("a", max_depth=3, max_nodes=2)), 1)
+        self.assertEqual(len(k_hop_neighbors("a", max_depth=3, top_k=2)), 2)
+
+    def test_k_hop_skips_excluded_relationships(self):
+        hits = k_hop_neighbors("a", max_depth=3, exclude_relationships=["S"])
+        self.assertEqual([(hit.node_id, hit.hops) for hit in hits], [("b", 1), ("c", 2), ("d", 3)])
+
+    def test_personalized_pagerank_stays_in_component(self):
+        ranked = personalized_pagerank("a", epsilon=1e-6)
+        self.assertEqual({node_id for node_id, _ in ranked}, {"b", "c", "d"})
+        self.assertEqual(ranked[-1][0], "d")
+        with_seed = dict(personalized_pagerank(["a"], epsilon=1e-6, include_seeds=True))
+        self.assertAlmostEqual(sum(with_seed.values()), 1.0, places=3)
+
+    def test_shortest_weighted_path(self):
+        path, strength = shortest_weighted_path("a", "d")
+        self.assertEqual(path, ["a", "b", "c", "d"])
+        self.assertAlmostEqual(strength, 0.9 * 0.9 * 0.8)
+        self.assertEqual(shortest_weighted_path("a", "d", max_depth=2)[0], ["a", "c", "d"])
+        self.assertIsNone(shortest_weighted_path("a", "y"))
+        self.assertEqual(shortest_weighted_path("a", "a"), (["a"], 1.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from src.modules.history_journal import HistoryJournal
+
+class TestHistoryJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "history.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def journal(self, **kwargs) -> HistoryJournal:
+        journal = HistoryJournal(self.path, kwargs.pop("max_length", 3), **kwargs)
+        self.addCleanup(journal.close)
+        return journal
+
+    def lines(self):
+        return self.path.read_text(encoding='utf-8').splitlines()
+
+    def test_appends_one_line_per_record(self):
+        journal = self.journal()
+        journal.append({"prompt": "multi\nline", "response": "r"})
+        journal.append_many(["a", "b"])
+        self.assertEqual(len(self.lines()), 3)
+        self.assertEqual(self.journal().load(), [{"prompt": "multi\nline", "response": "r"}, "a", "b"])
+
+    def test_compacts_to_the_window(self):
+        journal = self.journal(compact_every=2)
+        for i in range(4):
+            journal.append(i)
+        self.assertEqual(journal.compactions, 0)
+        journal.append(4)
+        self.assertEqual(journal.compactions, 1)
+        self.assertEqual([json.loads(line) for line in self.lines()], [2, 3, 4])
+        journal.append(5)
+        self.assertEqual(self.journal().load(), [3, 4, 5])
+        self.assertFalse(self.path.with_name("history.jsonl.tmp").exists())
+
+    def test_recovers_from_torn_and_corrupt_lines(self):
+        self.path.write_text('"a"\nnot json\n"b"\n{"prompt": "torn', encoding='utf-8')
+        journal = self.journal()
+        self.assertEqual(journal.load(), ["a", "b"])
+        self.assertTrue(self.path.read_text(encoding='utf-8').endswith('"b"\n'))
+        journal.append("c")
+        self.assertEqual(self.journal().load(), ["a", "b", "c"])
+
+    def test_imports_legacy_json_and_rewrites(self):
+        legacy = self.temp_dir / "history.json"
+        legacy.write_text(json.dumps(["a", "b", "c", "d"], indent=2), encoding='utf-8')
+        journal = self.journal(legacy_path=legacy)
+        self.assertEqual(journal.load(), ["b", "c", "d"])
+        self.assertEqual(len(self.lines()), 3)
+        journal.rewrite([])
+        self.assertEqual(self.journal(legacy_path=legacy).load(), [])
+
+if __name__ == '__main__':
+    unittest.main()
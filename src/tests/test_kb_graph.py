@@ -0,0 +1,115 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+from unittest.mock import patch
+from src.modules.db_connection import ConnectionManager
+from src.modules.kb_graph import (create_edge, create_edges, get_related_nodes, EdgeWriter, TokenSetCache,
+                                  compare_content, compare_tags, compare_titles, content_similarities,
+                                  jaccard, jaccard_ids, jaccard_many, word_set, token_ids, text_ids)
+from src.utils.schema import SCHEMA, LEGACY_TRIGGERS
+
+class TestKbGraph(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = ConnectionManager(self.temp_dir / "edges.db", SCHEMA)
+        self.patcher = patch('src.modules.kb_graph.get_db_connection', self.manager.get_connection)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def count_edges(self) -> int:
+        return self.manager.get_connection().execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+
+    def test_create_edge_and_related_nodes(self):
+        create_edge("a", "b", "RELATED_TO", 0.5)
+        self.assertEqual(get_related_nodes("a"), [("b", "RELATED_TO", 0.5)])
+        self.assertEqual(get_related_nodes("b"), [("a", "RELATED_TO", 0.5)])
+
+    def test_create_edge_upserts_in_place(self):
+        conn = self.manager.get_connection()
+        create_edge("a", "b", "RELATED_TO", 0.5)
+        with conn:
+            conn.execute("UPDATE edges SET confidence = 0.7, updated_at = '2000-01-01 00:00:00'")
+        row_id, created_at = conn.execute("SELECT id, created_at FROM edges").fetchone()
+        create_edge("a", "b", "RELATED_TO", 0.9)
+        self.assertEqual(conn.execute("SELECT id, created_at, strength, confidence FROM edges").fetchall(),
+                         [(row_id, created_at, 0.9, 0.7)])
+        self.assertGreater(conn.execute("SELECT updated_at FROM edges").fetchone()[0], '2000-01-01 00:00:00')
+        triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        self.assertFalse(triggers & set(LEGACY_TRIGGERS))
+
+    def test_node_keys_are_interned_once(self):
+        key = "f" * 32
+        create_edges([(key, "b", "R", 1.0), ("b", key, "R", 1.0), (key, "c", "S", 1.0)])
+        conn = self.manager.get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0], 3)
+        self.assertEqual(conn.execute("SELECT typeof(source), typeof(target) FROM edge_store").fetchall(),
+                         [("integer", "integer")] * 3)
+        self.assertEqual(sorted(get_related_nodes(key)), [("b", "R", 1.0), ("c", "S", 1.0)])
+
+    def test_create_edges_in_batches(self):
+        edges = ((f"n{i}", f"n{i + 1}", "NEXT", 1.0) for i in range(25))
+        self.assertEqual(create_edges(edges, batch_size=10), 25)
+        self.assertEqual(self.count_edges(), 25)
+
+    def test_edge_writer_buffers_until_batch_or_exit(self):
+        with EdgeWriter(batch_size=3, flush_interval=3600) as writer:
+            create_edge("a", "b", "R", 1.0)
+            writer.add("b", "c", "R", 1.0)
+            self.assertEqual(self.count_edges(), 0)
+            create_edges([("c", "d", "R", 1.0), ("d", "e", "R", 1.0)])
+            self.assertEqual(self.count_edges(), 3)
+        self.assertEqual(self.count_edges(), 4)
+        self.assertEqual(writer.written, 4)
+        create_edge("e", "f", "R", 1.0)
+        self.assertEqual(self.count_edges(), 5)
+
+    def test_edge_writer_flushes_after_interval(self):
+        with EdgeWriter(batch_size=100, flush_interval=0) as writer:
+            writer.add("a", "b", "R", 1.0)
+            self.assertEqual(self.count_edges(), 1)
+
+class TestTokenSets(unittest.TestCase):
+    def test_token_ids_are_cached(self):
+        cache = TokenSetCache(max_items=2)
+        first = cache.token_ids("The cat, the hat")
+        self.assertIs(cache.token_ids("The cat, the hat"), first)
+        self.assertEqual(list(first), sorted(set(first.tolist())))
+        self.assertEqual(len(first), 3)
+        self.assertEqual(cache.token_ids("hat cat").tolist(), token_ids(["cat", "hat"]).tolist())
+        cache.token_ids("other")
+        cache.token_ids("another")
+        self.assertIsNot(cache.token_ids("The cat, the hat"), first)
+
+    def test_token_ids_do_not_depend_on_the_cache(self):
+        self.assertEqual(TokenSetCache().token_ids("a b").tolist(), TokenSetCache().token_ids("b A a").tolist())
+        self.assertEqual(text_ids("A, b").tolist(), token_ids(["b", "a"]).tolist())
+        self.assertEqual(token_ids([]).dtype, np.int64)
+
+    def test_compare_functions_match_set_jaccard(self):
+        texts = ["alpha beta gamma", "Beta gamma delta!", "", "alpha"]
+        for a in texts:
+            for b in texts:
+                self.assertAlmostEqual(compare_content(a, b), jaccard(word_set(a), word_set(b)))
+                self.assertAlmostEqual(compare_titles(a, b), jaccard(word_set(a), word_set(b)))
+        self.assertAlmostEqual(compare_content({"x": "a b", "n": 1}, ["b", "c", 2]), 1 / 3)
+        self.assertAlmostEqual(compare_tags(["a", "b", "b"], ["b", "c"]), 1 / 3)
+        self.assertEqual(compare_tags([], []), 0)
+
+    def test_jaccard_many_matches_pairwise(self):
+        cache = TokenSetCache()
+        query = cache.token_ids("one two three four")
+        candidates = [cache.token_ids(text) for text in ["one two", "", "five six", "four three two one", "one one seven"]]
+        expected = [jaccard_ids(query, candidate) for candidate in candidates]
+        self.assertEqual(jaccard_many(query, candidates).tolist(), expected)
+        self.assertEqual(jaccard_many(token_ids([]), [token_ids([])]).tolist(), [0.0])
+        self.assertEqual(jaccard_many(query, []).size, 0)
+        self.assertEqual(content_similarities("a b", ["a b", "c"]).tolist(), [1.0, 0.0])
+
+if __name__ == '__main__':
+    unittest.main()
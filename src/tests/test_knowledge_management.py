@@ -106,6 +106,11 @@ class TestKnowledgeManager(unittest.TestCase):
         self.assertEqual(len(city_related), 1)
         self.assertEqual(len(town_related), 1)
 
+    def test_add_edges_bulk(self):
+        edges = [{"source_id": "Hub", "target_id": f"N{i}", "relationship_type": "links_to", "strength": 0.5} for i in range(5)]
+        self.assertEqual(self.knowledge_manager.add_edges(edges, batch_size=2), 5)
+        self.assertEqual(len(self.knowledge_manager.get_related_nodes("Hub")), 5)
+
     def test_error_handling(self):
         with self.assertRaises(DataProcessingError):
             invalid_db = KnowledgeManager("invalid_path.db")
@@ -1,16 +1,24 @@
 import unittest
+import tempfile
+import threading
+import numpy as np
+from pathlib import Path
 from unittest.mock import patch, MagicMock
-from src.modules.memory_search import search_memories, get_embeddings, find_most_similar
+from src.modules.memory_search import search_memories, search_memories_batch, get_embeddings, find_most_similar, backfill_embeddings, read_memory
+from src.modules.vector_index import VectorIndex
+from src.modules.access_counter import AccessCounterStore
+from src.modules.memory_store import JsonDirectoryMemoryStore
+from src.modules.file_utils import write_json_file
 
 class TestMemorySearch(unittest.TestCase):
-    @patch('src.modules.memory_search.get_json_files_in_directory')
-    @patch('src.modules.memory_search.get_embeddings')
-    @patch('src.modules.memory_search.ollama.embeddings')
+    @patch('src.modules.memory_search.get_related_nodes')
+    @patch('src.modules.memory_search.get_memory_index')
+    @patch('src.modules.memory_search.embed_texts')
     @patch('src.modules.memory_search.read_memory')
-    def test_search_memories(self, mock_read_memory, mock_ollama_embeddings, mock_get_embeddings, mock_get_json_files):
-        mock_get_json_files.return_value = [MagicMock(name='file1.json'), MagicMock(name='file2.json')]
-        mock_get_embeddings.side_effect = [[1, 0, 0], [0, 1, 0]]
-        mock_ollama_embeddings.return_value = {"embedding": [1, 1, 0]}
+    def test_search_memories(self, mock_read_memory, mock_embed_texts, mock_get_memory_index, mock_get_related_nodes):
+        mock_get_memory_index.return_value.search_many.return_value = [[(0.9, 'file1.json'), (0.7, 'file2.json')]]
+        mock_embed_texts.return_value = [[1, 1, 0]]
+        mock_get_related_nodes.return_value = []
         mock_read_memory.side_effect = [
             {"content": "Memory 1", "type": "interaction", "timestamp": "2023-01-01"},
             {"content": "Memory 2", "type": "document_chunk", "timestamp": "2023-01-02"}
@@ -18,10 +26,26 @@ class TestMemorySearch(unittest.TestCase):
 
         results = search_memories("test query", top_k=2, similarity_threshold=0.5)
 
+        mock_get_memory_index.return_value.search_many.assert_called_once_with([[1, 1, 0]], 2)
         self.assertEqual(len(results), 2)
         self.assertEqual(results[0]['content'], "Memory 1")
         self.assertEqual(results[1]['content'], "Memory 2")
 
+    @patch('src.modules.memory_search.get_related_nodes')
+    @patch('src.modules.memory_search.get_memory_index')
+    @patch('src.modules.memory_search.embed_texts')
+    @patch('src.modules.memory_search.read_memory')
+    def test_search_memories_threshold(self, mock_read_memory, mock_embed_texts, mock_get_memory_index, mock_get_related_nodes):
+        mock_get_memory_index.return_value.search_many.return_value = [[(0.9, 'file1.json'), (0.2, 'file2.json')]]
+        mock_embed_texts.return_value = [[1, 1, 0]]
+        mock_get_related_nodes.return_value = []
+        mock_read_memory.return_value = {"content": "Memory 1", "type": "interaction"}
+
+        results = search_memories("test query", top_k=2, similarity_threshold=0.5)
+
+        self.assertEqual(len(results), 1)
+        mock_read_memory.assert_called_once_with('file1.json')
+
     def test_find_most_similar(self):
         needle = [1, 1, 0]
         haystack = [[1, 0, 0], [0, 1, 0], [1, 1, 1]]
@@ -30,5 +54,84 @@ class TestMemorySearch(unittest.TestCase):
         self.assertAlmostEqual(results[0][0], 0.8164965809277259, places=7)
         self.assertEqual(results[0][1], 2)  # Index of [1, 1, 1]
 
+    def test_find_most_similar_top_k(self):
+        needle = [1, 1, 0]
+        haystack = np.array([[1, 0, 0], [0, 1, 0], [1, 1, 1], [0, 0, 1]])
+        results = find_most_similar(needle, haystack, top_k=2)
+        self.assertEqual([index for _, index in results], [2, 0])
+
+    def test_find_most_similar_many_queries(self):
+        haystack = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        results = find_most_similar([[0, 1, 0], [0, 0, 2]], haystack, top_k=1)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0][1], 1)
+        self.assertEqual(results[1][0][1], 2)
+        self.assertAlmostEqual(results[1][0][0], 1.0)
+
+    def test_find_most_similar_normalized(self):
+        haystack = np.eye(3, dtype=np.float32)
+        results = find_most_similar(np.array([0, 0.6, 0.8], dtype=np.float32), haystack, normalized=True)
+        self.assertEqual(results[0][1], 2)
+        self.assertAlmostEqual(results[0][0], 0.8, places=6)
+
+    @patch('src.modules.memory_search.get_related_nodes')
+    @patch('src.modules.memory_search.get_memory_index')
+    @patch('src.modules.memory_search.embed_texts')
+    @patch('src.modules.memory_search.read_memory')
+    def test_search_memories_batch(self, mock_read_memory, mock_embed_texts, mock_get_memory_index, mock_get_related_nodes):
+        mock_embed_texts.return_value = [[1, 0], [0, 1]]
+        mock_get_memory_index.return_value.search_many.return_value = [[(0.9, 'a.json')], [(0.8, 'b.json')]]
+        mock_get_related_nodes.return_value = []
+        mock_read_memory.side_effect = lambda filename: {"content": filename, "type": "interaction"}
+
+        results = search_memories_batch(["first", "second"], top_k=1)
+
+        mock_get_memory_index.return_value.search_many.assert_called_once_with([[1, 0], [0, 1]], 1)
+        self.assertEqual([r[0]['content'] for r in results], ['a.json', 'b.json'])
+
+    @patch('src.modules.memory_search.embed_texts')
+    @patch('src.modules.memory_search.load_embeddings')
+    @patch('src.modules.memory_search.get_memory_store')
+    @patch('src.modules.memory_search.get_memory_index')
+    def test_backfill_embeddings_resumes(self, mock_get_memory_index, mock_get_memory_store, mock_load_embeddings, mock_embed_texts):
+        index = VectorIndex(Path(tempfile.mkdtemp()))
+        mock_get_memory_index.return_value = index
+        mock_get_memory_store.return_value.ids.return_value = ['a.json', 'b.json', 'c.json']
+        mock_get_memory_store.return_value.get_many.side_effect = lambda ids: {i: {"type": "document_chunk", "content": "text"} for i in ids}
+        mock_load_embeddings.side_effect = lambda filename: [0, 1] if filename == 'b.json' else []
+        mock_embed_texts.side_effect = lambda texts: [[1, 0] for _ in texts]
+        progress = []
+
+        added = backfill_embeddings(batch_size=2, limit=2, progress_callback=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(added, 2)
+        self.assertEqual(progress, [(2, 2)])
+        mock_embed_texts.assert_called_once()
+        self.assertEqual(backfill_embeddings(), 1)
+        self.assertEqual(backfill_embeddings(), 0)
+        self.assertEqual(len(index), 3)
+
+    @patch('src.modules.memory_search.get_memory_store')
+    @patch('src.modules.memory_search.get_memory_index')
+    def test_backfill_embeddings_stop_event(self, mock_get_memory_index, mock_get_memory_store):
+        mock_get_memory_index.return_value = VectorIndex(Path(tempfile.mkdtemp()))
+        mock_get_memory_store.return_value.ids.return_value = ['a.json']
+        stop_event = threading.Event()
+        stop_event.set()
+        self.assertEqual(backfill_embeddings(stop_event=stop_event), 0)
+
+    def test_read_memory_does_not_write_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_dir = Path(temp_dir)
+            write_json_file(data_dir / "m.json", {"content": "x", "access_count": 2})
+            before = (data_dir / "m.json").read_bytes()
+            counter = AccessCounterStore(data_dir / "counts.db", flush_interval=0)
+            with patch('src.modules.memory_search.get_memory_store', return_value=JsonDirectoryMemoryStore(data_dir)), \
+                 patch('src.modules.memory_search.access_counter', counter):
+                self.assertEqual(read_memory("m.json")["access_count"], 2)
+                self.assertEqual(read_memory("m.json")["access_count"], 3)
+            counter.close()
+            self.assertEqual((data_dir / "m.json").read_bytes(), before)
+
 if __name__ == '__main__':
     unittest.main()
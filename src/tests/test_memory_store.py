@@ -0,0 +1,50 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from src.modules.memory_store import JsonDirectoryMemoryStore, MemoryStore, SqliteMemoryStore, import_json_memories, migrate_memory_store
+
+class TestMemoryStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.json_store = JsonDirectoryMemoryStore(self.temp_dir / "json")
+        self.sqlite_store = SqliteMemoryStore(self.temp_dir / "memories.db")
+
+    def tearDown(self):
+        self.sqlite_store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_backends_round_trip(self):
+        for store in (self.json_store, self.sqlite_store):
+            store.put("b.json", {"type": "interaction", "content": {"prompt": "p", "response": "r"}})
+            store.put("a.json", {"type": "document_chunk", "content": "chunk"})
+            self.assertEqual(store.ids(), ["a.json", "b.json"])
+            self.assertEqual(store.get("a.json")["content"], "chunk")
+            self.assertIsNone(store.get("missing.json"))
+            self.assertEqual(set(store.get_many(["a.json", "missing.json"])), {"a.json"})
+            self.assertIn("b.json", store)
+            self.assertTrue(store.delete("b.json"))
+            self.assertEqual(len(store), 1)
+
+    def test_migration_is_resumable(self):
+        for i in range(5):
+            self.json_store.put(f"{i}.json", {"type": "interaction", "content": str(i)})
+        self.sqlite_store.put("0.json", {"type": "interaction", "content": "0"})
+        self.assertEqual(migrate_memory_store(self.json_store, self.sqlite_store, batch_size=2), 4)
+        self.assertEqual(migrate_memory_store(self.json_store, self.sqlite_store), 0)
+        self.assertEqual(self.sqlite_store.get("3.json")["content"], "3")
+
+    def test_json_import_runs_once(self):
+        self.json_store.put("a.json", {"type": "interaction", "content": "a"})
+        self.assertEqual(import_json_memories(self.sqlite_store, self.temp_dir / "json"), 1)
+        self.sqlite_store.delete("a.json")
+        self.json_store.put("b.json", {"type": "interaction", "content": "b"})
+        self.assertEqual(import_json_memories(self.sqlite_store, self.temp_dir / "json"), 0)
+        self.assertEqual(len(self.sqlite_store), 0)
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            MemoryStore()
+
+if __name__ == '__main__':
+    unittest.main()
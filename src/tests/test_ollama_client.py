@@ -1,53 +1,73 @@
 # src/tests/test_ollama_client.py
 
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+import asyncio
 import json
 import sys
 import os
-import requests  # Add this import
+import shutil
+import tempfile
+import threading
+import httpx
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from src.modules.ollama_client import OllamaClient, process_prompt
+from src.modules.ollama_client import AsyncOllamaClient, OllamaClient, process_prompt
+from src.modules.response_cache import ResponseCache
+from src.modules.semantic_cache import SemanticResponseCache
+
+def stream_body(*chunks: str) -> bytes:
+    lines = [json.dumps({"response": chunk}) for chunk in chunks] + [json.dumps({"response": "", "done": True})]
+    return "\n".join(lines).encode()
 
 class TestOllamaClient(unittest.TestCase):
 
     def setUp(self):
-        self.client = OllamaClient()
-
-    @patch('requests.post')
-    def test_process_prompt_success(self, mock_post):
-        # Mock the streaming response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.iter_lines.return_value = [
-            json.dumps({"response": "Hello"}).encode(),
-            json.dumps({"response": " world"}).encode(),
-            json.dumps({"response": "!", "done": True}).encode()
-        ]
-        mock_post.return_value.__enter__.return_value = mock_response
-
-        result = self.client.process_prompt("Hi", "test_model", "test_user")
-        self.assertEqual(result, "Hello world!")
+        self.patcher = patch('src.modules.ollama_client.persist_interaction')
+        self.persist_interaction = self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def client(self, handler) -> OllamaClient:
+        client = OllamaClient(transport=httpx.MockTransport(handler))
+        self.addCleanup(client.close)
+        return client
 
-    @patch('requests.post')
-    def test_process_prompt_api_error(self, mock_post):
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_post.return_value.__enter__.return_value = mock_response
+    def test_process_prompt_success(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(json.loads(request.content))
+            return httpx.Response(200, content=stream_body("Hello", " world", "!"))
+
+        result = self.client(handler).process_prompt("Hi", "test_model", "test_user")
+        self.assertEqual(result, "Hello world!")
+        self.assertEqual(requests_seen, [{"model": "test_model", "prompt": "Hi"}])
+        self.persist_interaction.assert_called_once_with("Hi", "Hello world!", "test_user", "test_model")
 
-        result = self.client.process_prompt("Hi", "test_model", "test_user")
+    def test_process_prompt_api_error(self):
+        result = self.client(lambda request: httpx.Response(500)).process_prompt("Hi", "test_model", "test_user")
         self.assertTrue(result.startswith("Error: Received status code 500"))
 
-    @patch('requests.post')
-    def test_process_prompt_connection_error(self, mock_post):
-        mock_post.side_effect = requests.RequestException("Connection error")
+    def test_process_prompt_connection_error(self):
+        def handler(request):
+            raise httpx.ConnectError("Connection error")
 
-        result = self.client.process_prompt("Hi", "test_model", "test_user")
+        result = self.client(handler).process_prompt("Hi", "test_model", "test_user")
         self.assertTrue(result.startswith("Error connecting to Ollama"))
 
+    def test_process_prompt_timeout(self):
+        def handler(request):
+            raise httpx.ReadTimeout("timed out")
+
+        result = self.client(handler).process_prompt("Hi", "test_model", "test_user")
+        self.assertTrue(result.startswith("Error: Request timed out"))
+
     @patch('src.modules.ollama_client.default_client.process_prompt')
     def test_process_prompt_function(self, mock_client_process):
         mock_client_process.return_value = "Test response"
@@ -55,5 +75,117 @@ class TestOllamaClient(unittest.TestCase):
         self.assertEqual(result, "Test response")
         mock_client_process.assert_called_once_with("Test prompt", "test_model", "test_user")
 
+    def test_response_cache_answers_repeated_prompts(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache = ResponseCache(temp_dir / "responses.db", ttls={"Chat": 0})
+        self.addCleanup(cache.close)
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(json.loads(request.content))
+            return httpx.Response(200, content=stream_body("cached"))
+
+        client = OllamaClient(transport=httpx.MockTransport(handler), cache=cache)
+        self.addCleanup(client.close)
+        for _ in range(2):
+            self.assertEqual(client.process_prompt("Hi", "test_model", "Helper"), "cached")
+        client.process_prompt("Hi", "test_model", "Helper", options={"temperature": 0})
+        client.process_prompt("Hi", "test_model", "Chat")
+        client.process_prompt("Hi", "test_model", "Chat")
+        self.assertEqual(len(requests_seen), 4)
+        self.assertEqual(requests_seen[1]["options"], {"temperature": 0})
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(self.persist_interaction.call_count, 4)
+
+    def test_semantic_cache_answers_similar_prompts(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        vocabulary = ["extract", "key", "points", "weather"]
+        cache = SemanticResponseCache(temp_dir / "semantic.db", default_threshold=0.9,
+                                      embed=lambda text: [float(word in text.lower()) for word in vocabulary])
+        self.addCleanup(cache.close)
+        prompts_seen = []
+
+        def handler(request):
+            prompts_seen.append(json.loads(request.content)["prompt"])
+            return httpx.Response(200, content=stream_body("generated"))
+
+        client = OllamaClient(transport=httpx.MockTransport(handler), semantic_cache=cache)
+        self.addCleanup(client.close)
+        client.process_prompt("Extract key points", "test_model", "Helper")
+        self.assertEqual(client.process_prompt("Extract the key points", "test_model", "Helper"), "generated")
+        client.process_prompt("What is the weather?", "test_model", "Helper")
+        self.assertEqual(prompts_seen, ["Extract key points", "What is the weather?"])
+        self.assertEqual(cache.stats["hits"], 1)
+
+    def test_reuses_pooled_connection(self):
+        ports = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                ports.append(self.client_address[1])
+                body = stream_body("ok")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = OllamaClient(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+        self.addCleanup(client.close)
+        for _ in range(3):
+            self.assertEqual(client.process_prompt("Hi", "test_model", "test_user"), "ok")
+        self.assertEqual(len(ports), 3)
+        self.assertEqual(len(set(ports)), 1)
+
+class TestAsyncOllamaClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.patcher = patch('src.modules.ollama_client.persist_interaction')
+        self.patcher.start()
+        self.in_flight = self.peak = 0
+
+        async def handler(request):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return httpx.Response(200, content=stream_body(json.loads(request.content)["prompt"].upper()))
+
+        self.client = AsyncOllamaClient(max_concurrency=2, transport=httpx.MockTransport(handler))
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        self.patcher.stop()
+
+    async def test_concurrent_generations_respect_limit(self):
+        prompts = [f"p{i}" for i in range(6)]
+        results = await self.client.process_prompts(prompts, "test_model", "test_user")
+        self.assertEqual(results, [prompt.upper() for prompt in prompts])
+        self.assertEqual(self.peak, 2)
+
+    async def test_generate_streams_chunks(self):
+        chunks = []
+        self.assertEqual(await self.client.generate("abc", "test_model", chunks.append), "ABC")
+        self.assertEqual(chunks, ["ABC", ""])
+
+    async def test_sync_wrapper_awaitable_from_another_loop(self):
+        client = OllamaClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=stream_body("x"))))
+        try:
+            results = await asyncio.gather(*(client.process_prompt_async("Hi", "test_model", "test_user") for _ in range(3)))
+        finally:
+            client.close()
+        self.assertEqual(results, ["x", "x", "x"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+import threading
+import unittest
+from src.modules.persistence_queue import PersistenceQueue
+
+class RecordingHistory:
+    def __init__(self):
+        self.entries = []
+
+    def add_entry(self, prompt, response, persist=True):
+        self.entries.append((prompt, response, persist))
+
+class TestPersistenceQueue(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.history = RecordingHistory()
+
+    def write(self, interactions, history):
+        self.batches.append(([item[:4] for item in interactions], list(history)))
+        return len(self.batches[-1][0])
+
+    def make_queue(self, **kwargs) -> PersistenceQueue:
+        persistence = PersistenceQueue(write=kwargs.pop("write", self.write), history=self.history, **kwargs)
+        self.addCleanup(persistence.close)
+        return persistence
+
+    def test_policies_decide_what_is_persisted(self):
+        persistence = self.make_queue(policies={"Helper": "memory", "Noise": "none"})
+        self.assertTrue(persistence.submit("p1", "r1", "User", "m"))
+        self.assertTrue(persistence.submit("p2", "r2", "Helper", "m"))
+        self.assertFalse(persistence.submit("p3", "r3", "Noise", "m"))
+        persistence.flush()
+        self.assertEqual(self.history.entries, [("p1", "r1", False)])
+        written = [item for interactions, _ in self.batches for item in interactions]
+        self.assertEqual(written, [("p1", "r1", "User", "m"), ("p2", "r2", "Helper", "m")])
+        self.assertEqual([exchange for _, history in self.batches for exchange in history], [("p1", "r1")])
+        self.assertEqual((persistence.stats["written"], persistence.stats["skipped"]), (2, 1))
+        with self.assertRaisesRegex(ValueError, "Unknown persistence policy"):
+            PersistenceQueue(policies={"Helper": "sometimes"})
+
+    def test_batches_while_writer_is_busy_and_applies_backpressure(self):
+        release, started = threading.Event(), threading.Event()
+
+        def slow_write(interactions, history):
+            started.set()
+            release.wait(5)
+            return self.write(interactions, history)
+
+        persistence = self.make_queue(max_size=2, batch_size=10, write=slow_write)
+        persistence.submit("first", "r", "User", "m")
+        started.wait(5)
+        persistence.submit("second", "r", "User", "m")
+        persistence.submit("third", "r", "User", "m")
+        blocked = threading.Thread(target=persistence.submit, args=("fourth", "r", "User", "m"))
+        blocked.start()
+        blocked.join(0.1)
+        self.assertTrue(blocked.is_alive())
+        release.set()
+        blocked.join(5)
+        persistence.flush()
+        batches = [[item[0] for item in interactions] for interactions, _ in self.batches]
+        self.assertEqual(batches[0], ["first"])
+        self.assertEqual(batches[1][:2], ["second", "third"])
+        self.assertEqual(sum(batches, []), ["first", "second", "third", "fourth"])
+
+    def test_close_flushes_and_failures_are_counted(self):
+        def broken(interactions, history):
+            raise OSError("disk full")
+
+        persistence = self.make_queue(write=broken)
+        persistence.submit("p", "r", "User", "m")
+        persistence.close()
+        self.assertEqual(persistence.stats["failed"], 1)
+
+        synchronous = self.make_queue(max_size=0)
+        synchronous.submit("p", "r", "User", "m")
+        self.assertEqual(len(self.batches), 1)
+        self.assertIsNone(synchronous._thread)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import threading
+import time
+import unittest
+from src.modules.pipeline import Pipeline, PipelineStep
+from src.modules.step_scheduler import StepScheduler
+
+def sleeper(seconds: float, value):
+    def run(*args):
+        time.sleep(seconds)
+        return value
+    return run
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = StepScheduler(max_workers=4)
+        self.addCleanup(self.scheduler.shutdown)
+
+    def test_runs_steps_by_declared_inputs_and_outputs(self):
+        pipeline = Pipeline("test", [
+            PipelineStep("total", lambda a, b: a + b, ("a", "b")),
+            PipelineStep("split", lambda x: (x, x * 2), ("x",), outputs=("a", "b")),
+        ], self.scheduler)
+        self.assertEqual(pipeline.external_inputs, ("x",))
+        run = pipeline.run({"x": 2})
+        self.assertEqual(run.values, {"x": 2, "a": 2, "b": 4, "total": 6})
+        self.assertEqual(set(run.timings), {"split", "total"})
+        with self.assertRaisesRegex(ValueError, "Missing pipeline inputs: x"):
+            pipeline.run({})
+
+    def test_rejects_duplicate_outputs_and_cycles(self):
+        with self.assertRaisesRegex(ValueError, "produced by both"):
+            Pipeline("test", [PipelineStep("a", lambda: 1), PipelineStep("b", lambda: 2, outputs=("a",))])
+        with self.assertRaisesRegex(ValueError, "circular"):
+            Pipeline("test", [PipelineStep("a", lambda b: b, ("b",)), PipelineStep("b", lambda a: a, ("a",))])
+        with self.assertRaisesRegex(ValueError, "share a name"):
+            Pipeline("test", [PipelineStep("a", lambda b: b, ("b",)), PipelineStep("b", lambda: 1, outputs=("c",))])
+
+    def test_independent_steps_run_concurrently(self):
+        pipeline = Pipeline("test", [PipelineStep(name, sleeper(0.2, name)) for name in "abc"]
+                            + [PipelineStep("joined", lambda a, b, c: a + b + c, ("a", "b", "c"))], self.scheduler)
+        start = time.perf_counter()
+        self.assertEqual(pipeline.run({}).values["joined"], "abc")
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertGreaterEqual(pipeline.latency["a"], 0.2)
+
+    def test_optional_steps_skip_when_over_budget(self):
+        pipeline = Pipeline("test", [
+            PipelineStep("answer", sleeper(0.1, "answer")),
+            PipelineStep("extra", sleeper(0.2, "extra"), ("answer",), optional=True, default="none"),
+        ], self.scheduler)
+        self.assertEqual(pipeline.run({}).values["extra"], "extra")
+        run = pipeline.run({}, budget=0.15)
+        self.assertEqual(run.values, {"answer": "answer", "extra": "none"})
+        self.assertEqual(run.skipped, {"extra": "budget"})
+
+    def test_timeouts_and_errors(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fail(value):
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline("test", [
+            PipelineStep("slow", lambda: release.wait(5), optional=True, default=False, timeout=0.1),
+            PipelineStep("broken", fail, ("slow",), optional=True, default=[]),
+        ], self.scheduler)
+        start = time.perf_counter()
+        run = pipeline.run({})
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(run.values, {"slow": False, "broken": []})
+        self.assertEqual(run.skipped, {"slow": "timeout", "broken": "error"})
+
+        with self.assertRaises(TimeoutError):
+            Pipeline("test", [PipelineStep("slow", lambda: release.wait(5), timeout=0.1)], self.scheduler).run({})
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            Pipeline("test", [PipelineStep("broken", fail, ("x",))], self.scheduler).run({"x": 1})
+
+    def test_pipelines_share_the_scheduler_under_their_names(self):
+        first = Pipeline("first", [PipelineStep("a", sleeper(0.05, 1))], self.scheduler)
+        second = Pipeline("second", [PipelineStep("a", sleeper(0.2, 2), cache=True)], self.scheduler)
+        first.run({})
+        second.run({})
+        self.assertEqual(set(self.scheduler.latency), {"first/a", "second/a"})
+        self.assertLess(first.latency["a"], 0.2)
+        self.assertGreaterEqual(second.latency["a"], 0.2)
+
+    def test_caches_outputs_by_input_hash(self):
+        calls = []
+        pipeline = Pipeline("test", [PipelineStep("upper", lambda text: calls.append(text) or [text.upper()], ("text",), cache=True)],
+                            StepScheduler(cache_size=1))
+        self.assertEqual(pipeline.run({"text": "a"}).values["upper"], ["A"])
+        run = pipeline.run({"text": "a"})
+        self.assertEqual(run.cache_hits, ["upper"])
+        run.values["upper"].append("mutated")
+        self.assertEqual(pipeline.run({"text": "a"}).values["upper"], ["A"])
+        pipeline.run({"text": "b"})
+        pipeline.run({"text": "a"})
+        self.assertEqual(calls, ["a", "b", "a"])
+
+if __name__ == '__main__':
+    unittest.main()
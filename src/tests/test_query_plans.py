@@ -0,0 +1,135 @@
+import re
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.modules.db_connection import ConnectionManager
+from src.modules.kb_graph import create_edges, get_related_nodes, get_strongest_neighbors
+from src.modules.knowledge_management import KnowledgeManager
+from src.utils import initialize_db
+from src.utils.schema import SCHEMA, LEGACY_TRIGGERS, REDUNDANT_INDEXES
+
+# Any full scan; the views resolve to edge_store, node_attribute_store, hierarchy_store and nodes
+TABLE_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)')
+
+class TestQueryPlans(unittest.TestCase):
+    """
+    Run the hot read paths against a real database, capture the SQL they
+    issue and check with EXPLAIN QUERY PLAN that none of it scans a table.
+    """
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "edges.db"
+        self.manager = ConnectionManager(self.db_path, SCHEMA)
+        self.conn = self.manager.get_connection()
+        self.patcher = patch('src.modules.kb_graph.get_db_connection', self.manager.get_connection)
+        self.patcher.start()
+        self.knowledge_manager = KnowledgeManager(str(self.db_path))
+        create_edges((f"n{i}", f"n{(i * 7) % 50}", "R" if i % 2 else "S", i / 100) for i in range(100))
+        self.knowledge_manager.add_edge("a", "b", "is_a", 0.9, bidirectional=True, start_time="2024-01-01")
+        self.knowledge_manager.add_node_attribute("a", "color", "red")
+        self.knowledge_manager.add_hierarchy("a", "b", "part_of")
+        self.statements = []
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.knowledge_manager.close_connection()
+        shutil.rmtree(self.temp_dir)
+
+    def capture(self, *calls):
+        connections = (self.conn, self.knowledge_manager.conn)
+        for conn in connections:
+            conn.set_trace_callback(self.statements.append)
+        for call in calls:
+            call()
+        for conn in connections:
+            conn.set_trace_callback(None)
+        return [sql for sql in self.statements if sql.lstrip().upper().startswith(("SELECT", "UPDATE"))]
+
+    def plan(self, sql: str):
+        return [row[3] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+    def assertNoTableScan(self, statements):
+        self.assertTrue(statements)
+        for sql in statements:
+            for detail in self.plan(sql):
+                self.assertIsNone(TABLE_SCAN.match(detail), f"{detail!r} in plan for:\n{sql}")
+
+    def test_neighbour_queries_use_covering_indexes(self):
+        statements = self.capture(
+            lambda: get_related_nodes("n1"),
+            lambda: get_related_nodes("n1", "R"),
+            lambda: get_strongest_neighbors("n1", 5),
+            lambda: get_strongest_neighbors("n1", 5, "S"),
+            lambda: self.knowledge_manager.get_related_nodes("a"),
+            lambda: self.knowledge_manager.get_related_nodes("a", "is_a"),
+        )
+        self.assertNoTableScan(statements)
+        for sql in statements:
+            for detail in self.plan(sql):
+                if detail.startswith("SEARCH edge_store"):
+                    self.assertIn("COVERING INDEX", detail, sql)
+                elif detail.startswith("SEARCH"):
+                    # Node keys resolve through the nodes key index or its integer primary key
+                    self.assertRegex(detail, r"COVERING INDEX sqlite_autoindex_nodes_1|INTEGER PRIMARY KEY", sql)
+
+    def test_attribute_hierarchy_and_search_queries(self):
+        self.assertNoTableScan(self.capture(
+            lambda: self.knowledge_manager.get_node_attributes("a"),
+            lambda: self.knowledge_manager.get_children("a"),
+            lambda: self.knowledge_manager.get_children("a", "part_of"),
+            lambda: self.knowledge_manager.get_parents("b"),
+            lambda: self.knowledge_manager.get_parents("b", "part_of"),
+            lambda: self.knowledge_manager.update_edge_strength("a", "b", "is_a", 0.5),
+            lambda: self.knowledge_manager.search_edges(min_confidence=0.5),
+            lambda: self.knowledge_manager.search_edges("2024-01-01", "2024-12-31", 0.5),
+        ))
+
+class TestUpdateExistingDatabase(unittest.TestCase):
+    def test_upgrade_interns_nodes_adds_covering_indexes_and_drops_redundant_indexes_and_triggers(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            db_path = temp_dir / "old.db"
+            conn = sqlite3.connect(db_path)
+            conn.executescript("""
+                CREATE TABLE edges (id INTEGER PRIMARY KEY AUTOINCREMENT, source_id TEXT NOT NULL,
+                    target_id TEXT NOT NULL, relationship_type TEXT NOT NULL, strength REAL NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(source_id, target_id, relationship_type));
+                CREATE INDEX idx_edges_source_id ON edges(source_id);
+                CREATE INDEX idx_edges_target_id ON edges(target_id);
+                CREATE TRIGGER update_edges_timestamp AFTER UPDATE ON edges
+                BEGIN UPDATE edges SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id; END;
+                INSERT INTO edges (source_id, target_id, relationship_type, strength) VALUES
+                    ('x', 'y', 'R', 0.5), ('y', 'x', 'R', 0.25), ('x', 'z', 'S', 1.0);
+            """)
+            conn.close()
+
+            with patch.object(initialize_db, 'DB_PATH', db_path), patch('builtins.print'):
+                initialize_db.update_existing_database()
+
+            conn = sqlite3.connect(db_path)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+            query = "SELECT id, target_id, relationship_type, strength, confidence FROM edges WHERE source_id = 'x'"
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+            rows = conn.execute(query + " ORDER BY id").fetchall()
+            node_keys = [row[0] for row in conn.execute("SELECT key FROM nodes ORDER BY key")]
+            edges_type = conn.execute("SELECT type FROM sqlite_master WHERE name = 'edges'").fetchone()[0]
+            conn.close()
+            self.assertIn("idx_edges_source_covering", indexes)
+            self.assertIn("idx_edges_target_covering", indexes)
+            self.assertFalse(indexes & set(REDUNDANT_INDEXES))
+            self.assertFalse(triggers & set(LEGACY_TRIGGERS))
+            self.assertIn("COVERING INDEX idx_edges_source_covering", "\n".join(plan))
+            self.assertEqual(edges_type, "view")
+            self.assertEqual(node_keys, ["x", "y", "z"])
+            self.assertEqual(rows, [(1, "y", "R", 0.5, 1.0), (3, "z", "S", 1.0, 1.0)])
+        finally:
+            shutil.rmtree(temp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
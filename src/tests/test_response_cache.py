@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from src.modules.response_cache import ResponseCache, response_key
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "responses.db"
+        self.cache = ResponseCache(self.db_path, max_entries=3)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_key_covers_model_prompt_and_options(self):
+        self.assertEqual(response_key("p", "m", {"a": 1, "b": 2}), response_key("p", "m", {"b": 2, "a": 1}))
+        self.assertEqual(response_key("p", "m"), response_key("p", "m", {}))
+        self.assertNotEqual(response_key("p", "m"), response_key("p ", "m"))
+        self.assertNotEqual(response_key("p", "m"), response_key("p", "other"))
+        self.assertNotEqual(response_key("p", "m"), response_key("p", "m", {"temperature": 0}))
+
+    def test_round_trip_persists_and_counts(self):
+        self.assertIsNone(self.cache.get("p", "m"))
+        self.cache.put("p", "m", "answer", {"temperature": 0})
+        self.assertIsNone(self.cache.get("p", "m"))
+        self.assertEqual(self.cache.get("p", "m", {"temperature": 0}), "answer")
+        self.assertEqual((self.cache.stats["hits"], self.cache.stats["misses"]), (1, 2))
+        self.cache.close()
+        self.cache = ResponseCache(self.db_path, max_entries=3)
+        self.assertEqual(self.cache.get("p", "m", {"temperature": 0}), "answer")
+
+    def test_call_site_ttls(self):
+        self.cache.close()
+        self.cache = ResponseCache(self.db_path, default_ttl=0.05, ttls={"Forever": None, "Never": 0})
+        for site in ("Default", "Forever", "Never"):
+            self.cache.put(site, "m", "answer", call_site=site)
+        self.assertEqual(self.cache.get("Default", "m", call_site="Default"), "answer")
+        self.assertIsNone(self.cache.get("Never", "m", call_site="Never"))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("Default", "m", call_site="Default"))
+        self.assertEqual(self.cache.get("Forever", "m", call_site="Forever"), "answer")
+        self.assertEqual(self.cache.stats["expired"], 1)
+        self.assertEqual(self.cache.count, 1)
+
+    def test_evicts_least_recently_used(self):
+        for prompt in ("a", "b", "c"):
+            self.cache.put(prompt, "m", prompt.upper())
+        self.cache.get("a", "m")
+        self.cache.put("d", "m", "D")
+        self.cache.put("a", "m", "A2")
+        self.assertEqual(self.cache.count, 3)
+        self.assertEqual(self.cache.stats["evictions"], 1)
+        self.assertIsNone(self.cache.get("b", "m"))
+        self.assertEqual([self.cache.get(prompt, "m") for prompt in ("a", "c", "d")], ["A2", "C", "D"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,13 @@
+import shutil
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch, MagicMock
-from src.modules.save_history import ChatHistory, save_memory, save_interaction, save_document_chunk
+from datetime import datetime
+from src.modules.db_connection import ConnectionManager
+from src.modules.save_history import (ChatHistory, save_memory, save_interaction, save_interactions, save_document_chunk,
+                                      add_memory_to_edge_kb, get_related_memories)
+from src.utils.schema import SCHEMA
 
 class TestSaveHistory(unittest.TestCase):
     def setUp(self):
@@ -13,36 +20,92 @@ class TestSaveHistory(unittest.TestCase):
         self.assertEqual(self.chat_history.history[0]["prompt"], "Hello")
         self.assertEqual(self.chat_history.history[0]["response"], "Hi there!")
 
-    @patch('src.modules.save_history.write_json_file')
-    def test_save_history(self, mock_write_json_file):
+    def test_add_entry_appends_to_journal(self):
+        with patch.object(self.chat_history.journal, 'append') as mock_append:
+            self.chat_history.add_entry("Test", "Response")
+            self.chat_history.add_entry("Later", "Response", persist=False)
+        mock_append.assert_called_once_with({"prompt": "Test", "response": "Response"})
+
+    def test_save_history(self):
         self.chat_history.add_entry("Test", "Response")
-        mock_write_json_file.reset_mock()  # Reset the mock before save_history
-        self.chat_history.save_history()
-        mock_write_json_file.assert_called_once()
-
-    @patch('src.modules.save_history.read_json_file')
-    def test_load_history(self, mock_read_json_file):
-        mock_read_json_file.return_value = [{"prompt": "Test", "response": "Response"}]
-        self.chat_history.load_history()
+        with patch.object(self.chat_history.journal, 'rewrite') as mock_rewrite:
+            self.chat_history.save_history()
+        mock_rewrite.assert_called_once_with(self.chat_history.history)
+
+    def test_load_history(self):
+        with patch.object(self.chat_history.journal, 'load', return_value=[{"prompt": "Test", "response": "Response"}, "junk"]):
+            self.chat_history.load_history()
         self.assertEqual(len(self.chat_history.history), 1)
         self.assertEqual(self.chat_history.history[0]["prompt"], "Test")
 
-    @patch('src.modules.save_history.write_json_file')
-    @patch('src.modules.save_history.ensure_directory_exists')
-    def test_save_memory(self, mock_ensure_dir, mock_write_json_file):
+    @patch('src.modules.save_history.get_memory_store')
+    def test_save_memory(self, mock_get_memory_store):
         save_memory("test", "content", "user", "model")
-        mock_ensure_dir.assert_called_once()
-        mock_write_json_file.assert_called_once()
+        mock_get_memory_store.return_value.put.assert_called_once()
+        filename, data = mock_get_memory_store.return_value.put.call_args.args
+        self.assertTrue(filename.endswith("_test.json"))
+        self.assertEqual(data["content"], "content")
 
     @patch('src.modules.save_history.save_memory')
     def test_save_interaction(self, mock_save_memory):
         save_interaction("Hello", "Hi", "user", "model")
         mock_save_memory.assert_called_once_with("interaction", {"prompt": "Hello", "response": "Hi"}, "user", "model")
 
+    @patch('src.modules.save_history.add_memory_to_edge_kb')
+    @patch('src.modules.memory_search.index_memories')
+    @patch('src.modules.save_history.get_memory_store')
+    def test_save_interactions_in_bulk(self, mock_get_memory_store, mock_index_memories, mock_add_to_edge_kb):
+        now = datetime(2024, 1, 1, 12, 0, 0, 5)
+        with patch.object(self.chat_history, 'save_entries') as mock_save_entries, \
+                patch.object(self.chat_history, 'add_to_edge_kb') as mock_history_edges:
+            written = save_interactions([("Hello", "Hi", "user", "model", now), ("Again", "Hi", "helper", "model", now)],
+                                        [("Hello", "Hi")])
+        self.assertEqual(written, 2)
+        mock_save_entries.assert_called_once_with([("Hello", "Hi")])
+        mock_history_edges.assert_called_once_with("Hello", "Hi")
+        memories = mock_get_memory_store.return_value.put_many.call_args.args[0]
+        self.assertEqual([filename for filename, _ in memories],
+                         ["20240101_120000_000005_interaction.json", "20240101_120000_000005_interaction_2.json"])
+        mock_index_memories.assert_called_once_with(memories)
+        self.assertEqual(mock_add_to_edge_kb.call_count, 2)
+
+        save_interactions([("Late", "Hi", "user", "model", now)], index=False)
+        mock_index_memories.assert_called_once()
+        self.assertEqual(mock_add_to_edge_kb.call_count, 3)
+
     @patch('src.modules.save_history.save_memory')
     def test_save_document_chunk(self, mock_save_memory):
         save_document_chunk("chunk1", "content", "user", "model")
-        mock_save_memory.assert_called_once_with("document_chunk", "content", "user", "model", {"chunk_id": "chunk1"})
+        mock_save_memory.assert_called_once_with("document_chunk", "content", "user", "model", {"chunk_id": "chunk1"}, embedding=None)
+
+class TestRelatedMemories(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = ConnectionManager(self.temp_dir / "edges.db", SCHEMA)
+        self.patcher = patch('src.modules.kb_graph.get_db_connection', self.manager.get_connection)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def memory(self, prompt, response):
+        return {"type": "interaction", "content": {"prompt": prompt, "response": response},
+                "username": "user", "model_name": "model"}
+
+    @patch('src.modules.save_history.get_memory_store')
+    def test_follows_content_edges_to_stored_memories(self, mock_get_memory_store):
+        memories = {"a.json": self.memory("What is Python?", "A language."),
+                    "b.json": self.memory("Tell me more", "A language."),
+                    "c.json": self.memory("Unrelated", "Something else.")}
+        for memory_id, data in memories.items():
+            add_memory_to_edge_kb(data, memory_id)
+        mock_get_memory_store.return_value.get_many.side_effect = lambda ids: {i: memories[i] for i in ids}
+
+        related = get_related_memories("What is Python?", top_k=5)
+        self.assertEqual([memory["content"]["prompt"] for memory in related], ["What is Python?", "Tell me more"])
+        self.assertEqual([memory["hops"] for memory in related], [1, 3])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from src.modules.db_connection import ConnectionManager
+from src.utils.schema import SCHEMA, apply_schema, legacy_tables, migrate_legacy_layout
+
+LEGACY_LAYOUT = """
+CREATE TABLE edges (id INTEGER PRIMARY KEY AUTOINCREMENT, source_id TEXT NOT NULL, target_id TEXT NOT NULL,
+    relationship_type TEXT NOT NULL, strength REAL NOT NULL, confidence REAL NOT NULL DEFAULT 1.0,
+    bidirectional BOOLEAN DEFAULT FALSE, start_time TIMESTAMP, end_time TIMESTAMP, metadata JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(source_id, target_id, relationship_type));
+CREATE TABLE node_attributes (node_id TEXT NOT NULL, attribute_name TEXT NOT NULL, attribute_value TEXT NOT NULL,
+    confidence REAL NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (node_id, attribute_name));
+CREATE TABLE hierarchies (parent_id TEXT NOT NULL, child_id TEXT NOT NULL, hierarchy_type TEXT NOT NULL,
+    confidence REAL NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (parent_id, child_id, hierarchy_type));
+INSERT INTO edges (id, source_id, target_id, relationship_type, strength, bidirectional, metadata, updated_at)
+VALUES (7, 'a', 'b', 'R', 0.5, TRUE, '{"k": 1}', '2001-01-01 00:00:00'), (9, 'b', 'c', 'S', 0.25, FALSE, NULL, NULL);
+INSERT INTO node_attributes (node_id, attribute_name, attribute_value, confidence) VALUES ('a', 'color', 'red', 0.9);
+INSERT INTO hierarchies (parent_id, child_id, hierarchy_type, confidence) VALUES ('c', 'a', 'part_of', 0.8);
+"""
+
+class TestSchema(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "edges.db"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_migrates_legacy_tables_to_interned_ids(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(LEGACY_LAYOUT)
+        self.assertEqual(sorted(legacy_tables(conn)), ["edges", "hierarchies", "node_attributes"])
+        apply_schema(conn)
+        self.assertEqual(legacy_tables(conn), [])
+        self.assertEqual(migrate_legacy_layout(conn), 0)
+        self.assertEqual([row[0] for row in conn.execute("SELECT key FROM nodes ORDER BY key")], ["a", "b", "c"])
+        self.assertEqual(conn.execute(
+            "SELECT id, source_id, target_id, relationship_type, strength, bidirectional, metadata, updated_at "
+            "FROM edges ORDER BY id").fetchall(),
+            [(7, "a", "b", "R", 0.5, 1, '{"k": 1}', "2001-01-01 00:00:00"), (9, "b", "c", "S", 0.25, 0, None, None)])
+        self.assertEqual(conn.execute("SELECT node_id, attribute_name, attribute_value, confidence FROM node_attributes").fetchall(),
+                         [("a", "color", "red", 0.9)])
+        self.assertEqual(conn.execute("SELECT parent_id, child_id, hierarchy_type, confidence FROM hierarchies").fetchall(),
+                         [("c", "a", "part_of", 0.8)])
+        # New edges continue after the highest migrated id
+        conn.execute("INSERT INTO edges (source_id, target_id, relationship_type, strength) VALUES ('c', 'd', 'R', 1.0)")
+        self.assertEqual(conn.execute("SELECT id FROM edges WHERE target_id = 'd'").fetchone()[0], 10)
+        conn.close()
+
+    def test_migrates_tables_missing_newer_columns(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            CREATE TABLE edges (id INTEGER PRIMARY KEY AUTOINCREMENT, source_id TEXT NOT NULL, target_id TEXT NOT NULL,
+                relationship_type TEXT NOT NULL, strength REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(source_id, target_id, relationship_type));
+            INSERT INTO edges (source_id, target_id, relationship_type, strength) VALUES ('a', 'b', 'R', 0.5);
+        """)
+        apply_schema(conn)
+        self.assertEqual(conn.execute("SELECT source_id, target_id, confidence, bidirectional, start_time FROM edges").fetchall(),
+                         [("a", "b", 1.0, 0, None)])
+        conn.close()
+
+    def test_connection_manager_migrates_with_callable_schema(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(LEGACY_LAYOUT)
+        conn.close()
+        manager = ConnectionManager(self.db_path, apply_schema)
+        conn = manager.get_connection()
+        self.assertEqual(conn.execute("SELECT type FROM sqlite_master WHERE name = 'edges'").fetchone()[0], "view")
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM edge_store").fetchone()[0], 2)
+        manager.close()
+
+    def test_views_accept_writes_through_text_keys(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute("INSERT INTO edges (source_id, target_id, relationship_type, strength) VALUES ('a', 'b', 'R', 0.5)")
+            conn.execute("INSERT INTO node_attributes (node_id, attribute_name, attribute_value, confidence) "
+                         "VALUES ('a', 'color', 'red', 1.0)")
+            conn.execute("INSERT INTO hierarchies (parent_id, child_id, hierarchy_type, confidence) VALUES ('b', 'a', 'is_a', 1.0)")
+            conn.execute("UPDATE edges SET target_id = 'c', strength = 0.75 WHERE source_id = 'a'")
+            conn.execute("UPDATE node_attributes SET attribute_value = 'blue', confidence = 0.5 WHERE node_id = 'a'")
+            conn.execute("UPDATE hierarchies SET parent_id = 'c' WHERE child_id = 'a'")
+        self.assertEqual(conn.execute("SELECT source_id, target_id, strength FROM edges").fetchall(), [("a", "c", 0.75)])
+        self.assertEqual(conn.execute("SELECT node_id, attribute_value, confidence FROM node_attributes").fetchall(), [("a", "blue", 0.5)])
+        self.assertEqual(conn.execute("SELECT parent_id, child_id FROM hierarchies").fetchall(), [("c", "a")])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0], 3)
+        with conn:
+            conn.execute("DELETE FROM edges WHERE source_id = 'a'")
+            conn.execute("DELETE FROM node_attributes WHERE node_id = 'a'")
+            conn.execute("DELETE FROM hierarchies WHERE child_id = 'a'")
+        for table in ("edge_store", "node_attribute_store", "hierarchy_store"):
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], 0)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
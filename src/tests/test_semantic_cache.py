@@ -0,0 +1,111 @@
+import shutil
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from src.modules.semantic_cache import SemanticResponseCache
+
+VOCABULARY = ["extract", "key", "points", "from", "this", "text", "summarise", "weather", "3-5"]
+
+def bag_of_words(text: str):
+    words = text.lower().split()
+    return [float(words.count(word)) for word in VOCABULARY]
+
+class TestSemanticResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "semantic.db"
+        self.embedded = []
+        self.cache = self.open()
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def embed(self, text: str):
+        self.embedded.append(text)
+        return bag_of_words(text)
+
+    def open(self, **kwargs) -> SemanticResponseCache:
+        kwargs.setdefault("default_threshold", 0.9)
+        return SemanticResponseCache(self.db_path, embed=self.embed, **kwargs)
+
+    def test_serves_near_identical_prompts(self):
+        self.cache.put("Extract 3-5 key points from this text", "m", "points", call_site="Helper")
+        self.assertEqual(self.cache.get("Extract key points from this text", "m", call_site="Helper"), "points")
+        self.assertIsNone(self.cache.get("Summarise the weather", "m", call_site="Helper"))
+        self.assertEqual((self.cache.stats["hits"], self.cache.stats["misses"]), (1, 1))
+
+    def test_scope_covers_model_options_and_call_site(self):
+        self.cache.put("extract key points", "m", "points", {"temperature": 0}, "Helper")
+        prompt = "extract key points"
+        self.assertIsNone(self.cache.get(prompt, "other", {"temperature": 0}, "Helper"))
+        self.assertIsNone(self.cache.get(prompt, "m", None, "Helper"))
+        self.assertIsNone(self.cache.get(prompt, "m", {"temperature": 0}, "Chat"))
+        self.assertEqual(self.cache.get(prompt, "m", {"temperature": 0}, "Helper"), "points")
+
+    def test_call_site_thresholds(self):
+        self.cache.close()
+        self.cache = self.open(thresholds={"Strict": 0.99, "Off": None})
+        for site in ("Default", "Strict", "Off"):
+            self.cache.put("extract key points from this text", "m", site, call_site=site)
+        near = "extract key points from text"
+        self.assertEqual(self.cache.get(near, "m", call_site="Default"), "Default")
+        self.assertIsNone(self.cache.get(near, "m", call_site="Strict"))
+        self.assertIsNone(self.cache.get("extract key points from this text", "m", call_site="Off"))
+        self.assertEqual(len(self.cache), 2)
+
+    def test_shadow_mode_logs_without_serving(self):
+        self.cache.close()
+        self.cache = self.open(shadow=True)
+        self.cache.put("extract key points", "m", "points")
+        with self.assertLogs("ollama_agents", level="INFO") as logs:
+            self.assertIsNone(self.cache.get("extract the key points", "m"))
+        self.assertIn("would serve", "\n".join(logs.output))
+        self.assertEqual((self.cache.stats["shadow_hits"], self.cache.stats["hits"]), (1, 0))
+
+    def test_persists_and_evicts_oldest(self):
+        self.cache.close()
+        self.cache = self.open(max_entries=2)
+        for prompt in ("extract", "weather", "summarise"):
+            self.cache.put(prompt, "m", prompt.upper())
+        self.assertEqual(self.cache.stats["evictions"], 1)
+        self.cache.close()
+        self.cache = self.open(max_entries=2)
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("extract", "m"))
+        self.assertEqual(self.cache.get("summarise", "m"), "SUMMARISE")
+
+    def test_call_site_ttls(self):
+        self.cache.close()
+        self.cache = self.open(default_ttl=3600, ttls={"Fresh": 0.05, "Off": 0})
+        for site in ("Default", "Fresh", "Off"):
+            self.cache.put("extract key points", "m", site, call_site=site)
+        self.assertEqual(len(self.cache), 2)
+        time.sleep(0.1)
+        self.assertEqual(self.cache.get("extract key points", "m", call_site="Default"), "Default")
+        self.assertIsNone(self.cache.get("extract key points", "m", call_site="Fresh"))
+
+    def test_scopes_grow_and_evict_independently(self):
+        self.cache.close()
+        self.cache = self.open(max_entries=40)
+        for i in range(50):
+            words = [VOCABULARY[i % 9]] * (1 + i // 9) + [VOCABULARY[(i + 1) % 9]]
+            self.cache.put(" ".join(words), "m", str(i), call_site=f"site{i % 2}")
+        self.assertEqual((len(self.cache), self.cache.stats["evictions"]), (40, 10))
+        self.assertEqual(sorted(len(rows) for rows in self.cache.scopes.values()), [20, 20])
+        last = " ".join([VOCABULARY[49 % 9]] * (1 + 49 // 9) + [VOCABULARY[50 % 9]])
+        self.assertEqual(self.cache.get(last, "m", call_site="site1"), "49")
+
+    def test_embedding_failure_is_a_miss(self):
+        def broken(text):
+            raise RuntimeError("embedding server down")
+
+        self.cache.close()
+        self.cache = SemanticResponseCache(self.db_path, embed=broken)
+        self.cache.put("extract", "m", "EXTRACT")
+        self.assertIsNone(self.cache.get("extract", "m"))
+        self.assertEqual(self.cache.stats["errors"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
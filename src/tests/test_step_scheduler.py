@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+from src.modules.step_scheduler import Step, StepScheduler
+
+class TestStepScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = StepScheduler(max_workers=4)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_passes_required_results_in_order(self):
+        results = self.scheduler.run([
+            Step("sum", lambda a, b: a + b, ("a", "b")),
+            Step("a", lambda: 2),
+            Step("b", lambda seed: seed * 10, ("seed",)),
+            Step("diff", lambda total, a: total - a, ("sum", "a")),
+        ], {"seed": 3})
+        self.assertEqual(results, {"seed": 3, "a": 2, "b": 30, "sum": 32, "diff": 30})
+
+    def test_independent_steps_overlap(self):
+        def slow(value):
+            time.sleep(0.2)
+            return value
+
+        start = time.perf_counter()
+        results = self.scheduler.run([Step(name, lambda name=name: slow(name)) for name in "abc"]
+                                     + [Step("joined", lambda a, b, c: a + b + c, ("a", "b", "c"))])
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(results["joined"], "abc")
+        self.assertGreaterEqual(self.scheduler.timings["a"], 0.2)
+
+    def test_step_error_is_raised_and_dependents_never_run(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            self.scheduler.run([Step("bad", fail), Step("after", lambda bad: ran.append(bad), ("bad",))])
+        self.assertEqual(ran, [])
+
+    def test_rejects_unknown_and_circular_requirements(self):
+        with self.assertRaisesRegex(ValueError, "unknown"):
+            self.scheduler.run([Step("a", lambda missing: missing, ("missing",))])
+        with self.assertRaisesRegex(ValueError, "circular"):
+            self.scheduler.run([Step("a", lambda b: b, ("b",)), Step("b", lambda a: a, ("a",))])
+
+    def test_optional_steps_give_way_to_the_budget(self):
+        steps = [Step("answer", lambda: "answer"),
+                 Step("extra", lambda answer: "extra", ("answer",), optional=True, default="none", estimate=1.0)]
+        run = self.scheduler.execute(steps, budget=0.5)
+        self.assertEqual(run.results, {"answer": "answer", "extra": "none"})
+        self.assertEqual(run.skipped, {"extra": "budget"})
+        self.assertEqual(self.scheduler.execute(steps).results["extra"], "extra")
+
+    def test_background_batches_run_in_order(self):
+        order, gate = [], threading.Event()
+        first = self.scheduler.run_in_background([Step("x", lambda: (gate.wait(1), order.append(1)))])
+        second = self.scheduler.run_in_background([Step("x", lambda: order.append(2))])
+        gate.set()
+        second.result(timeout=2)
+        self.assertTrue(first.done())
+        self.assertEqual(order, [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import io
+import unittest
+from rich.console import Console
+import threading
+from src.modules.stream_renderer import StreamRenderer, headless_streams, run_headless
+
+def console() -> Console:
+    return Console(file=io.StringIO(), force_terminal=False, width=80)
+
+class TestStreamRenderer(unittest.TestCase):
+    def test_collects_chunks_and_prints_each_line_once(self):
+        out = console()
+        with StreamRenderer(out, refresh_per_second=0, headless=False) as renderer:
+            self.assertTrue(renderer.live)
+            for chunk in ["first ", "line\nsecond", " line\nthird"]:
+                renderer.feed(chunk)
+        self.assertEqual(renderer.getvalue(), "first line\nsecond line\nthird")
+        written = out.file.getvalue()
+        for line in ("first line", "second line", "third"):
+            self.assertEqual(written.count(line), 1, written)
+
+    def test_renders_are_throttled(self):
+        with StreamRenderer(console(), refresh_per_second=0.001, headless=False) as renderer:
+            for _ in range(1000):
+                renderer.feed("token ")
+        self.assertEqual(renderer.renders, 2)
+        self.assertEqual(renderer.getvalue(), "token " * 1000)
+
+    def test_headless_writes_nothing(self):
+        out = console()
+        with StreamRenderer(out, headless=True) as renderer:
+            renderer.feed("quiet\n")
+        self.assertFalse(renderer.live)
+        self.assertEqual(renderer.getvalue(), "quiet\n")
+        self.assertEqual(out.file.getvalue(), "")
+
+    def test_one_live_display_at_a_time(self):
+        with StreamRenderer(console(), headless=False) as first:
+            with StreamRenderer(console(), headless=False) as second:
+                self.assertTrue(first.live)
+                self.assertFalse(second.live)
+        with StreamRenderer(console(), headless=False) as third:
+            self.assertTrue(third.live)
+
+    def test_headless_streams_is_per_thread(self):
+        seen = {}
+        def stream():
+            with StreamRenderer(console(), headless=False) as renderer:
+                seen["live"] = renderer.live
+        worker = threading.Thread(target=run_headless(stream))
+        worker.start()
+        worker.join()
+        self.assertFalse(seen["live"])
+        with headless_streams():
+            stream()
+            self.assertFalse(seen["live"])
+        stream()
+        self.assertTrue(seen["live"])
+
+if __name__ == '__main__':
+    unittest.main()
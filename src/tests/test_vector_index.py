@@ -0,0 +1,57 @@
+import unittest
+import tempfile
+import numpy as np
+from pathlib import Path
+from src.modules.vector_index import VectorIndex
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.index = VectorIndex(self.temp_dir)
+
+    def test_add_and_search(self):
+        self.index.add("a.json", [1, 0, 0])
+        self.index.add("b.json", [0, 1, 0])
+        self.index.add("c.json", [1, 1, 1])
+        results = self.index.search([1, 1, 0], top_k=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][1], "c.json")
+        self.assertAlmostEqual(results[0][0], 0.8164965809277259, places=6)
+        self.assertAlmostEqual(results[1][0], 0.7071067811865475, places=6)
+
+    def test_duplicate_ids_are_skipped(self):
+        self.assertTrue(self.index.add("a.json", [1, 0]))
+        self.assertFalse(self.index.add("a.json", [0, 1]))
+        self.assertEqual(len(self.index), 1)
+
+    def test_dimension_mismatch_is_skipped(self):
+        self.index.add("a.json", [1, 0, 0])
+        self.assertFalse(self.index.add("b.json", [1, 0]))
+        self.assertEqual(len(self.index), 1)
+
+    def test_persists_across_instances(self):
+        self.index.add_many([("a.json", [1, 0]), ("b.json", [0, 2])])
+        reloaded = VectorIndex(self.temp_dir)
+        self.assertEqual(len(reloaded), 2)
+        self.assertIn("b.json", reloaded)
+        np.testing.assert_allclose(reloaded.matrix()[1], [0, 1])
+        self.assertEqual(reloaded.search([0, 1], top_k=1)[0][1], "b.json")
+
+    def test_repairs_torn_append(self):
+        self.index.add_many([("a.json", [1, 0]), ("b.json", [0, 1])])
+        with self.index.vectors_path.open('ab') as f:
+            f.write(np.array([1.0], dtype=np.float32).tobytes())
+        reloaded = VectorIndex(self.temp_dir)
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(reloaded.vectors_path.stat().st_size, 2 * 2 * 4)
+
+    def test_search_many(self):
+        self.index.add_many([("a.json", [1, 0]), ("b.json", [0, 1])])
+        results = self.index.search_many([[1, 0.1], [0.1, 1]], top_k=1)
+        self.assertEqual([r[0][1] for r in results], ["a.json", "b.json"])
+
+    def test_search_empty_index(self):
+        self.assertEqual(self.index.search([1, 0], top_k=3), [])
+
+if __name__ == '__main__':
+    unittest.main()
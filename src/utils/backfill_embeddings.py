@@ -0,0 +1,26 @@
+# src/utils/backfill_embeddings.py
+
+import os
+import sys
+import argparse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.modules.memory_search import backfill_embeddings
+
+def print_progress(processed: int, total: int):
+    print(f"Processed {processed}/{total} memories")
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed memories that are missing from the vector index.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Vectors appended to the index per batch")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of memories to process in this run")
+    args = parser.parse_args()
+
+    print("Starting embedding backfill...")
+    added = backfill_embeddings(batch_size=args.batch_size, limit=args.limit, progress_callback=print_progress)
+    print(f"Backfill complete. Indexed {added} memories. Re-run to resume if interrupted.")
+
+if __name__ == "__main__":
+    main()
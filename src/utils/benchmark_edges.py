@@ -0,0 +1,208 @@
+# src/utils/benchmark_edges.py
+
+import os
+import sys
+import time
+import hashlib
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.utils.schema import SCHEMA, NODE_ID_SQL
+from src.modules.db_connection import ConnectionManager
+from src.modules.kb_graph import EdgeWriter, write_edges
+
+# The text-keyed edges table and indexes the schema used before node ids were interned
+LEGACY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS edges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    relationship_type TEXT NOT NULL,
+    strength REAL NOT NULL,
+    confidence REAL NOT NULL DEFAULT 1.0,
+    bidirectional BOOLEAN DEFAULT FALSE,
+    start_time TIMESTAMP,
+    end_time TIMESTAMP,
+    metadata JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(source_id, target_id, relationship_type)
+);
+CREATE INDEX IF NOT EXISTS idx_edges_source_covering ON edges(source_id, relationship_type, target_id, strength, confidence);
+CREATE INDEX IF NOT EXISTS idx_edges_target_covering ON edges(target_id, bidirectional, relationship_type, source_id, strength, confidence);
+CREATE INDEX IF NOT EXISTS idx_edges_relationship_type ON edges(relationship_type);
+CREATE INDEX IF NOT EXISTS idx_edges_confidence_time ON edges(confidence, start_time, end_time);
+CREATE INDEX IF NOT EXISTS idx_edges_start_time ON edges(start_time);
+CREATE INDEX IF NOT EXISTS idx_edges_end_time ON edges(end_time);
+CREATE INDEX IF NOT EXISTS idx_edges_updated_at ON edges(updated_at);
+"""
+
+INSERT_EDGE_SQL = """
+    INSERT OR REPLACE INTO edges (source_id, target_id, relationship_type, strength)
+    VALUES (?, ?, ?, ?)
+"""
+
+UPDATE_STRENGTH_SQL = """
+    UPDATE edges SET strength = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE source_id = ? AND target_id = ? AND relationship_type = ?
+"""
+
+UPDATE_STORE_STRENGTH_SQL = f"""
+    UPDATE edge_store SET strength = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE source = {NODE_ID_SQL} AND target = {NODE_ID_SQL} AND relationship_type = ?
+"""
+
+# The updated_at trigger the schema used to install
+LEGACY_TRIGGER = """
+CREATE TRIGGER update_edges_timestamp
+AFTER UPDATE ON edges
+BEGIN
+    UPDATE edges SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+"""
+
+def edge_rows(count: int):
+    return [(f"node{i}", f"node{i + 1}", "RELATED_TO", 1.0) for i in range(count)]
+
+def hashed_edge_rows(count: int, fanout: int = 5):
+    """Edges between MD5 memory hashes, the shape the memory store writes."""
+    keys = [hashlib.md5(str(i).encode()).hexdigest() for i in range(count // fanout + fanout)]
+    return [(keys[i // fanout], keys[i // fanout + 1 + i % fanout], "RELATED_TO", 1.0) for i in range(count)]
+
+def seed_edges(conn: sqlite3.Connection, schema: str, rows):
+    """Write ``rows`` in one transaction with the insert that matches the schema's layout."""
+    if schema.startswith(LEGACY_SCHEMA):
+        with conn:
+            conn.executemany(INSERT_EDGE_SQL, rows)
+    else:
+        write_edges(conn, rows)
+
+def bench_connection_per_edge(db_path: Path, rows) -> float:
+    """The original create_edge: a new connection and a commit for every edge."""
+    start = time.perf_counter()
+    for row in rows:
+        conn = sqlite3.connect(db_path)
+        conn.execute(INSERT_EDGE_SQL, row)
+        conn.commit()
+        conn.close()
+    return time.perf_counter() - start
+
+def bench_shared_connection(db_path: Path, rows) -> float:
+    """create_edge through the connection manager: one WAL connection, a commit per edge."""
+    manager = ConnectionManager(db_path, SCHEMA)
+    start = time.perf_counter()
+    for row in rows:
+        write_edges(manager.get_connection(), [row])
+    elapsed = time.perf_counter() - start
+    manager.close()
+    return elapsed
+
+def bench_edge_writer(db_path: Path, rows) -> float:
+    """Bulk ingestion: EdgeWriter batches edges into executemany transactions."""
+    manager = ConnectionManager(db_path, SCHEMA)
+    start = time.perf_counter()
+    with EdgeWriter(conn=manager.get_connection()) as writer:
+        for row in rows:
+            writer.add(*row)
+    elapsed = time.perf_counter() - start
+    manager.close()
+    return elapsed
+
+def bench_updates(db_path: Path, rows, rounds: int, schema: str, write, batch_size: int) -> tuple:
+    """
+    Re-write the strength of every edge ``rounds`` times, ``batch_size`` edges per transaction.
+
+    Returns the elapsed time and the WAL bytes written per updated edge; the
+    WAL is never checkpointed during the run, so its size is the write volume.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript(schema)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    seed_edges(conn, schema, rows)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    wal_path = Path(f"{db_path}-wal")
+    start = time.perf_counter()
+    for round_number in range(rounds):
+        strength = round_number / rounds
+        updated = [(source, target, rel, strength) for source, target, rel, _ in rows]
+        for offset in range(0, len(updated), batch_size):
+            with conn:
+                write(conn, updated[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start
+    wal_bytes = wal_path.stat().st_size if wal_path.exists() else 0
+    conn.close()
+    return elapsed, wal_bytes / (len(rows) * rounds)
+
+def run_updates(rows, rounds: int, batch_size: int):
+    legacy_schema = LEGACY_SCHEMA + LEGACY_TRIGGER
+    variants = [
+        ("INSERT OR REPLACE", legacy_schema, lambda conn, batch: conn.executemany(INSERT_EDGE_SQL, batch)),
+        ("UPDATE + trigger", legacy_schema, lambda conn, batch: conn.executemany(
+            UPDATE_STRENGTH_SQL, [(strength, source, target, rel) for source, target, rel, strength in batch])),
+        ("UPDATE, no trigger", LEGACY_SCHEMA, lambda conn, batch: conn.executemany(
+            UPDATE_STRENGTH_SQL, [(strength, source, target, rel) for source, target, rel, strength in batch])),
+        ("UPDATE, interned ids", SCHEMA, lambda conn, batch: conn.executemany(
+            UPDATE_STORE_STRENGTH_SQL, [(strength, source, target, rel) for source, target, rel, strength in batch])),
+        ("upsert, interned ids", SCHEMA, write_edges),
+    ]
+    for label, schema, write in variants:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            elapsed, wal_per_edge = bench_updates(Path(temp_dir) / "edges.db", rows, rounds, schema, write, batch_size)
+        updates = len(rows) * rounds
+        print(f"{label:<28} {updates / elapsed:>12,.0f} updates/sec  {wal_per_edge:>8,.0f} WAL bytes/update")
+
+def database_size(db_path: Path, schema: str, rows) -> int:
+    """File size after writing ``rows`` and vacuuming; interned layouts include the nodes table."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(schema)
+    seed_edges(conn, schema, rows)
+    conn.execute("VACUUM")
+    conn.close()
+    return db_path.stat().st_size
+
+def run_sizes(rows):
+    sizes = {}
+    for label, schema in (("text keys", LEGACY_SCHEMA), ("interned node ids", SCHEMA)):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            sizes[label] = database_size(Path(temp_dir) / "edges.db", schema, rows)
+        print(f"{label:<28} {sizes[label] / 1024:>12,.0f} KiB  {sizes[label] / len(rows):>8,.0f} bytes/edge")
+
+def run(label: str, bench, rows, schema: str = SCHEMA):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / "edges.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(schema)
+        conn.close()
+        elapsed = bench(db_path, rows)
+    print(f"{label:<28} {len(rows) / elapsed:>12,.0f} edges/sec  ({elapsed:.2f}s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark edge insert and update throughput in the knowledge graph database.")
+    parser.add_argument("--edges", type=int, default=2000, help="Number of edges to insert per run")
+    parser.add_argument("--update-rounds", type=int, default=5,
+                        help="Times every edge is re-written in the repeated-update benchmark")
+    parser.add_argument("--update-batch", type=int, default=1,
+                        help="Edges per transaction in the repeated-update benchmark (1 matches create_edge)")
+    parser.add_argument("--size-edges", type=int, default=50000,
+                        help="Number of MD5-keyed edges in the storage size comparison")
+    args = parser.parse_args()
+
+    rows = edge_rows(args.edges)
+    print("Inserting new edges:")
+    run("connection per edge", bench_connection_per_edge, rows, LEGACY_SCHEMA)
+    run("shared WAL connection", bench_shared_connection, rows)
+    run("EdgeWriter bulk batches", bench_edge_writer, rows)
+    print(f"\nRe-writing existing edges ({args.update_batch} per transaction):")
+    run_updates(rows, args.update_rounds, args.update_batch)
+    print(f"\nStorage for {args.size_edges} MD5-keyed edges:")
+    run_sizes(hashed_edge_rows(args.size_edges))
+
+if __name__ == "__main__":
+    main()
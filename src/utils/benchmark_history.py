@@ -0,0 +1,66 @@
+# src/utils/benchmark_history.py
+
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+import tempfile
+from collections import deque
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from config import CHUNK_SIZE
+from src.modules.history_journal import HistoryJournal
+
+def make_chunks(count: int, size: int, seed: int = 0):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + "      \n"
+    return ["".join(rng.choices(alphabet, k=size)) for _ in range(count)]
+
+def bench_rewrite(path: Path, window: int, chunks) -> float:
+    # What ChunkHistory.add_chunk did before: rewrite the whole pretty-printed file per append
+    history = deque(maxlen=window)
+    start = time.perf_counter()
+    for chunk in chunks:
+        history.append(chunk)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(list(history), f, ensure_ascii=False, indent=2)
+    return time.perf_counter() - start
+
+def bench_journal(path: Path, window: int, chunks, fsync: bool = False) -> float:
+    journal = HistoryJournal(path, window, fsync=fsync)
+    start = time.perf_counter()
+    for chunk in chunks:
+        journal.append(chunk)
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark history append latency against the size of the kept window.")
+    parser.add_argument("--appends", type=int, default=500, help="Chunks appended per run (a large document upload)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Characters per chunk")
+    parser.add_argument("--windows", type=int, nargs="+", default=[10, 100, 500], help="History lengths to keep")
+    parser.add_argument("--fsync", action="store_true", help="Also time the journal with an fsync per append")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.appends, args.chunk_size)
+    print(f"Appending {args.appends} chunks of {args.chunk_size} characters (mean latency per append):")
+    for window in args.windows:
+        results = []
+        variants = [("rewrite JSON", bench_rewrite), ("journal", bench_journal)]
+        if args.fsync:
+            variants.append(("journal + fsync", lambda path, window, chunks: bench_journal(path, window, chunks, True)))
+        for label, bench in variants:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                elapsed = bench(Path(temp_dir) / "history", window, chunks)
+            results.append(f"{label} {elapsed / len(chunks) * 1000:>8.3f} ms")
+        print(f"window {window:>5}:  " + "   ".join(results))
+
+if __name__ == "__main__":
+    main()
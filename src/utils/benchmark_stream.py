@@ -0,0 +1,73 @@
+# src/utils/benchmark_stream.py
+
+import io
+import os
+import sys
+import time
+import random
+import argparse
+from typing import Callable, List
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from rich.console import Console
+from rich.live import Live
+from rich.text import Text
+from src.modules.stream_renderer import StreamRenderer
+
+WORDS = ["the", "model", "streams", "tokens", "into", "a", "live", "display", "while", "rendering",
+         "each", "update", "of", "response", "text", "knowledge", "graph", "memory", "context", "answer"]
+
+def token_stream(count: int, seed: int = 0) -> List[str]:
+    """Word-sized chunks with a line break roughly every 15 tokens, like a chatty answer."""
+    rng = random.Random(seed)
+    return [("\n" if rng.random() < 1 / 15 else " ") + rng.choice(WORDS) for _ in range(count)]
+
+def benchmark_console() -> Console:
+    return Console(file=io.StringIO(), force_terminal=True, width=100, height=40, color_system="truecolor")
+
+def legacy_stream(console: Console, tokens: List[str], delay: float) -> str:
+    # What OllamaClient did before: rebuild the whole Text on every token
+    with Live(Text("Processing...", style="yellow bold"), console=console, refresh_per_second=4) as live:
+        full_response = ""
+        for token in tokens:
+            full_response += token
+            live.update(Text(full_response, style="yellow bold"))
+            if delay:
+                time.sleep(delay)
+    return full_response
+
+def renderer_stream(console: Console, tokens: List[str], delay: float, headless: bool = False) -> str:
+    with StreamRenderer(console, headless=headless) as renderer:
+        for token in tokens:
+            renderer.feed(token)
+            if delay:
+                time.sleep(delay)
+    return renderer.getvalue()
+
+def run(label: str, stream: Callable[[Console, List[str], float], str], tokens: List[str], delay: float):
+    console = benchmark_console()
+    wall, cpu = time.perf_counter(), time.process_time()
+    text = stream(console, tokens, delay)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    assert text == "".join(tokens)
+    written = len(console.file.getvalue())
+    print(f"{label:<24} {wall:>8.3f}s wall  {cpu:>8.3f}s CPU  {written / 1024:>10,.0f} KiB written")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rendering a streamed response in the terminal.")
+    parser.add_argument("--tokens", type=int, default=4096, help="Number of streamed tokens")
+    parser.add_argument("--tokens-per-second", type=float, default=0,
+                        help="Arrival rate of the tokens; 0 streams them as fast as possible")
+    args = parser.parse_args()
+
+    tokens = token_stream(args.tokens)
+    delay = 1 / args.tokens_per_second if args.tokens_per_second > 0 else 0.0
+    print(f"Streaming {len(tokens)} tokens ({len(''.join(tokens)):,} characters):")
+    run("rebuild Text per token", legacy_stream, tokens, delay)
+    run("StreamRenderer", renderer_stream, tokens, delay)
+    run("StreamRenderer headless", lambda console, tokens, delay: renderer_stream(console, tokens, delay, True), tokens, delay)
+
+if __name__ == "__main__":
+    main()
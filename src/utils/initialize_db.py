@@ -1,8 +1,13 @@
 # src/utils/initialize_db.py
 
+import os
+import sys
 import sqlite3
 from pathlib import Path
-from schema import SCHEMA
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.utils.schema import SCHEMA, REDUNDANT_INDEXES, legacy_tables, migrate_legacy_layout
 
 # Configuration
 DB_DIR = Path('data/edgebase')
@@ -22,7 +27,7 @@ def database_exists():
     return DB_PATH.is_file()
 
 def initialize_database():
-    """Initialize the database, create tables, and set up triggers if they don't exist."""
+    """Initialize the database, creating tables and indexes if they don't exist."""
     create_directory()
 
     if database_exists():
@@ -45,107 +50,25 @@ def create_new_database():
     print("New database created with full schema.")
 
 def update_existing_database():
-    """Update existing database with new tables and columns."""
+    """Update existing database with new tables, indexes and the interned node layout."""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
-    # Check if edges table exists
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='edges'")
-    if cursor.fetchone():
-        # Add new columns to edges table if they don't exist
-        columns_to_add = [
-            ("confidence", "REAL NOT NULL DEFAULT 1.0"),
-            ("bidirectional", "BOOLEAN DEFAULT FALSE"),
-            ("start_time", "TIMESTAMP"),
-            ("end_time", "TIMESTAMP"),
-            ("metadata", "JSON")
-        ]
-        for column_name, column_type in columns_to_add:
-            try:
-                cursor.execute(f"ALTER TABLE edges ADD COLUMN {column_name} {column_type}")
-                print(f"Added column {column_name} to edges table")
-            except sqlite3.OperationalError:
-                print(f"Column {column_name} already exists in edges table")
-    else:
-        # If edges table doesn't exist, create it
-        cursor.execute("""
-        CREATE TABLE edges (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source_id TEXT NOT NULL,
-            target_id TEXT NOT NULL,
-            relationship_type TEXT NOT NULL,
-            strength REAL NOT NULL,
-            confidence REAL NOT NULL DEFAULT 1.0,
-            bidirectional BOOLEAN DEFAULT FALSE,
-            start_time TIMESTAMP,
-            end_time TIMESTAMP,
-            metadata JSON,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(source_id, target_id, relationship_type)
-        )
-        """)
-        print("Created edges table")
-
-    # Create new tables if they don't exist
-    cursor.executescript("""
-    CREATE TABLE IF NOT EXISTS node_attributes (
-        node_id TEXT NOT NULL,
-        attribute_name TEXT NOT NULL,
-        attribute_value TEXT NOT NULL,
-        confidence REAL NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        PRIMARY KEY (node_id, attribute_name)
-    );
-
-    CREATE TABLE IF NOT EXISTS hierarchies (
-        parent_id TEXT NOT NULL,
-        child_id TEXT NOT NULL,
-        hierarchy_type TEXT NOT NULL,
-        confidence REAL NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        PRIMARY KEY (parent_id, child_id, hierarchy_type)
-    );
-    """)
-
-    # Create indexes if they don't exist
-    cursor.executescript("""
-    CREATE INDEX IF NOT EXISTS idx_edges_source_id ON edges(source_id);
-    CREATE INDEX IF NOT EXISTS idx_edges_target_id ON edges(target_id);
-    CREATE INDEX IF NOT EXISTS idx_edges_relationship_type ON edges(relationship_type);
-    CREATE INDEX IF NOT EXISTS idx_edges_start_time ON edges(start_time);
-    CREATE INDEX IF NOT EXISTS idx_edges_end_time ON edges(end_time);
-    CREATE INDEX IF NOT EXISTS idx_node_attributes_node_id ON node_attributes(node_id);
-    CREATE INDEX IF NOT EXISTS idx_hierarchies_parent_id ON hierarchies(parent_id);
-    CREATE INDEX IF NOT EXISTS idx_hierarchies_child_id ON hierarchies(child_id);
-    """)
-
-    # Create triggers if they don't exist
-    cursor.executescript("""
-    CREATE TRIGGER IF NOT EXISTS update_edges_timestamp
-    AFTER UPDATE ON edges
-    BEGIN
-        UPDATE edges SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-    END;
-
-    CREATE TRIGGER IF NOT EXISTS update_node_attributes_timestamp
-    AFTER UPDATE ON node_attributes
-    BEGIN
-        UPDATE node_attributes SET updated_at = CURRENT_TIMESTAMP
-        WHERE node_id = NEW.node_id AND attribute_name = NEW.attribute_name;
-    END;
-
-    CREATE TRIGGER IF NOT EXISTS update_hierarchies_timestamp
-    AFTER UPDATE ON hierarchies
-    BEGIN
-        UPDATE hierarchies SET updated_at = CURRENT_TIMESTAMP
-        WHERE parent_id = NEW.parent_id AND child_id = NEW.child_id AND hierarchy_type = NEW.hierarchy_type;
-    END;
-    """)
+    # Move text-keyed tables onto interned node ids; missing columns get their defaults
+    for table in legacy_tables(conn):
+        print(f"Migrating {table} table to interned node ids")
+    migrate_legacy_layout(conn)
+
+    # Create the node table, stores, views and covering indexes, and drop the legacy triggers
+    cursor.executescript(SCHEMA)
+    for index_name in REDUNDANT_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+    # Refresh planner statistics so the new indexes are picked up
+    cursor.execute("ANALYZE")
 
     conn.commit()
+    # Hand the pages freed by the migration back to the filesystem
+    cursor.execute("VACUUM")
     conn.close()
     print("Existing database updated with new schema elements.")
 
@@ -0,0 +1,29 @@
+# src/utils/migrate_memory_store.py
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from config import DATA_DIR, MEMORY_DB_PATH
+from src.modules.memory_store import JsonDirectoryMemoryStore, SqliteMemoryStore, migrate_memory_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy one-file-per-memory JSON history into the SQLite memory store.")
+    parser.add_argument("--source", type=Path, default=DATA_DIR, help="Directory of memory JSON files")
+    parser.add_argument("--dest", type=Path, default=MEMORY_DB_PATH, help="SQLite memory store to write")
+    parser.add_argument("--batch-size", type=int, default=500, help="Memories written per transaction")
+    args = parser.parse_args()
+
+    source = JsonDirectoryMemoryStore(args.source)
+    destination = SqliteMemoryStore(args.dest)
+    print(f"Migrating memories from {args.source} to {args.dest}...")
+    copied = migrate_memory_store(source, destination, args.batch_size)
+    print(f"Migration complete. Copied {copied} memories ({len(destination)} in store). Re-running skips memories already copied.")
+    destination.close()
+
+if __name__ == "__main__":
+    main()
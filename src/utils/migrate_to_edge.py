@@ -2,54 +2,68 @@
 
 import os
 import json
+import argparse
 from pathlib import Path
-from typing import List, Dict, Any
-import hashlib
+from typing import List, Dict, Any, Iterator, Iterable, Optional
 
 # Adjust the import path as necessary
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from modules.kb_graph import analyze_file_pair, update_knowledge_graph, create_edge, get_related_nodes
+from config import DB_DIR
+from src.modules.edge_migration import migrate_memories, migrate_parallel
+from src.modules.memory_store import get_memory_store
 
-DATA_DIR = Path('data')
+DEFAULT_CHECKPOINT = DB_DIR / "edge_migration_checkpoint.json"
 
-def load_json_files(directory: Path) -> List[Dict[str, Any]]:
-    json_files = []
+def load_json_files(directory: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the JSON documents under ``directory`` one at a time.
+    """
     for file_path in directory.glob('**/*.json'):
         with open(file_path, 'r') as file:
             try:
                 data = json.load(file)
-                json_files.append(data)
             except json.JSONDecodeError:
                 print(f"Error decoding JSON from file: {file_path}")
-    return json_files
-
-def process_files(files: List[Dict[str, Any]]):
-    for i, file1 in enumerate(files):
-        try:
-            update_knowledge_graph(file1)
-            file1_id = hashlib.md5(json.dumps(file1, sort_keys=True).encode()).hexdigest()
-
-            for file2 in files[i+1:]:
-                try:
-                    file2_id = hashlib.md5(json.dumps(file2, sort_keys=True).encode()).hexdigest()
-                    edge_categories = analyze_file_pair(file1, file2)
-
-                    for category, strength in edge_categories:
-                        create_edge(file1_id, file2_id, category, strength)
-                except Exception as e:
-                    print(f"Error processing file pair: {e}")
-        except Exception as e:
-            print(f"Error processing file: {e}")
-
-def main():
+                continue
+        if isinstance(data, dict):
+            yield data
+
+def print_progress(shards_done: int, total_shards: int, edges: int):
+    print(f"Shard {shards_done}/{total_shards} written ({edges} edges this run)")
+
+def process_files(files: Iterable[Dict[str, Any]], temporal_neighbors: Optional[int] = 10) -> int:
+    return migrate_memories(files, temporal_neighbors=temporal_neighbors)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build knowledge graph edges between saved memories.")
+    parser.add_argument("--json-dir", type=Path, default=None,
+                        help="Read memories from a directory of JSON files instead of the memory store")
+    parser.add_argument("--temporal-neighbors", type=int, default=10,
+                        help="Temporal edges per memory to its nearest later memories within a week (0 for no limit)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes for parsing and edge computation (1 runs in-process)")
+    parser.add_argument("--shard-size", type=int, default=500, help="Memories per work unit and checkpoint step")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT,
+                        help="File recording completed shards so an interrupted run can resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args(argv)
+
+    if args.restart and args.checkpoint.exists():
+        args.checkpoint.unlink()
+
     print("Starting migration process...")
-    files = load_json_files(DATA_DIR)
-    print(f"Loaded {len(files)} JSON files.")
+    if args.json_dir:
+        source, keys = "json", [str(path) for path in args.json_dir.glob('**/*.json')]
+    else:
+        source, keys = "store", get_memory_store().ids()
+    print(f"Found {len(keys)} memories.")
 
-    process_files(files)
-    print("Migration complete.")
+    written = migrate_parallel(source, keys, workers=args.workers, shard_size=args.shard_size,
+                               temporal_neighbors=args.temporal_neighbors or None,
+                               checkpoint_path=args.checkpoint, progress_callback=print_progress)
+    print(f"Migration complete. Wrote {written} edges.")
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,22 @@
 # src/utils/schema.py
 
-SCHEMA = """
-CREATE TABLE IF NOT EXISTS edges (
+import sqlite3
+
+# Node keys (memory hashes, concept strings, usernames, ...) are stored once
+# in `nodes`; the *_store tables reference them by integer id. The views
+# named after the original tables (edges, node_attributes, hierarchies)
+# expose the same text-keyed columns as before, so existing queries keep
+# working unchanged.
+SCHEMA_TABLES = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS edge_store (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    source_id TEXT NOT NULL,
-    target_id TEXT NOT NULL,
+    source INTEGER NOT NULL REFERENCES nodes(id),
+    target INTEGER NOT NULL REFERENCES nodes(id),
     relationship_type TEXT NOT NULL,
     strength REAL NOT NULL,
     confidence REAL NOT NULL DEFAULT 1.0,
@@ -14,55 +26,276 @@ CREATE TABLE IF NOT EXISTS edges (
     metadata JSON,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(source_id, target_id, relationship_type)
+    UNIQUE(source, target, relationship_type)
 );
 
-CREATE TABLE IF NOT EXISTS node_attributes (
-    node_id TEXT NOT NULL,
+CREATE TABLE IF NOT EXISTS node_attribute_store (
+    node INTEGER NOT NULL REFERENCES nodes(id),
     attribute_name TEXT NOT NULL,
     attribute_value TEXT NOT NULL,
     confidence REAL NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY (node_id, attribute_name)
-);
+    PRIMARY KEY (node, attribute_name)
+) WITHOUT ROWID;
 
-CREATE TABLE IF NOT EXISTS hierarchies (
-    parent_id TEXT NOT NULL,
-    child_id TEXT NOT NULL,
+CREATE TABLE IF NOT EXISTS hierarchy_store (
+    parent INTEGER NOT NULL REFERENCES nodes(id),
+    child INTEGER NOT NULL REFERENCES nodes(id),
     hierarchy_type TEXT NOT NULL,
     confidence REAL NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY (parent_id, child_id, hierarchy_type)
-);
+    PRIMARY KEY (parent, child, hierarchy_type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS graph_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+VIEWS = """
+CREATE VIEW IF NOT EXISTS edges AS
+SELECT edge_store.id AS id, source_node.key AS source_id, target_node.key AS target_id,
+       relationship_type, strength, confidence, bidirectional, start_time, end_time, metadata,
+       created_at, updated_at
+FROM edge_store
+JOIN nodes AS source_node ON source_node.id = edge_store.source
+JOIN nodes AS target_node ON target_node.id = edge_store.target;
+
+CREATE VIEW IF NOT EXISTS node_attributes AS
+SELECT nodes.key AS node_id, attribute_name, attribute_value, confidence, created_at, updated_at
+FROM node_attribute_store
+JOIN nodes ON nodes.id = node_attribute_store.node;
 
-CREATE INDEX IF NOT EXISTS idx_edges_source_id ON edges(source_id);
-CREATE INDEX IF NOT EXISTS idx_edges_target_id ON edges(target_id);
-CREATE INDEX IF NOT EXISTS idx_edges_relationship_type ON edges(relationship_type);
-CREATE INDEX IF NOT EXISTS idx_edges_start_time ON edges(start_time);
-CREATE INDEX IF NOT EXISTS idx_edges_end_time ON edges(end_time);
-CREATE INDEX IF NOT EXISTS idx_node_attributes_node_id ON node_attributes(node_id);
-CREATE INDEX IF NOT EXISTS idx_hierarchies_parent_id ON hierarchies(parent_id);
-CREATE INDEX IF NOT EXISTS idx_hierarchies_child_id ON hierarchies(child_id);
-
-CREATE TRIGGER IF NOT EXISTS update_edges_timestamp
-AFTER UPDATE ON edges
+CREATE VIEW IF NOT EXISTS hierarchies AS
+SELECT parent_node.key AS parent_id, child_node.key AS child_id, hierarchy_type, confidence, created_at, updated_at
+FROM hierarchy_store
+JOIN nodes AS parent_node ON parent_node.id = hierarchy_store.parent
+JOIN nodes AS child_node ON child_node.id = hierarchy_store.child;
+
+-- Raw SQL written against the old text-keyed tables still works through the views
+CREATE TRIGGER IF NOT EXISTS edges_insert INSTEAD OF INSERT ON edges
 BEGIN
-    UPDATE edges SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+    INSERT OR IGNORE INTO nodes (key) VALUES (NEW.source_id), (NEW.target_id);
+    INSERT INTO edge_store (source, target, relationship_type, strength, confidence, bidirectional,
+                            start_time, end_time, metadata, created_at, updated_at)
+    VALUES ((SELECT id FROM nodes WHERE key = NEW.source_id), (SELECT id FROM nodes WHERE key = NEW.target_id),
+            NEW.relationship_type, NEW.strength, COALESCE(NEW.confidence, 1.0), COALESCE(NEW.bidirectional, FALSE),
+            NEW.start_time, NEW.end_time, NEW.metadata,
+            COALESCE(NEW.created_at, CURRENT_TIMESTAMP), COALESCE(NEW.updated_at, CURRENT_TIMESTAMP));
 END;
 
-CREATE TRIGGER IF NOT EXISTS update_node_attributes_timestamp
-AFTER UPDATE ON node_attributes
+CREATE TRIGGER IF NOT EXISTS edges_update INSTEAD OF UPDATE ON edges
 BEGIN
-    UPDATE node_attributes SET updated_at = CURRENT_TIMESTAMP
-    WHERE node_id = NEW.node_id AND attribute_name = NEW.attribute_name;
+    INSERT OR IGNORE INTO nodes (key) VALUES (NEW.source_id), (NEW.target_id);
+    UPDATE edge_store SET
+        source = (SELECT id FROM nodes WHERE key = NEW.source_id),
+        target = (SELECT id FROM nodes WHERE key = NEW.target_id),
+        relationship_type = NEW.relationship_type, strength = NEW.strength, confidence = NEW.confidence,
+        bidirectional = NEW.bidirectional, start_time = NEW.start_time, end_time = NEW.end_time,
+        metadata = NEW.metadata, created_at = NEW.created_at,
+        updated_at = CASE WHEN NEW.updated_at IS OLD.updated_at THEN CURRENT_TIMESTAMP ELSE NEW.updated_at END
+    WHERE id = OLD.id;
 END;
 
-CREATE TRIGGER IF NOT EXISTS update_hierarchies_timestamp
-AFTER UPDATE ON hierarchies
+CREATE TRIGGER IF NOT EXISTS edges_delete INSTEAD OF DELETE ON edges
 BEGIN
-    UPDATE hierarchies SET updated_at = CURRENT_TIMESTAMP
-    WHERE parent_id = NEW.parent_id AND child_id = NEW.child_id AND hierarchy_type = NEW.hierarchy_type;
+    DELETE FROM edge_store WHERE id = OLD.id;
 END;
+
+CREATE TRIGGER IF NOT EXISTS node_attributes_insert INSTEAD OF INSERT ON node_attributes
+BEGIN
+    INSERT OR IGNORE INTO nodes (key) VALUES (NEW.node_id);
+    INSERT INTO node_attribute_store (node, attribute_name, attribute_value, confidence, created_at, updated_at)
+    VALUES ((SELECT id FROM nodes WHERE key = NEW.node_id), NEW.attribute_name, NEW.attribute_value, NEW.confidence,
+            COALESCE(NEW.created_at, CURRENT_TIMESTAMP), COALESCE(NEW.updated_at, CURRENT_TIMESTAMP));
+END;
+
+CREATE TRIGGER IF NOT EXISTS node_attributes_update INSTEAD OF UPDATE ON node_attributes
+BEGIN
+    INSERT OR IGNORE INTO nodes (key) VALUES (NEW.node_id);
+    UPDATE node_attribute_store SET
+        node = (SELECT id FROM nodes WHERE key = NEW.node_id),
+        attribute_name = NEW.attribute_name, attribute_value = NEW.attribute_value, confidence = NEW.confidence,
+        created_at = NEW.created_at,
+        updated_at = CASE WHEN NEW.updated_at IS OLD.updated_at THEN CURRENT_TIMESTAMP ELSE NEW.updated_at END
+    WHERE node = (SELECT id FROM nodes WHERE key = OLD.node_id) AND attribute_name = OLD.attribute_name;
+END;
+
+CREATE TRIGGER IF NOT EXISTS node_attributes_delete INSTEAD OF DELETE ON node_attributes
+BEGIN
+    DELETE FROM node_attribute_store
+    WHERE node = (SELECT id FROM nodes WHERE key = OLD.node_id) AND attribute_name = OLD.attribute_name;
+END;
+
+CREATE TRIGGER IF NOT EXISTS hierarchies_insert INSTEAD OF INSERT ON hierarchies
+BEGIN
+    INSERT OR IGNORE INTO nodes (key) VALUES (NEW.parent_id), (NEW.child_id);
+    INSERT INTO hierarchy_store (parent, child, hierarchy_type, confidence, created_at, updated_at)
+    VALUES ((SELECT id FROM nodes WHERE key = NEW.parent_id), (SELECT id FROM nodes WHERE key = NEW.child_id),
+            NEW.hierarchy_type, NEW.confidence,
+            COALESCE(NEW.created_at, CURRENT_TIMESTAMP), COALESCE(NEW.updated_at, CURRENT_TIMESTAMP));
+END;
+
+CREATE TRIGGER IF NOT EXISTS hierarchies_update INSTEAD OF UPDATE ON hierarchies
+BEGIN
+    INSERT OR IGNORE INTO nodes (key) VALUES (NEW.parent_id), (NEW.child_id);
+    UPDATE hierarchy_store SET
+        parent = (SELECT id FROM nodes WHERE key = NEW.parent_id),
+        child = (SELECT id FROM nodes WHERE key = NEW.child_id),
+        hierarchy_type = NEW.hierarchy_type, confidence = NEW.confidence, created_at = NEW.created_at,
+        updated_at = CASE WHEN NEW.updated_at IS OLD.updated_at THEN CURRENT_TIMESTAMP ELSE NEW.updated_at END
+    WHERE parent = (SELECT id FROM nodes WHERE key = OLD.parent_id)
+      AND child = (SELECT id FROM nodes WHERE key = OLD.child_id)
+      AND hierarchy_type = OLD.hierarchy_type;
+END;
+
+CREATE TRIGGER IF NOT EXISTS hierarchies_delete INSTEAD OF DELETE ON hierarchies
+BEGIN
+    DELETE FROM hierarchy_store
+    WHERE parent = (SELECT id FROM nodes WHERE key = OLD.parent_id)
+      AND child = (SELECT id FROM nodes WHERE key = OLD.child_id)
+      AND hierarchy_type = OLD.hierarchy_type;
+END;
+"""
+
+# Deletions leave no row behind for an updated_at watermark to find, so
+# every edge delete bumps a counter that in-memory copies of the graph
+# (GraphSnapshot) compare against to know they must reload
+CHANGE_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS edge_store_count_deletes AFTER DELETE ON edge_store
+BEGIN
+    INSERT INTO graph_counters (name, value) VALUES ('edge_deletions', 1)
+    ON CONFLICT(name) DO UPDATE SET value = value + 1;
+END;
+"""
+
+# Composite indexes shaped after the edge queries in kb_graph and
+# KnowledgeManager. The neighbour indexes carry every column those queries
+# select, so neighbour lookups never touch the table rows.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_edges_source_covering ON edge_store(source, relationship_type, target, strength, confidence);
+CREATE INDEX IF NOT EXISTS idx_edges_target_covering ON edge_store(target, bidirectional, relationship_type, source, strength, confidence);
+CREATE INDEX IF NOT EXISTS idx_edges_relationship_type ON edge_store(relationship_type);
+CREATE INDEX IF NOT EXISTS idx_edges_confidence_time ON edge_store(confidence, start_time, end_time);
+CREATE INDEX IF NOT EXISTS idx_edges_start_time ON edge_store(start_time);
+CREATE INDEX IF NOT EXISTS idx_edges_end_time ON edge_store(end_time);
+CREATE INDEX IF NOT EXISTS idx_edges_updated_at ON edge_store(updated_at);
+CREATE INDEX IF NOT EXISTS idx_hierarchies_parent_covering ON hierarchy_store(parent, hierarchy_type, child, confidence);
+CREATE INDEX IF NOT EXISTS idx_hierarchies_child_covering ON hierarchy_store(child, hierarchy_type, parent, confidence);
 """
+
+# Single-column indexes made redundant by the covering indexes above
+REDUNDANT_INDEXES = [
+    "idx_edges_source_id",
+    "idx_edges_target_id",
+    "idx_hierarchies_parent_id",
+    "idx_hierarchies_child_id",
+    "idx_node_attributes_node_id",  # prefix of the node_attributes primary key
+]
+
+# Writes set updated_at inline with ON CONFLICT DO UPDATE, so the old
+# AFTER UPDATE triggers (a second UPDATE per row) are dropped
+LEGACY_TRIGGERS = [
+    "update_edges_timestamp",
+    "update_node_attributes_timestamp",
+    "update_hierarchies_timestamp",
+]
+
+DROP_LEGACY_TRIGGERS = "".join(f"DROP TRIGGER IF EXISTS {name};\n" for name in LEGACY_TRIGGERS)
+
+SCHEMA = SCHEMA_TABLES + VIEWS + CHANGE_TRIGGERS + INDEXES + DROP_LEGACY_TRIGGERS
+
+# Write-path helpers: intern a key, then refer to it by id inside a statement
+INTERN_NODE_SQL = "INSERT OR IGNORE INTO nodes (key) VALUES (?)"
+NODE_ID_SQL = "(SELECT id FROM nodes WHERE key = ?)"
+
+# (legacy table, new table, [(new column, legacy column or None, default), ...]); key columns are resolved to node ids
+_LEGACY_COPIES = [
+    ("edges", "edge_store", [
+        ("id", "id", None), ("source", "source_id", None), ("target", "target_id", None),
+        ("relationship_type", "relationship_type", None), ("strength", "strength", None),
+        ("confidence", "confidence", "1.0"), ("bidirectional", "bidirectional", "FALSE"),
+        ("start_time", "start_time", "NULL"), ("end_time", "end_time", "NULL"), ("metadata", "metadata", "NULL"),
+        ("created_at", "created_at", "CURRENT_TIMESTAMP"), ("updated_at", "updated_at", "CURRENT_TIMESTAMP"),
+    ]),
+    ("node_attributes", "node_attribute_store", [
+        ("node", "node_id", None), ("attribute_name", "attribute_name", None),
+        ("attribute_value", "attribute_value", None), ("confidence", "confidence", "1.0"),
+        ("created_at", "created_at", "CURRENT_TIMESTAMP"), ("updated_at", "updated_at", "CURRENT_TIMESTAMP"),
+    ]),
+    ("hierarchies", "hierarchy_store", [
+        ("parent", "parent_id", None), ("child", "child_id", None), ("hierarchy_type", "hierarchy_type", None),
+        ("confidence", "confidence", "1.0"),
+        ("created_at", "created_at", "CURRENT_TIMESTAMP"), ("updated_at", "updated_at", "CURRENT_TIMESTAMP"),
+    ]),
+]
+_KEY_COLUMNS = {"source", "target", "node", "parent", "child"}
+
+def legacy_tables(conn: sqlite3.Connection) -> list:
+    """
+    Names of text-keyed tables from the original layout still present in the database.
+    """
+    names = [legacy for legacy, _, _ in _LEGACY_COPIES]
+    rows = conn.execute(
+        f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({','.join('?' * len(names))})", names
+    ).fetchall()
+    return [row[0] for row in rows]
+
+def migrate_legacy_layout(conn: sqlite3.Connection) -> int:
+    """
+    Move the text-keyed edges, node_attributes and hierarchies tables onto interned node ids.
+
+    Every distinct key is added to ``nodes`` and the rows are copied into the
+    *_store tables (edge ids are kept) in a single transaction, after which
+    the old tables are dropped and replaced by the compatibility views.
+
+    Returns:
+        int: Number of legacy tables migrated.
+    """
+    present = set(legacy_tables(conn))
+    if not present:
+        return 0
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for name in LEGACY_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for name in present:
+            conn.execute(f"ALTER TABLE {name} RENAME TO legacy_{name}")
+        for statement in SCHEMA_TABLES.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        for legacy, table, columns in _LEGACY_COPIES:
+            if legacy not in present:
+                continue
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info(legacy_{legacy})")}
+            for new_column, old_column, _ in columns:
+                if new_column in _KEY_COLUMNS:
+                    conn.execute(f"INSERT OR IGNORE INTO nodes (key) SELECT DISTINCT {old_column} FROM legacy_{legacy}")
+            joins, values = [], []
+            for new_column, old_column, default in columns:
+                if new_column in _KEY_COLUMNS:
+                    joins.append(f"JOIN nodes AS {new_column}_node ON {new_column}_node.key = old.{old_column}")
+                    values.append(f"{new_column}_node.id")
+                else:
+                    values.append(f"old.{old_column}" if old_column in existing else default)
+            conn.execute(f"""
+                INSERT INTO {table} ({', '.join(column for column, _, _ in columns)})
+                SELECT {', '.join(values)} FROM legacy_{legacy} AS old {' '.join(joins)}
+            """)
+            conn.execute(f"DROP TABLE legacy_{legacy}")
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return len(present)
+
+def apply_schema(conn: sqlite3.Connection):
+    """
+    Bring a database to the current layout: migrate text-keyed tables, then create anything missing.
+    """
+    migrate_legacy_layout(conn)
+    conn.executescript(SCHEMA)
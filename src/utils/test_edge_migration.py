@@ -7,14 +7,14 @@ from collections import Counter
 
 # Adjust the import path as necessary
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from modules.kb_graph import get_db_connection, get_related_nodes
-from migrate_to_edge import main as migrate_main
+from src.modules.kb_graph import get_db_connection, get_related_nodes
+from src.utils.migrate_to_edge import main as migrate_main
 
 def test_edge_migration():
     # Run the migration
-    migrate_main()
+    migrate_main([])
 
     # Connect to the database
     conn = get_db_connection()
@@ -62,7 +62,5 @@ def test_edge_migration():
     for rel_type, count in relationship_types.items():
         print(f"  {rel_type}: {count}")
 
-    conn.close()
-
 if __name__ == "__main__":
     test_edge_migration()